@@ -0,0 +1,130 @@
+"""
+Apache Arrow interchange for AirLock inputs and results.
+
+Input tables (pyarrow Table, RecordBatch or RecordBatchReader, or any
+object exposing the Arrow C stream interface such as a Polars DataFrame
+or DuckDB relation) are viewed as pandas frames without copying numeric
+buffers. Match results are returned as Arrow tables with plain
+coordinate columns instead of shapely geometries, so they can be handed
+to Polars, DuckDB or Parquet writers as-is.
+
+pyarrow is optional; it is only needed to build Arrow output.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - depends on environment
+    pa = None
+
+
+# Schema of Arrow match results (geometry is carried as easting/northing)
+MATCH_ARROW_COLUMNS = ("postcode", "easting", "northing", "matched_grid_id")
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("pyarrow is required for Arrow output. Install it with 'pip install pyarrow'.")
+
+
+def is_arrow_data(data: Any) -> bool:
+    """True for Arrow tables, record batches, readers and C-stream exporters."""
+    if isinstance(data, pd.DataFrame):
+        return False
+    return hasattr(data, "__arrow_c_stream__") or hasattr(data, "to_batches") or (
+        hasattr(data, "schema") and hasattr(data, "num_rows")
+    )
+
+
+def as_dataframe(data: Any) -> pd.DataFrame:
+    """
+    View tabular input as a pandas DataFrame.
+
+    pandas frames are returned unchanged. Arrow data is converted with
+    one block per column, so numeric columns without nulls reference the
+    Arrow buffers instead of being copied into consolidated blocks.
+
+    Args:
+        data: pandas DataFrame, pyarrow Table/RecordBatch/RecordBatchReader,
+              or any object implementing __arrow_c_stream__.
+
+    Returns:
+        pandas DataFrame.
+    """
+    if not is_arrow_data(data):
+        return data
+
+    _require_pyarrow()
+    if isinstance(data, pa.RecordBatchReader):
+        data = data.read_all()
+    elif not isinstance(data, (pa.Table, pa.RecordBatch)):
+        data = pa.table(data)
+
+    return data.to_pandas(split_blocks=True)
+
+
+def match_arrays_to_arrow(
+    postcodes: np.ndarray,
+    eastings: np.ndarray,
+    northings: np.ndarray,
+    grid_ids: np.ndarray,
+    point_idx: np.ndarray,
+    cell_idx: np.ndarray,
+) -> "pa.Table":
+    """
+    Assemble an Arrow match table from left-join pair indices.
+
+    Args:
+        postcodes, eastings, northings: Per-point arrays.
+        grid_ids: Grid cell identifiers.
+        point_idx: Point position per output row.
+        cell_idx: Grid position per output row (-1 for unmatched).
+
+    Returns:
+        pyarrow Table with MATCH_ARROW_COLUMNS; matched_grid_id is null
+        for unmatched postcodes.
+    """
+    _require_pyarrow()
+
+    unmatched = cell_idx < 0
+    grid_column = pa.array(grid_ids, type=pa.string()).take(
+        pa.array(np.where(unmatched, 0, cell_idx), mask=unmatched)
+    )
+
+    return pa.table({
+        "postcode": pa.array(postcodes, type=pa.string()).take(pa.array(point_idx)),
+        "easting": pa.array(np.asarray(eastings, dtype=float)[point_idx]),
+        "northing": pa.array(np.asarray(northings, dtype=float)[point_idx]),
+        "matched_grid_id": grid_column,
+    })
+
+
+def match_result_to_arrow(match_df: pd.DataFrame) -> "pa.Table":
+    """
+    Convert a match result GeoDataFrame to an Arrow table.
+
+    The point geometry column is dropped; easting/northing already hold
+    the coordinates. Missing grid IDs become nulls.
+
+    Args:
+        match_df: Result of match_postcodes_to_grid (or a streamed chunk).
+
+    Returns:
+        pyarrow Table with MATCH_ARROW_COLUMNS.
+    """
+    _require_pyarrow()
+
+    grid_ids = match_df["matched_grid_id"]
+    return pa.table({
+        "postcode": pa.array(match_df["postcode"].astype(str).to_numpy(), type=pa.string()),
+        "easting": pa.array(match_df["easting"].to_numpy(dtype=float)),
+        "northing": pa.array(match_df["northing"].to_numpy(dtype=float)),
+        "matched_grid_id": pa.array(
+            grid_ids.astype(object).where(grid_ids.notna(), None).to_numpy(),
+            type=pa.string(),
+        ),
+    })
@@ -0,0 +1,374 @@
+"""
+Benchmark runner with a local history file and regression comparison.
+
+Usage:
+    python -m airlock.benchmarks run [--postcodes N] [--repeats R] [--label L]
+    python -m airlock.benchmarks compare BASELINE CANDIDATE
+
+BASELINE/CANDIDATE select runs from the history by run ID, label or git
+commit (prefixes allowed; the latest matching run wins). compare exits
+with status 1 when a significant slowdown is found.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, UTC
+from importlib import metadata
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import GRID_CELL_SIZE_M
+from .exporters import export_chunks_to_csv, prepare_export_table
+from .grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
+from .matcher import iter_match_chunks, match_postcodes_to_grid
+from .postcode_loader import load_postcodes_from_dataframe
+
+
+# Default location of the benchmark history (one JSON record per line)
+BENCHMARK_HISTORY_FILE = "benchmark_history.jsonl"
+
+# Libraries whose versions are recorded with every run
+TRACKED_PACKAGES = ("pandas", "numpy", "geopandas", "shapely", "pyproj", "pyarrow")
+
+# A slowdown is flagged when the median time grows by more than this
+# fraction and the permutation test is significant at SIGNIFICANCE_LEVEL
+SLOWDOWN_THRESHOLD = 0.05
+SIGNIFICANCE_LEVEL = 0.05
+
+_PERMUTATION_SAMPLES = 10_000
+
+
+# ---------------------------------------------------------------------------
+# Environment metadata
+# ---------------------------------------------------------------------------
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def collect_environment() -> dict:
+    """Describe the machine and library versions a benchmark ran on."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+        "packages": {name: _package_version(name) for name in TRACKED_PACKAGES},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Synthetic inputs and benchmark cases
+# ---------------------------------------------------------------------------
+
+def _synthetic_grid(grid_side: int) -> pd.DataFrame:
+    """Square NOx grid of grid_side × grid_side 1 km cells."""
+    half = GRID_CELL_SIZE_M / 2
+    cols, rows = np.meshgrid(np.arange(grid_side), np.arange(grid_side))
+    return pd.DataFrame({
+        "X": (cols.ravel() * GRID_CELL_SIZE_M + half).astype(float),
+        "Y": (rows.ravel() * GRID_CELL_SIZE_M + half).astype(float),
+        "NOx": np.linspace(5, 50, grid_side * grid_side),
+    })
+
+
+def _synthetic_postcodes(n_postcodes: int, grid_side: int, seed: int = 0) -> pd.DataFrame:
+    """ONSPD-style postcodes scattered over (and slightly beyond) the grid."""
+    rng = np.random.default_rng(seed)
+    extent = grid_side * GRID_CELL_SIZE_M
+    return pd.DataFrame({
+        "pcd": [f"AB{i % 100} {i % 10}{chr(65 + i % 26)}{chr(65 + i // 26 % 26)}"
+                for i in range(n_postcodes)],
+        "oseast1m": rng.uniform(-0.02 * extent, 1.02 * extent, n_postcodes).round(),
+        "osnrth1m": rng.uniform(-0.02 * extent, 1.02 * extent, n_postcodes).round(),
+        "doterm": [None] * n_postcodes,
+    })
+
+
+def _clustered_postcodes(n_postcodes: int, grid_side: int, seed: int = 0) -> pd.DataFrame:
+    """
+    ONSPD-like postcodes: sorted by postcode, with the units of a sector
+    close together and districts scattered over the grid, so consecutive
+    rows are near each other except at district boundaries.
+    """
+    rng = np.random.default_rng(seed)
+    extent = grid_side * GRID_CELL_SIZE_M
+    units_per_sector, sectors_per_district = 50, 10
+
+    i = np.arange(n_postcodes)
+    unit = i % units_per_sector
+    sector = i // units_per_sector
+    district = sector // sectors_per_district
+
+    n_districts = int(district[-1]) + 1 if n_postcodes else 0
+    district_xy = rng.uniform(0, extent, (n_districts, 2))
+    sector_xy = district_xy.repeat(sectors_per_district, axis=0) + rng.normal(
+        0, 2_000, (n_districts * sectors_per_district, 2)
+    )
+    xy = sector_xy[sector] + rng.normal(0, 200, (n_postcodes, 2))
+
+    return pd.DataFrame({
+        # Fixed-width parts, so row order is postcode order
+        "pcd": [
+            f"{chr(65 + d // 2600 % 26)}{chr(65 + d // 100 % 26)}{d % 100:02d} "
+            f"{s % sectors_per_district}{chr(65 + u // 26)}{chr(65 + u % 26)}"
+            for d, s, u in zip(district, sector, unit)
+        ],
+        "oseast1m": xy[:, 0].round(),
+        "osnrth1m": xy[:, 1].round(),
+        "doterm": [None] * n_postcodes,
+    })
+
+
+def _benchmark_cases(n_postcodes: int, grid_side: int) -> Dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable."""
+    nox_df = _synthetic_grid(grid_side)
+    pc_df = _synthetic_postcodes(n_postcodes, grid_side)
+
+    grid_cells = gridcells_from_geodataframe(build_grid_geodataframe(nox_df))
+    postcodes = load_postcodes_from_dataframe(pc_df)
+    match_gdf = match_postcodes_to_grid(postcodes, grid_cells)
+    clustered = load_postcodes_from_dataframe(_clustered_postcodes(n_postcodes, grid_side))
+
+    def export_csv() -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_chunks_to_csv(
+                iter_match_chunks(postcodes, grid_cells), os.path.join(tmp, "out.csv")
+            )
+
+    return {
+        "build_grid_geodataframe": lambda: build_grid_geodataframe(nox_df),
+        "load_postcodes_from_dataframe": lambda: load_postcodes_from_dataframe(pc_df),
+        "match_postcodes_to_grid": lambda: match_postcodes_to_grid(postcodes, grid_cells),
+        "match_postcodes_to_grid_hilbert": lambda: match_postcodes_to_grid(
+            postcodes, grid_cells, spatial_sort="hilbert"
+        ),
+        # Postcode-sorted, spatially clustered input (like a real ONSPD),
+        # where input order already has some locality
+        "match_postcodes_to_grid_clustered": lambda: match_postcodes_to_grid(
+            clustered, grid_cells
+        ),
+        "match_postcodes_to_grid_clustered_hilbert": lambda: match_postcodes_to_grid(
+            clustered, grid_cells, spatial_sort="hilbert"
+        ),
+        "prepare_export_table": lambda: prepare_export_table(match_gdf),
+        "export_chunks_to_csv": export_csv,
+    }
+
+
+def run_benchmarks(
+    n_postcodes: int = 100_000,
+    grid_side: int = 100,
+    repeats: int = 5,
+    label: Optional[str] = None,
+) -> dict:
+    """
+    Time each benchmark case `repeats` times on synthetic data.
+
+    Returns:
+        Run record:
+            {
+                "run_id", "timestamp", "label",
+                "params": {"n_postcodes", "grid_side", "repeats"},
+                "environment": collect_environment(),
+                "results": {benchmark name: [seconds, ...]},
+            }
+    """
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1.")
+
+    cases = _benchmark_cases(n_postcodes, grid_side)
+    results: Dict[str, List[float]] = {}
+
+    for name, func in cases.items():
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        results[name] = times
+
+    return {
+        "run_id": uuid.uuid4().hex[:12],
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "label": label,
+        "params": {
+            "n_postcodes": n_postcodes,
+            "grid_side": grid_side,
+            "repeats": repeats,
+        },
+        "environment": collect_environment(),
+        "results": results,
+    }
+
+
+# ---------------------------------------------------------------------------
+# History store
+# ---------------------------------------------------------------------------
+
+def append_history(record: dict, path: str = BENCHMARK_HISTORY_FILE) -> None:
+    """Append one run record to the JSON-lines history file."""
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(json.dumps(record) + "\n")
+
+
+def load_history(path: str = BENCHMARK_HISTORY_FILE) -> List[dict]:
+    """Load all run records (oldest first); empty if the file is missing."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def find_run(history: List[dict], selector: str) -> dict:
+    """
+    Latest run whose run ID, label or git commit starts with selector.
+    """
+    for record in reversed(history):
+        commit = (record.get("environment") or {}).get("git_commit") or ""
+        candidates = [record.get("run_id") or "", record.get("label") or "", commit]
+        if any(c and c.startswith(selector) for c in candidates):
+            return record
+    raise ValueError(f"No benchmark run matches '{selector}'.")
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def _permutation_p_value(baseline: np.ndarray, candidate: np.ndarray, seed: int = 0) -> float:
+    """
+    One-sided permutation test p-value for "candidate is slower".
+
+    The statistic is the difference of means; p is the share of label
+    permutations with a difference at least as large as the observed one.
+    """
+    observed = candidate.mean() - baseline.mean()
+    pooled = np.concatenate([baseline, candidate])
+    n = len(candidate)
+
+    rng = np.random.default_rng(seed)
+    perms = np.argsort(rng.random((_PERMUTATION_SAMPLES, len(pooled))), axis=1)
+    shuffled = pooled[perms]
+    diffs = shuffled[:, :n].mean(axis=1) - shuffled[:, n:].mean(axis=1)
+
+    # Count the observed arrangement itself so p is never 0
+    return float((np.sum(diffs >= observed - 1e-12) + 1) / (_PERMUTATION_SAMPLES + 1))
+
+
+def compare_runs(
+    baseline: dict,
+    candidate: dict,
+    threshold: float = SLOWDOWN_THRESHOLD,
+    alpha: float = SIGNIFICANCE_LEVEL,
+) -> pd.DataFrame:
+    """
+    Compare benchmark timings of two runs.
+
+    Returns:
+        DataFrame with one row per benchmark present in both runs:
+            benchmark, baseline_median_s, candidate_median_s, ratio,
+            p_value, slowdown (bool)
+    """
+    rows = []
+    for name, base_times in baseline["results"].items():
+        if name not in candidate["results"]:
+            continue
+
+        base = np.asarray(base_times, dtype=float)
+        cand = np.asarray(candidate["results"][name], dtype=float)
+        ratio = float(np.median(cand) / np.median(base))
+        p_value = _permutation_p_value(base, cand)
+
+        rows.append({
+            "benchmark": name,
+            "baseline_median_s": float(np.median(base)),
+            "candidate_median_s": float(np.median(cand)),
+            "ratio": ratio,
+            "p_value": p_value,
+            "slowdown": bool(ratio > 1 + threshold and p_value < alpha),
+        })
+
+    return pd.DataFrame(rows)
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m airlock.benchmarks")
+    parser.add_argument("--history", default=BENCHMARK_HISTORY_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run benchmarks and append to the history.")
+    run_p.add_argument("--postcodes", type=int, default=100_000)
+    run_p.add_argument("--grid-side", type=int, default=100)
+    run_p.add_argument("--repeats", type=int, default=5)
+    run_p.add_argument("--label")
+
+    cmp_p = sub.add_parser("compare", help="Compare two runs from the history.")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("candidate")
+    cmp_p.add_argument("--threshold", type=float, default=SLOWDOWN_THRESHOLD)
+    cmp_p.add_argument("--alpha", type=float, default=SIGNIFICANCE_LEVEL)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        record = run_benchmarks(
+            n_postcodes=args.postcodes,
+            grid_side=args.grid_side,
+            repeats=args.repeats,
+            label=args.label,
+        )
+        append_history(record, args.history)
+        print(f"Run {record['run_id']} saved to {args.history}")
+        for name, times in record["results"].items():
+            print(f"  {name:<32} median {np.median(times):.4f} s")
+        return 0
+
+    history = load_history(args.history)
+    report = compare_runs(
+        find_run(history, args.baseline),
+        find_run(history, args.candidate),
+        threshold=args.threshold,
+        alpha=args.alpha,
+    )
+    print(report.to_string(index=False))
+
+    if report["slowdown"].any():
+        print("Significant slowdowns: " + ", ".join(report.loc[report["slowdown"], "benchmark"]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .grid_builder import grid_ids_from_dataframe
+from .lattice import build_lattice, locate_points, lookup_cells
+
+
+WEIGHTING_METHODS = ("uniform", "inverse_distance")
+
+# Points processed per block, bounding memory for large inputs
+BUFFER_BLOCK_SIZE = 250_000
+
+
+def match_postcodes_within_radius(
+    postcodes: pd.DataFrame,
+    grid_df: pd.DataFrame,
+    radius_m: float,
+    weighting: str = "inverse_distance",
+    power: float = 1.0,
+    id_column: Optional[str] = "GridCode",
+) -> pd.DataFrame:
+    """
+    Match each postcode to every grid cell within radius_m of it.
+
+    A cell is included when the disc of radius radius_m around the
+    postcode overlaps the cell square. Candidate cells come from a fixed
+    stencil of lattice offsets around the postcode's own cell, so no point
+    buffers or polygon joins are built; exact point-to-square distances
+    then filter the candidates.
+
+    Args:
+        postcodes: DataFrame with postcode, easting, northing columns
+                   (e.g. the output of match_postcodes_to_grid).
+        grid_df: NOx grid DataFrame with X/Y columns.
+        radius_m: Buffer radius in metres (e.g. 500, 2000).
+        weighting: "uniform" or "inverse_distance" (distance from the
+                   postcode to the cell centre).
+        power: Exponent for inverse-distance weights.
+        id_column: Grid identifier column, as in gridcells_from_geodataframe.
+
+    Returns:
+        Long DataFrame with one row per postcode–cell pair:
+            - point_index (row position in postcodes)
+            - postcode
+            - grid_id
+            - distance_m (postcode to cell centre)
+            - weight (sums to 1 per postcode)
+    """
+    if radius_m <= 0:
+        raise ValueError("radius_m must be positive.")
+    if weighting not in WEIGHTING_METHODS:
+        raise ValueError(
+            f"Unknown weighting '{weighting}'. Expected one of {WEIGHTING_METHODS}."
+        )
+
+    lattice = build_lattice(grid_df)
+    grid_ids = grid_ids_from_dataframe(grid_df, id_column)
+    half = lattice.cell_size / 2
+
+    x_all = postcodes["easting"].to_numpy(dtype=float)
+    y_all = postcodes["northing"].to_numpy(dtype=float)
+
+    # Enough offsets to reach every cell the disc can touch
+    k = int(np.ceil(radius_m / lattice.cell_size))
+    offsets = [(dc, dr) for dc in range(-k, k + 1) for dr in range(-k, k + 1)]
+
+    point_parts: List[np.ndarray] = []
+    cell_parts: List[np.ndarray] = []
+    dist_parts: List[np.ndarray] = []
+
+    for start in range(0, len(x_all), BUFFER_BLOCK_SIZE):
+        x = x_all[start:start + BUFFER_BLOCK_SIZE]
+        y = y_all[start:start + BUFFER_BLOCK_SIZE]
+        cols, rows = locate_points(lattice, x, y)
+        valid_point = ~(np.isnan(x) | np.isnan(y))
+
+        for dc, dr in offsets:
+            cell = lookup_cells(lattice, cols + dc, rows + dr)
+            cx, cy = lattice.centre_coordinates(cols + dc, rows + dr)
+
+            # Distance from the point to the nearest point of the cell square
+            gap = np.hypot(
+                np.maximum(np.abs(x - cx) - half, 0),
+                np.maximum(np.abs(y - cy) - half, 0),
+            )
+            hit = valid_point & (cell >= 0) & (gap < radius_m)
+
+            point_parts.append(np.flatnonzero(hit) + start)
+            cell_parts.append(cell[hit])
+            dist_parts.append(np.hypot(x[hit] - cx[hit], y[hit] - cy[hit]))
+
+    point_idx = np.concatenate(point_parts) if point_parts else np.empty(0, dtype=np.int64)
+    cell_idx = np.concatenate(cell_parts) if cell_parts else np.empty(0, dtype=np.int64)
+    distance = np.concatenate(dist_parts) if dist_parts else np.empty(0)
+
+    order = np.lexsort((distance, point_idx))
+    point_idx, cell_idx, distance = point_idx[order], cell_idx[order], distance[order]
+
+    if weighting == "uniform":
+        raw = np.ones(len(distance))
+    else:
+        # Guard against zero distance (postcode on a cell centre)
+        raw = 1.0 / np.maximum(distance, 1.0) ** power
+
+    totals = np.bincount(point_idx, weights=raw, minlength=len(x_all))
+    weight = raw / totals[point_idx] if len(raw) else raw
+
+    return pd.DataFrame({
+        "point_index": point_idx,
+        "postcode": postcodes["postcode"].to_numpy()[point_idx],
+        "grid_id": grid_ids[cell_idx],
+        "distance_m": distance,
+        "weight": weight,
+    })
+
+
+def weighted_buffer_means(
+    pairs: pd.DataFrame,
+    grid_values: pd.Series,
+    n_points: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Weighted mean grid value per postcode from a buffer match table.
+
+    Cells without a value are skipped and the remaining weights
+    renormalised.
+
+    Args:
+        pairs: Output of match_postcodes_within_radius.
+        grid_values: Value per grid cell, indexed by grid ID.
+        n_points: Number of input postcodes (so postcodes with no cells in
+                  range still get a row). Defaults to max point_index + 1.
+
+    Returns:
+        DataFrame indexed by point_index with columns:
+            - postcode
+            - n_cells
+            - weighted_mean
+    """
+    if n_points is None:
+        n_points = int(pairs["point_index"].max()) + 1 if len(pairs) else 0
+
+    point_idx = pairs["point_index"].to_numpy(dtype=np.int64)
+    weights = pairs["weight"].to_numpy(dtype=float)
+    values = pd.to_numeric(
+        grid_values.reindex(pairs["grid_id"]), errors="coerce"
+    ).to_numpy(dtype=float)
+
+    has_value = ~np.isnan(values)
+    weight_sum = np.bincount(
+        point_idx[has_value], weights=weights[has_value], minlength=n_points
+    )
+    weighted = np.bincount(
+        point_idx[has_value],
+        weights=weights[has_value] * values[has_value],
+        minlength=n_points,
+    )
+
+    postcodes = np.full(n_points, None, dtype=object)
+    postcodes[point_idx] = pairs["postcode"].to_numpy()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(weight_sum > 0, weighted / weight_sum, np.nan)
+
+    result = pd.DataFrame({
+        "postcode": postcodes,
+        "n_cells": np.bincount(point_idx, minlength=n_points),
+        "weighted_mean": means,
+    })
+    result.index.name = "point_index"
+    return result
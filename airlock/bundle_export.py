@@ -0,0 +1,170 @@
+"""
+Bundled export of all outputs as one zip archive.
+
+Every requested artefact (matched and unmatched tables in xlsx, Parquet
+or CSV, plus the methods summary) is generated concurrently in a thread
+pool, each into its own temporary file. The files are then streamed into
+a zip archive on disk (a path or an open file), so producing the bundle
+takes about as long as the slowest artefact and never holds the archive
+in memory.
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import BinaryIO, Callable, Dict, Iterable, Optional, Union
+
+import pandas as pd
+
+from .arrow_io import MATCH_ARROW_COLUMNS, match_result_to_arrow
+from .exporters import prepare_export_table
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pq = None
+
+
+# Table formats and the methods summary that can be bundled
+BUNDLE_FORMATS = ("xlsx", "parquet", "csv", "methods")
+
+DEFAULT_BUNDLE_FORMATS = ("xlsx", "methods")
+
+# Name of each artefact inside the archive
+MATCHED_STEM = "airlock_matched_grid_postcodes"
+UNMATCHED_STEM = "airlock_unmatched_postcodes"
+METHODS_FILE = "airlock_methods_summary.txt"
+
+# Already-compressed formats are stored, text is deflated
+_STORED_SUFFIXES = (".xlsx", ".parquet")
+
+
+def _write_table(df: pd.DataFrame, path: str, file_format: str) -> None:
+    """Write one table artefact to path."""
+    if file_format == "xlsx":
+        df.to_excel(path, index=False, engine="openpyxl")
+    elif file_format == "csv":
+        df.to_csv(path, index=False)
+    else:
+        if pq is None:
+            raise ImportError("Parquet output requires pyarrow.")
+        if set(MATCH_ARROW_COLUMNS) <= set(df.columns):
+            # Same schema as match_postcodes_arrow and partitioned exports
+            pq.write_table(match_result_to_arrow(df), path)
+        else:
+            df.to_parquet(path, index=False)
+
+
+def _bundle_jobs(
+    match_df: pd.DataFrame,
+    formats: Iterable[str],
+    unmatched_df: Optional[pd.DataFrame],
+    methods_text: Optional[str],
+) -> Dict[str, Callable[[str], None]]:
+    """Archive name -> function writing that artefact to a given path."""
+    formats = list(formats)
+    unknown = set(formats) - set(BUNDLE_FORMATS)
+    if unknown:
+        raise ValueError(
+            f"Unknown bundle formats: {sorted(unknown)}. Expected {BUNDLE_FORMATS}."
+        )
+    if "methods" in formats and methods_text is None:
+        raise ValueError("methods_text is required for the 'methods' format.")
+
+    # Tables are prepared once and shared by all of their formats
+    tables = {MATCHED_STEM: prepare_export_table(match_df)}
+    if unmatched_df is not None:
+        tables[UNMATCHED_STEM] = unmatched_df.drop(columns=["geometry"], errors="ignore")
+
+    jobs = {}
+    for stem, table in tables.items():
+        for file_format in formats:
+            if file_format == "methods":
+                continue
+            jobs[f"{stem}.{file_format}"] = (
+                lambda path, table=table, file_format=file_format:
+                _write_table(table, path, file_format)
+            )
+
+    if "methods" in formats:
+        def write_methods(path: str) -> None:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(methods_text)
+
+        jobs[METHODS_FILE] = write_methods
+
+    return jobs
+
+
+def export_bundle(
+    match_df: pd.DataFrame,
+    filepath: Optional[Union[str, BinaryIO]] = None,
+    formats: Iterable[str] = DEFAULT_BUNDLE_FORMATS,
+    unmatched_df: Optional[pd.DataFrame] = None,
+    methods_text: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Union[str, BinaryIO]:
+    """
+    Write the requested outputs into one zip archive.
+
+    Args:
+        match_df: Match result (e.g. from match_postcodes_to_grid); tables
+                  are exported via prepare_export_table.
+        filepath: Destination .zip path, or a writable binary file object
+                  (e.g. tempfile.TemporaryFile()). By default a new
+                  temporary file is created; the caller is responsible
+                  for removing it. If writing fails, the partial archive
+                  at a path (given or created here) is removed.
+        formats: Any of BUNDLE_FORMATS. Table formats apply to the
+                 matched table and, if given, the unmatched table.
+        unmatched_df: Optional unmatched-postcode table (e.g. from
+                      diagnose_unmatched).
+        methods_text: Methods summary text, required for "methods".
+        max_workers: Thread pool size.
+
+    Returns:
+        Path of the written zip archive (filepath itself if it is a file
+        object).
+    """
+    jobs = _bundle_jobs(match_df, formats, unmatched_df, methods_text)
+
+    if filepath is None:
+        fd, filepath = tempfile.mkstemp(prefix="airlock_bundle_", suffix=".zip")
+        os.close(fd)
+    elif isinstance(filepath, str) and not filepath.lower().endswith(".zip"):
+        filepath += ".zip"
+
+    workdir = tempfile.mkdtemp(prefix="airlock_bundle_")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool, \
+                zipfile.ZipFile(filepath, "w") as zf:
+            futures = {
+                pool.submit(write, os.path.join(workdir, name)): name
+                for name, write in jobs.items()
+            }
+
+            # Add each artefact as soon as it is ready; zipfile itself
+            # is only touched from this thread
+            for future in as_completed(futures):
+                future.result()
+                name = futures[future]
+                compression = (
+                    zipfile.ZIP_STORED if name.endswith(_STORED_SUFFIXES)
+                    else zipfile.ZIP_DEFLATED
+                )
+                zf.write(os.path.join(workdir, name), arcname=name,
+                         compress_type=compression)
+    except BaseException:
+        if isinstance(filepath, str):
+            try:
+                os.remove(filepath)
+            except FileNotFoundError:
+                # Failed before the archive was opened
+                pass
+        raise
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return filepath
@@ -0,0 +1,174 @@
+"""
+Compressed sparse row (CSR) index from grid cell to postcodes.
+
+Match results are postcode-centric. Cell-centric questions ("which
+postcodes are in this cell", "postcodes of the 100 most polluted cells")
+would otherwise need a boolean scan over every match row. The CSR index
+stores the matched rows sorted by cell plus one offset per cell, so the
+postcodes of a cell are a contiguous slice found in O(k).
+"""
+
+import os
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# Files written by CellPostcodeIndex.save (one .npy per array)
+_INDEX_ARRAYS = ("cell_ids", "offsets", "rows", "postcodes")
+
+
+@dataclass
+class CellPostcodeIndex:
+    """
+    Grid cell -> matched postcodes, in CSR layout.
+
+    The postcodes of cell_ids[i] are postcodes[offsets[i]:offsets[i + 1]]
+    and rows[...] gives their positions in the source match table.
+    """
+    cell_ids: np.ndarray  # Grid IDs in grid order
+    offsets: np.ndarray  # int64, len(cell_ids) + 1
+    rows: np.ndarray  # int64 match-table positions, grouped by cell
+    postcodes: np.ndarray  # Postcode labels, grouped by cell
+
+    @cached_property
+    def _positions(self) -> pd.Index:
+        return pd.Index(self.cell_ids)
+
+    def __len__(self) -> int:
+        return len(self.cell_ids)
+
+    def counts(self) -> np.ndarray:
+        """Number of postcodes in each cell, aligned with cell_ids."""
+        return np.diff(self.offsets)
+
+    def cell_positions(self, cell_ids: Iterable) -> np.ndarray:
+        """Position of each grid ID in cell_ids; ValueError if unknown."""
+        cell_ids = list(cell_ids)
+        positions = self._positions.get_indexer(cell_ids)
+        if (positions < 0).any():
+            unknown = [c for c, p in zip(cell_ids, positions) if p < 0]
+            raise ValueError(f"Unknown grid cells: {unknown[:10]}")
+        return positions
+
+    def postcodes_in_cell(self, cell_id) -> np.ndarray:
+        """Postcodes matched to one grid cell."""
+        pos = self.cell_positions([cell_id])[0]
+        return self.postcodes[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def rows_in_cell(self, cell_id) -> np.ndarray:
+        """Match-table positions of the postcodes in one grid cell."""
+        pos = self.cell_positions([cell_id])[0]
+        return self.rows[self.offsets[pos]:self.offsets[pos + 1]]
+
+    def _frame(self, positions: np.ndarray) -> pd.DataFrame:
+        starts = self.offsets[positions]
+        counts = self.offsets[positions + 1] - starts
+
+        # Concatenated slices: start of each slice plus a running offset
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        take = np.repeat(starts, counts) + within
+
+        return pd.DataFrame({
+            "grid_id": np.repeat(np.asarray(self.cell_ids)[positions], counts),
+            "postcode": np.asarray(self.postcodes)[take],
+            "row": np.asarray(self.rows)[take],
+        })
+
+    def postcodes_in_cells(self, cell_ids: Sequence) -> pd.DataFrame:
+        """
+        Postcodes of several grid cells.
+
+        Returns:
+            DataFrame with grid_id, postcode and row (match-table
+            position), grouped by cell in the order of cell_ids.
+        """
+        return self._frame(self.cell_positions(cell_ids))
+
+    def postcodes_in_cell_range(self, start: int, stop: int) -> pd.DataFrame:
+        """
+        Postcodes of the cells at positions start..stop-1 of cell_ids.
+
+        The range is one contiguous block of the postcode array.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return self._frame(np.arange(start, max(start, stop)))
+
+    def save(self, directory: str) -> None:
+        """Write the index as .npy files that load_cell_index can mmap."""
+        os.makedirs(directory, exist_ok=True)
+
+        cell_ids = np.asarray(self.cell_ids)
+        if cell_ids.dtype == object:
+            # Object arrays cannot be memory-mapped; let numpy pick an
+            # integer or fixed-width string dtype
+            cell_ids = np.array(cell_ids.tolist())
+
+        arrays = {
+            "cell_ids": cell_ids,
+            "offsets": np.asarray(self.offsets, dtype=np.int64),
+            "rows": np.asarray(self.rows, dtype=np.int64),
+            "postcodes": np.asarray(self.postcodes).astype(str),
+        }
+        for name, values in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), values, allow_pickle=False)
+
+
+def build_cell_index(match_df: pd.DataFrame, cell_ids: Sequence) -> CellPostcodeIndex:
+    """
+    Build a CellPostcodeIndex from a match result.
+
+    Args:
+        match_df: Result of match_postcodes_to_grid (postcode and
+                  matched_grid_id columns).
+        cell_ids: Grid IDs of every cell (e.g. [c.id for c in gridcells]),
+                  which fixes the cell order; cells without postcodes
+                  get an empty slice.
+
+    Returns:
+        CellPostcodeIndex; unmatched rows are not indexed.
+    """
+    for column in ("postcode", "matched_grid_id"):
+        if column not in match_df.columns:
+            raise ValueError(f"Match result missing required column: '{column}'")
+
+    cell_ids = np.asarray(cell_ids, dtype=object)
+    positions = pd.Index(cell_ids)
+    if not positions.is_unique:
+        raise ValueError("Grid IDs must be unique to build a cell index.")
+
+    cell_pos = positions.get_indexer(match_df["matched_grid_id"])
+    matched_rows = np.flatnonzero(cell_pos >= 0)
+
+    order = np.argsort(cell_pos[matched_rows], kind="stable")
+    rows = matched_rows[order]
+
+    counts = np.bincount(cell_pos[matched_rows], minlength=len(cell_ids))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    return CellPostcodeIndex(
+        cell_ids=cell_ids,
+        offsets=offsets,
+        rows=rows.astype(np.int64),
+        postcodes=match_df["postcode"].to_numpy()[rows],
+    )
+
+
+def load_cell_index(directory: str, mmap: bool = True) -> CellPostcodeIndex:
+    """
+    Load an index written by CellPostcodeIndex.save.
+
+    Args:
+        directory: Index directory.
+        mmap: If True, arrays are memory-mapped read-only, so opening a
+              national index is instant and only touched pages are read.
+    """
+    mode = "r" if mmap else None
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+        for name in _INDEX_ARRAYS
+    }
+    return CellPostcodeIndex(**arrays)
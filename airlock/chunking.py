@@ -0,0 +1,70 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+# Rows read in the first (probe) chunk, before any measurement exists
+PROBE_CHUNK_SIZE = 10_000
+
+# Bounds applied to every adaptively chosen chunk size
+MIN_CHUNK_SIZE = 1_000
+MAX_CHUNK_SIZE = 5_000_000
+
+
+@dataclass
+class AdaptiveChunkSizer:
+    """
+    Choose chunk sizes that fit a memory budget.
+
+    The first chunk uses a fixed probe size. After each chunk the caller
+    reports how many bytes it occupied (summed over every structure alive
+    at the same time: raw rows, model objects, match results), and later
+    chunks are sized so that one chunk uses at most target_fraction of the
+    budget. The remainder of the budget is headroom for allocator overhead
+    and temporaries that are not measured.
+    """
+    memory_budget_bytes: int
+    target_fraction: float = 0.5
+    probe_chunk_size: int = PROBE_CHUNK_SIZE
+    bytes_per_row: Optional[float] = None
+    chunk_sizes: List[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if self.memory_budget_bytes <= 0:
+            raise ValueError("memory_budget_bytes must be positive.")
+        if not 0 < self.target_fraction <= 1:
+            raise ValueError("target_fraction must be in (0, 1].")
+
+    def next_chunk_size(self) -> int:
+        """Return the size for the next chunk and record it."""
+        if self.bytes_per_row is None:
+            size = self.probe_chunk_size
+        else:
+            size = int(self.memory_budget_bytes * self.target_fraction / self.bytes_per_row)
+
+        size = max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, size))
+        self.chunk_sizes.append(size)
+        return size
+
+    def observe(self, n_rows: int, nbytes: int) -> None:
+        """
+        Record the measured footprint of a processed chunk.
+
+        The largest bytes-per-row seen so far is kept, so a chunk with
+        unusually wide rows shrinks all later chunks.
+        """
+        if n_rows <= 0:
+            return
+
+        per_row = nbytes / n_rows
+        if self.bytes_per_row is None or per_row > self.bytes_per_row:
+            self.bytes_per_row = per_row
+
+    def to_metadata(self) -> dict:
+        """Return the chosen chunking parameters for run metadata."""
+        return {
+            "memory_budget_bytes": int(self.memory_budget_bytes),
+            "bytes_per_row": (
+                float(self.bytes_per_row) if self.bytes_per_row is not None else None
+            ),
+            "chunk_sizes": list(self.chunk_sizes),
+        }
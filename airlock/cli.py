@@ -0,0 +1,82 @@
+"""
+Command-line matching of server-side files.
+
+Usage:
+    python -m airlock.cli [--data-dir DIR] list
+    python -m airlock.cli [--data-dir DIR] [--cache-dir DIR] match NOX ONSPD
+        [--output FILE.zip] [--formats xlsx parquet csv methods] [--unmatched]
+
+NOX and ONSPD are absolute paths or names relative to the data
+directory (DATA_DIR). Identical runs are served from the run cache.
+"""
+
+import argparse
+import sys
+from typing import Any, List, Optional
+
+from .bundle_export import BUNDLE_FORMATS, DEFAULT_BUNDLE_FORMATS, export_bundle
+from .run_cache import RUN_CACHE_DIR, RunCache, cached_match_run
+from .server_files import DATA_DIR, list_data_files, resolve_data_path
+
+
+def _cmd_list(args: Any) -> int:
+    for name in list_data_files(args.data_dir):
+        print(name)
+    return 0
+
+
+def _cmd_match(args: Any) -> int:
+    nox_path = resolve_data_path(args.nox, args.data_dir)
+    pc_path = resolve_data_path(args.onspd, args.data_dir)
+
+    run, hit = cached_match_run(nox_path, pc_path, RunCache(args.cache_dir))
+
+    summary = run["summary"]
+    print(
+        f"{summary['matched']} of {summary['total_postcodes']} postcodes matched "
+        f"({summary['match_rate'] * 100:.2f}%)" + (" [cached]" if hit else "")
+    )
+
+    path = export_bundle(
+        run["match"],
+        args.output,
+        formats=args.formats,
+        unmatched_df=run["unmatched"] if args.unmatched else None,
+        methods_text=run["methods_text"],
+    )
+    print(f"Wrote {path}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns the exit status."""
+    parser = argparse.ArgumentParser(prog="python -m airlock.cli")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Data directory.")
+    parser.add_argument("--cache-dir", default=RUN_CACHE_DIR, help="Run cache directory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="List data files in the data directory.")
+    list_parser.set_defaults(func=_cmd_list)
+
+    match_parser = sub.add_parser("match", help="Match two server-side files and export.")
+    match_parser.add_argument("nox", help="NOx grid file.")
+    match_parser.add_argument("onspd", help="ONSPD postcode file.")
+    match_parser.add_argument("--output", default="airlock_outputs.zip", help="Zip to write.")
+    match_parser.add_argument(
+        "--formats",
+        nargs="+",
+        choices=BUNDLE_FORMATS,
+        default=list(DEFAULT_BUNDLE_FORMATS),
+        help="Outputs to include in the zip.",
+    )
+    match_parser.add_argument(
+        "--unmatched", action="store_true", help="Also export unmatched-postcode diagnostics."
+    )
+    match_parser.set_defaults(func=_cmd_match)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
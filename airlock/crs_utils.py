@@ -1,22 +1,26 @@
-from typing import Tuple
+from __future__ import annotations
 
-import geopandas as gpd
-from pyproj import Transformer
+from functools import lru_cache
+from typing import TYPE_CHECKING, Tuple
 
 from .config import CRS_OSGB36, CRS_WGS84
 
-# Pre-built transformers for performance and reuse
-_transformer_wgs84_to_osgb36 = Transformer.from_crs(
-    CRS_WGS84,
-    CRS_OSGB36,
-    always_xy=True,
-)
+if TYPE_CHECKING:
+    import geopandas as gpd
+    from pyproj import Transformer
 
-_transformer_osgb36_to_wgs84 = Transformer.from_crs(
-    CRS_OSGB36,
-    CRS_WGS84,
-    always_xy=True,
-)
+
+@lru_cache(maxsize=None)
+def get_transformer(source_crs: str, target_crs: str) -> Transformer:
+    """
+    Build a pyproj Transformer on first use and reuse it afterwards.
+
+    pyproj is imported here rather than at module level, so importing
+    airlock does not pay for loading the PROJ database.
+    """
+    from pyproj import Transformer
+
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
 
 
 def wgs84_to_osgb36(lon: float, lat: float) -> Tuple[float, float]:
@@ -30,7 +34,7 @@ def wgs84_to_osgb36(lon: float, lat: float) -> Tuple[float, float]:
     Returns:
         (easting, northing) in metres (OSGB36 / British National Grid).
     """
-    easting, northing = _transformer_wgs84_to_osgb36.transform(lon, lat)
+    easting, northing = get_transformer(CRS_WGS84, CRS_OSGB36).transform(lon, lat)
     return float(easting), float(northing)
 
 
@@ -45,7 +49,7 @@ def osgb36_to_wgs84(easting: float, northing: float) -> Tuple[float, float]:
     Returns:
         (longitude, latitude) in degrees (WGS84).
     """
-    lon, lat = _transformer_osgb36_to_wgs84.transform(easting, northing)
+    lon, lat = get_transformer(CRS_OSGB36, CRS_WGS84).transform(easting, northing)
     return float(lon), float(lat)
 
 
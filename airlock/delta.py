@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import CRS_OSGB36
+from .filters import filter_postcodes_basic
+from .models import GridCell
+from .postcode_keys import frame_postcode_keys
+from .spatial_index import build_grid_tree, query_points_within
+from .validation import validate_postcode_columns
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+# Change types reported by rematch_incremental
+CHANGE_ADDED = "added"
+CHANGE_MOVED = "moved"
+CHANGE_REMOVED = "removed"
+
+MATCH_COLUMNS = ["postcode", "easting", "northing", "matched_grid_id"]
+
+
+def _first_containing_cell(
+    eastings: np.ndarray,
+    northings: np.ndarray,
+    gridcells: List[GridCell],
+) -> np.ndarray:
+    """Grid ID of the first cell containing each point (NaN if none)."""
+    tree = build_grid_tree([c.geometry for c in gridcells])
+    grid_ids = np.array([c.id for c in gridcells], dtype=object)
+
+    point_idx, cell_idx = query_points_within(tree, eastings, northings)
+    first_points, first_pos = np.unique(point_idx, return_index=True)
+
+    result = np.full(len(eastings), np.nan, dtype=object)
+    result[first_points] = grid_ids[cell_idx[first_pos]]
+    return result
+
+
+def rematch_incremental(
+    previous_match: pd.DataFrame,
+    new_postcodes: pd.DataFrame,
+    gridcells: List[GridCell],
+    apply_basic_filters: bool = True,
+) -> Tuple[gpd.GeoDataFrame, pd.DataFrame]:
+    """
+    Update a previous match result for a new ONSPD release.
+
+    Postcodes are compared by packed postcode key and coordinates.
+    Only added postcodes and postcodes whose coordinates changed are
+    rematched (to the first grid cell containing them); every other row
+    is carried forward from previous_match. The grid is assumed to be
+    the same as in the previous run.
+
+    Args:
+        previous_match: Previous result of match_postcodes_to_grid (or its
+                        exported table) with postcode, easting, northing
+                        and matched_grid_id columns.
+        new_postcodes: New ONSPD-style DataFrame (pcd, oseast1m, osnrth1m).
+        gridcells: List of GridCell models.
+        apply_basic_filters: If True, clean the new release with
+                             filter_postcodes_basic first.
+
+    Returns:
+        (match_gdf, change_report)
+        - match_gdf: full result for the new release, in its row order,
+          with the columns of match_postcodes_to_grid.
+        - change_report: one row per added, moved or removed postcode:
+            postcode, change, old_easting, old_northing, new_easting,
+            new_northing, old_grid_id, new_grid_id, cell_changed
+    """
+    import geopandas as gpd
+
+    missing_prev = [c for c in MATCH_COLUMNS if c not in previous_match.columns]
+    if missing_prev:
+        raise ValueError(f"Previous match result missing columns: {missing_prev}")
+
+    is_valid, missing = validate_postcode_columns(new_postcodes.columns)
+    if not is_valid:
+        raise ValueError(f"Postcode dataset missing required columns: {missing}")
+
+    if apply_basic_filters:
+        new_postcodes = filter_postcodes_basic(new_postcodes)
+
+    new = pd.DataFrame({
+        "key": frame_postcode_keys(new_postcodes, "pcd"),
+        "new_postcode": new_postcodes["pcd"].astype(str).to_numpy(),
+        "new_easting": pd.to_numeric(new_postcodes["oseast1m"], errors="coerce").to_numpy(),
+        "new_northing": pd.to_numeric(new_postcodes["osnrth1m"], errors="coerce").to_numpy(),
+    })
+    new = new.dropna(subset=["new_easting", "new_northing"])
+    new["order"] = np.arange(len(new))
+
+    prev_keys = frame_postcode_keys(previous_match)
+    prev = previous_match[MATCH_COLUMNS].reset_index(drop=True)
+    prev_first = pd.DataFrame({
+        "key": prev_keys,
+        "old_postcode": prev["postcode"].to_numpy(),
+        "old_easting": prev["easting"].to_numpy(dtype=float),
+        "old_northing": prev["northing"].to_numpy(dtype=float),
+        "old_grid_id": prev["matched_grid_id"].to_numpy(dtype=object),
+    }).drop_duplicates(subset=["key"])
+
+    aligned = new.merge(prev_first, on="key", how="outer", indicator=True)
+
+    added = (aligned["_merge"] == "left_only").to_numpy()
+    removed = (aligned["_merge"] == "right_only").to_numpy()
+    both = (aligned["_merge"] == "both").to_numpy()
+    moved = both & (
+        (aligned["new_easting"].to_numpy() != aligned["old_easting"].to_numpy())
+        | (aligned["new_northing"].to_numpy() != aligned["old_northing"].to_numpy())
+    )
+    unchanged = both & ~moved
+
+    # Rematch only added and moved postcodes
+    to_match = aligned[added | moved]
+    new_grid_ids = _first_containing_cell(
+        to_match["new_easting"].to_numpy(dtype=float),
+        to_match["new_northing"].to_numpy(dtype=float),
+        gridcells,
+    )
+    rematched = pd.DataFrame({
+        "postcode": to_match["new_postcode"].to_numpy(),
+        "easting": to_match["new_easting"].to_numpy(),
+        "northing": to_match["new_northing"].to_numpy(),
+        "matched_grid_id": new_grid_ids,
+        "postcode_key": to_match["key"].to_numpy(dtype=np.int64),
+        "order": to_match["order"].to_numpy(),
+    })
+
+    # Carry forward every previous row of unchanged postcodes
+    unchanged_keys = aligned.loc[unchanged, ["key", "order"]]
+    carried = prev.assign(key=prev_keys).merge(unchanged_keys, on="key")
+    carried = carried[MATCH_COLUMNS + ["key", "order"]].rename(columns={"key": "postcode_key"})
+
+    combined = pd.concat([carried, rematched], ignore_index=True)
+    combined = combined.sort_values("order", kind="stable").drop(columns=["order"])
+    combined = combined.reset_index(drop=True)
+
+    match_gdf = gpd.GeoDataFrame(
+        combined,
+        geometry=gpd.points_from_xy(combined["easting"], combined["northing"]),
+        crs=CRS_OSGB36,
+    )
+
+    # Change report
+    is_change = added | moved | removed
+    changed = aligned[is_change].copy()
+    changed["change"] = np.select(
+        [added[is_change], moved[is_change]],
+        [CHANGE_ADDED, CHANGE_MOVED],
+        default=CHANGE_REMOVED,
+    )
+    changed["new_grid_id"] = changed["order"].map(
+        rematched.set_index("order")["matched_grid_id"]
+    )
+    changed["postcode"] = changed["new_postcode"].fillna(changed["old_postcode"])
+    changed["cell_changed"] = ~(
+        (changed["old_grid_id"] == changed["new_grid_id"])
+        | (changed["old_grid_id"].isna() & changed["new_grid_id"].isna())
+    )
+
+    change_report = changed[[
+        "postcode",
+        "change",
+        "old_easting",
+        "old_northing",
+        "new_easting",
+        "new_northing",
+        "old_grid_id",
+        "new_grid_id",
+        "cell_changed",
+    ]].reset_index(drop=True)
+
+    return match_gdf, change_report
@@ -0,0 +1,171 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .grid_builder import cell_polygons_from_centres, grid_ids_from_dataframe
+from .lattice import build_lattice, lookup_cells
+from .postcode_keys import frame_postcode_keys
+from .spatial_index import build_grid_tree, query_nearest_cells
+from .validation import (
+    BNG_EASTING_MAX,
+    BNG_EASTING_MIN,
+    BNG_NORTHING_MAX,
+    BNG_NORTHING_MIN,
+    validate_postcode_columns,
+)
+
+
+# Reasons assigned by diagnose_unmatched, in order of precedence
+REASON_INVALID_COORDINATES = "invalid_coordinates"
+REASON_TERMINATED = "terminated"
+REASON_OUTSIDE_EXTENT = "outside_extent"
+REASON_ON_CELL_BOUNDARY = "on_cell_boundary"
+REASON_MISSING_CELL = "missing_cell"
+
+UNMATCHED_REASONS = (
+    REASON_INVALID_COORDINATES,
+    REASON_TERMINATED,
+    REASON_OUTSIDE_EXTENT,
+    REASON_ON_CELL_BOUNDARY,
+    REASON_MISSING_CELL,
+)
+
+# Placeholder coordinate values used in ONSPD for postcodes without a
+# usable grid reference
+SENTINEL_COORDINATES = (0, 1, 99999, 999999)
+
+
+def diagnose_unmatched(
+    postcodes: pd.DataFrame,
+    match_df: pd.DataFrame,
+    grid_df: pd.DataFrame,
+    termination_column: Optional[str] = "doterm",
+    id_column: Optional[str] = "GridCode",
+) -> pd.DataFrame:
+    """
+    Explain why postcodes did not match a grid cell.
+
+    Every postcode in the raw ONSPD table without a matched row in
+    match_df (including rows dropped by the basic filters) is given
+    the first reason that applies:
+
+        - invalid_coordinates: missing, non-numeric, placeholder (0, 1,
+          99999, ...) or outside the BNG range
+        - terminated: has a termination date
+        - outside_extent: outside the grid's bounding extent
+        - on_cell_boundary: exactly on an edge of an existing cell (the
+          point-in-polygon test excludes boundaries)
+        - missing_cell: inside the extent where the grid has no cell
+          (holes, coastline)
+
+    All rows are classified together with array operations; the
+    nearest cell comes from one bulk STRtree query.
+
+    Args:
+        postcodes: Raw ONSPD-style DataFrame (pcd, oseast1m, osnrth1m,
+                   optionally doterm).
+        match_df: Result of match_postcodes_to_grid.
+        grid_df: NOx grid DataFrame with X/Y columns.
+        termination_column: Termination date column (None to skip).
+        id_column: Grid identifier column, as in gridcells_from_geodataframe.
+
+    Returns:
+        DataFrame with one row per unmatched postcode:
+            - postcode
+            - easting
+            - northing
+            - reason
+            - nearest_grid_id (missing for invalid coordinates)
+            - nearest_cell_distance_m (0 for points on a cell boundary)
+    """
+    is_valid, missing = validate_postcode_columns(postcodes.columns)
+    if not is_valid:
+        raise ValueError(f"Postcode dataset missing required columns: {missing}")
+
+    # Postcodes with at least one matched row are excluded
+    matched_rows = match_df["matched_grid_id"].notna().to_numpy()
+    matched_keys = frame_postcode_keys(match_df)[matched_rows]
+    unmatched = ~np.isin(frame_postcode_keys(postcodes, "pcd"), matched_keys)
+    rows = postcodes[unmatched]
+
+    x = pd.to_numeric(rows["oseast1m"], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(rows["osnrth1m"], errors="coerce").to_numpy(dtype=float)
+
+    invalid = (
+        np.isnan(x) | np.isnan(y)
+        | np.isin(x, SENTINEL_COORDINATES) | np.isin(y, SENTINEL_COORDINATES)
+        | (x < BNG_EASTING_MIN) | (x > BNG_EASTING_MAX)
+        | (y < BNG_NORTHING_MIN) | (y > BNG_NORTHING_MAX)
+    )
+
+    if termination_column and termination_column in rows.columns:
+        doterm = rows[termination_column].astype("string").str.strip()
+        terminated = (doterm.fillna("") != "").to_numpy()
+    else:
+        terminated = np.zeros(len(rows), dtype=bool)
+
+    lattice = build_lattice(grid_df)
+    minx, miny, maxx, maxy = lattice.bounds
+    outside = (x < minx) | (x > maxx) | (y < miny) | (y > maxy)
+
+    # Lattice position; on a grid line the point touches the cells on
+    # both sides of it
+    fx = (x - lattice.origin_x) / lattice.cell_size
+    fy = (y - lattice.origin_y) / lattice.cell_size
+    with np.errstate(invalid="ignore"):
+        on_x = fx == np.round(fx)
+        on_y = fy == np.round(fy)
+    col = np.where(np.isnan(fx), -1, np.floor(fx)).astype(np.int64)
+    row = np.where(np.isnan(fy), -1, np.floor(fy)).astype(np.int64)
+
+    touches_cell = np.zeros(len(rows), dtype=bool)
+    for dc in (0, 1):
+        for dr in (0, 1):
+            touches_cell |= lookup_cells(lattice, col - dc * on_x, row - dr * on_y) >= 0
+    on_boundary = (on_x | on_y) & touches_cell
+
+    reason = np.select(
+        [invalid, terminated, outside, on_boundary],
+        [REASON_INVALID_COORDINATES, REASON_TERMINATED, REASON_OUTSIDE_EXTENT,
+         REASON_ON_CELL_BOUNDARY],
+        default=REASON_MISSING_CELL,
+    )
+
+    tree = build_grid_tree(cell_polygons_from_centres(grid_df["X"], grid_df["Y"]))
+    grid_ids = grid_ids_from_dataframe(grid_df, id_column)
+    nearest, distance = query_nearest_cells(
+        tree, np.where(invalid, np.nan, x), np.where(invalid, np.nan, y)
+    )
+
+    nearest_ids = np.full(len(rows), None, dtype=object)
+    nearest_ids[nearest >= 0] = grid_ids[nearest[nearest >= 0]]
+
+    return pd.DataFrame({
+        "postcode": rows["pcd"].astype(str).to_numpy(),
+        "easting": x,
+        "northing": y,
+        "reason": reason.astype(object),
+        "nearest_grid_id": nearest_ids,
+        "nearest_cell_distance_m": distance,
+    })
+
+
+def summarize_unmatched_reasons(diagnostics: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count unmatched postcodes per reason.
+
+    Returns:
+        DataFrame with one row per reason in UNMATCHED_REASONS (zero
+        counts included): reason, count, share, median_distance_m.
+    """
+    grouped = diagnostics.groupby("reason")["nearest_cell_distance_m"]
+    counts = grouped.size().reindex(UNMATCHED_REASONS, fill_value=0)
+    total = int(counts.sum())
+
+    return pd.DataFrame({
+        "reason": list(UNMATCHED_REASONS),
+        "count": counts.to_numpy(dtype=np.int64),
+        "share": counts.to_numpy(dtype=float) / total if total else 0.0,
+        "median_distance_m": grouped.median().reindex(UNMATCHED_REASONS).to_numpy(),
+    })
@@ -1,5 +1,13 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+
 import pandas as pd
-from geopandas import GeoDataFrame
+
+if TYPE_CHECKING:
+    from geopandas import GeoDataFrame
+
+from .postcode_keys import frame_postcode_keys
 
 
 def prepare_export_table(match_gdf: GeoDataFrame) -> pd.DataFrame:
@@ -14,14 +22,22 @@ def prepare_export_table(match_gdf: GeoDataFrame) -> pd.DataFrame:
         - matched_grid_id
     """
 
-    # Drop geometry column for Excel export
-    if "geometry" in match_gdf.columns:
-        df = match_gdf.drop(columns=["geometry"]).copy()
-    else:
-        df = match_gdf.copy()
+    # Packed keys carried by the match result (encoded only if absent)
+    keys = frame_postcode_keys(match_gdf)
+
+    # Drop geometry and key columns for Excel export. drop() returns a
+    # new frame, so the sort key column below never touches match_gdf.
+    df = match_gdf.drop(columns=["geometry", "postcode_key"], errors="ignore")
 
-    # Sort by grid ID then postcode for readability
-    df = df.sort_values(by=["matched_grid_id", "postcode"], na_position="last")
+    # Sort by grid ID then postcode for readability. Packed keys sort in
+    # postcode order; malformed postcodes (negative keys) fall back to
+    # comparing the strings.
+    if (keys >= 0).all():
+        df["_postcode_key"] = keys
+        df = df.sort_values(by=["matched_grid_id", "_postcode_key"], na_position="last")
+        df = df.drop(columns=["_postcode_key"])
+    else:
+        df = df.sort_values(by=["matched_grid_id", "postcode"], na_position="last")
 
     return df.reset_index(drop=True)
 
@@ -38,3 +54,30 @@ def export_to_excel(df: pd.DataFrame, filepath: str) -> None:
         filepath += ".xlsx"
 
     df.to_excel(filepath, index=False)
+
+
+def export_chunks_to_csv(chunks: Iterable[pd.DataFrame], filepath: str) -> int:
+    """
+    Stream match result chunks (e.g. from iter_match_chunks) to one CSV.
+
+    Each chunk is written as soon as it arrives, so memory use does not
+    grow with the number of postcodes. Geometry and postcode_key columns
+    are dropped. Rows are written in arrival order (not sorted as in
+    prepare_export_table).
+
+    Returns:
+        Number of data rows written.
+    """
+
+    # Ensure .csv extension
+    if not filepath.lower().endswith(".csv"):
+        filepath += ".csv"
+
+    rows_written = 0
+    with open(filepath, "w", newline="", encoding="utf-8") as fh:
+        for i, chunk in enumerate(chunks):
+            chunk = chunk.drop(columns=["geometry", "postcode_key"], errors="ignore")
+            chunk.to_csv(fh, index=False, header=(i == 0))
+            rows_written += len(chunk)
+
+    return rows_written
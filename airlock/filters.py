@@ -4,6 +4,9 @@ from typing import Optional
 
 import pandas as pd
 
+from .arrow_io import as_dataframe
+from .postcode_keys import frame_postcode_keys
+
 
 def filter_postcodes_basic(
     df: pd.DataFrame,
@@ -20,10 +23,19 @@ def filter_postcodes_basic(
         - Optionally drop duplicate postcodes
         - Optionally keep only active (non-terminated) postcodes
 
+    Each step selects rows into a new frame, so the input is never
+    modified and no deep copy is taken; when no step applies a shallow
+    copy is returned, never the input itself.
+
     Args:
-        df: Input postcode DataFrame.
+        df: Input postcode DataFrame (or Arrow table).
         drop_missing_coords: If True, drop rows with NaN in oseast1m/osnrth1m.
         drop_duplicates: If True, drop duplicate 'pcd' values (keep first).
+                         Postcodes are compared by packed integer key, so
+                         spacing/case variants count as duplicates. An
+                         existing postcode_key column is reused; otherwise
+                         the keys are encoded once and kept as a
+                         postcode_key column for later steps.
         termination_column: Column indicating termination date (e.g. 'doterm').
         only_active: If True, keep only rows where termination_column is NaN or empty.
 
@@ -31,7 +43,7 @@ def filter_postcodes_basic(
         Cleaned DataFrame.
     """
 
-    cleaned = df.copy()
+    cleaned = as_dataframe(df)
 
     # 1) Drop missing coordinates
     if drop_missing_coords:
@@ -48,6 +60,12 @@ def filter_postcodes_basic(
 
     # 3) Drop duplicate postcodes
     if drop_duplicates and "pcd" in cleaned.columns:
-        cleaned = cleaned.drop_duplicates(subset=["pcd"])
+        if "postcode_key" not in cleaned.columns:
+            cleaned = cleaned.assign(postcode_key=frame_postcode_keys(cleaned, "pcd"))
+        cleaned = cleaned[~cleaned["postcode_key"].duplicated()]
+
+    # No step applied: never hand back the caller's own frame
+    if cleaned is df:
+        cleaned = cleaned.copy(deep=False)
 
     return cleaned
@@ -1,14 +1,21 @@
-from typing import List
+from __future__ import annotations
 
-import geopandas as gpd
-from shapely.geometry import Polygon
+from typing import TYPE_CHECKING, List
 
+import numpy as np
+import pandas as pd
+
+from .arrow_io import as_dataframe
 from .config import (
     CRS_OSGB36,
     GRID_CELL_SIZE_M,
 )
 from .models import GridCell
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+    from shapely.geometry import Polygon
+
 
 def cell_polygon_from_center(x: float, y: float) -> Polygon:
     """
@@ -17,6 +24,8 @@ def cell_polygon_from_center(x: float, y: float) -> Polygon:
 
     NOx cells are 1 km × 1 km, so half-size = 500 m in each direction.
     """
+    from shapely.geometry import Polygon
+
     half = GRID_CELL_SIZE_M / 2
 
     return Polygon([
@@ -27,13 +36,39 @@ def cell_polygon_from_center(x: float, y: float) -> Polygon:
     ])
 
 
+def cell_polygons_from_centres(x, y) -> np.ndarray:
+    """
+    Vectorized cell_polygon_from_center for arrays of centre coordinates.
+
+    Returns:
+        Object array of shapely Polygons with the same corner order as
+        cell_polygon_from_center.
+    """
+    import shapely
+
+    half = GRID_CELL_SIZE_M / 2
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    rings = np.stack([
+        np.column_stack([x - half, y - half]),
+        np.column_stack([x + half, y - half]),
+        np.column_stack([x + half, y + half]),
+        np.column_stack([x - half, y + half]),
+    ], axis=1)
+    return shapely.polygons(rings)
+
+
 def build_grid_geodataframe(df) -> gpd.GeoDataFrame:
     """
     Convert a NOx grid DataFrame with X/Y columns into a GeoDataFrame
     containing 1 km grid polygons.
 
+    The result is a shallow copy: the input columns are shared, not
+    copied, and pandas copy-on-write keeps the input unchanged.
+
     Args:
-        df: Pandas DataFrame with at least columns "X" and "Y".
+        df: Pandas DataFrame (or Arrow table) with at least columns "X" and "Y".
 
     Returns:
         GeoDataFrame containing:
@@ -41,18 +76,38 @@ def build_grid_geodataframe(df) -> gpd.GeoDataFrame:
         - geometry column with 1 km polygons
         - CRS set to OSGB36
     """
+    import geopandas as gpd
+
+    df = as_dataframe(df)
     if "X" not in df.columns or "Y" not in df.columns:
         raise ValueError("NOx dataset must contain 'X' and 'Y' columns.")
 
-    geometries: List[Polygon] = [
-        cell_polygon_from_center(row["X"], row["Y"])
-        for _, row in df.iterrows()
-    ]
+    geometries = cell_polygons_from_centres(df["X"], df["Y"])
 
-    gdf = gpd.GeoDataFrame(df.copy(), geometry=geometries, crs=CRS_OSGB36)
+    gdf = gpd.GeoDataFrame(df.copy(deep=False), geometry=geometries, crs=CRS_OSGB36)
     return gdf
 
 
+def grid_ids_from_dataframe(
+    df: pd.DataFrame,
+    id_column: str | None = "GridCode",
+) -> np.ndarray:
+    """
+    Vectorized grid cell identifiers, matching gridcells_from_geodataframe.
+
+    Uses id_column when present, otherwise the "<X>_<Y>" fallback.
+
+    Returns:
+        Object array of string IDs aligned with df's rows.
+    """
+    if id_column is not None and id_column in df.columns:
+        return df[id_column].astype(str).to_numpy(dtype=object)
+
+    x = pd.to_numeric(df["X"]).astype(np.int64).astype(str)
+    y = pd.to_numeric(df["Y"]).astype(np.int64).astype(str)
+    return (x + "_" + y).to_numpy(dtype=object)
+
+
 def gridcells_from_geodataframe(
     gdf: gpd.GeoDataFrame,
     id_column: str | None = "GridCode",
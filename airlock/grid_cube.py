@@ -0,0 +1,206 @@
+"""
+Multi-pollutant, multi-year grid cube.
+
+PCM grids for different pollutants and years share the same 1 km BNG
+lattice. A GridCube aligns any number of them into one (cell × layer)
+value array keyed by global cell key, so a postcode set is located once
+and every pollutant-year value is gathered with a single index lookup.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import GRID_CELL_SIZE_M, NOX_OPTIONAL_COLUMNS
+from .lattice import INVALID_CELL_KEY, cell_key_centres, grid_cell_keys
+from .located_postcodes import LocatedPostcodes, locate_postcodes
+from .readers import read_table
+
+
+# (pollutant, year) label of one cube layer, e.g. ("NO2", 2019)
+LayerKey = Tuple[str, int]
+
+SAMPLE_LAYOUTS = ("wide", "long")
+
+# Columns that are never pollutant values
+_NON_VALUE_COLUMNS = {"x", "y", "gridcode"}
+
+
+@dataclass
+class GridCube:
+    """
+    Pollutant-year values aligned on the union of all grid cells.
+
+    values[i, j] is the value of layers[j] in the cell with global key
+    cell_keys[i], NaN where that layer's grid has no cell.
+    """
+    cell_keys: np.ndarray  # Sorted unique global cell keys
+    layers: List[LayerKey]
+    values: np.ndarray  # (n_cells, n_layers) float
+    cell_size: float = GRID_CELL_SIZE_M
+
+    @property
+    def layer_names(self) -> List[str]:
+        """Column names of the layers in wide output ("NO2_2019")."""
+        return [f"{pollutant}_{year}" for pollutant, year in self.layers]
+
+    def cell_positions(self, keys: np.ndarray) -> np.ndarray:
+        """Row position in values for each global key, -1 if absent."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(self.cell_keys) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+
+        pos = np.searchsorted(self.cell_keys, keys)
+        pos = np.minimum(pos, len(self.cell_keys) - 1)
+        found = (self.cell_keys[pos] == keys) & (keys != INVALID_CELL_KEY)
+        return np.where(found, pos, -1)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Wide table with one row per cell: X, Y and one column per layer."""
+        x, y = cell_key_centres(self.cell_keys, self.cell_size)
+        frame = pd.DataFrame({"X": x, "Y": y})
+        for j, name in enumerate(self.layer_names):
+            frame[name] = self.values[:, j]
+        return frame
+
+
+def _value_column(df: pd.DataFrame) -> str:
+    """The single pollutant value column of a grid table."""
+    candidates = [
+        c for c in df.columns
+        if c.lower() not in _NON_VALUE_COLUMNS and pd.api.types.is_numeric_dtype(df[c])
+    ]
+    if len(candidates) == 1:
+        return candidates[0]
+
+    known = [c for c in NOX_OPTIONAL_COLUMNS if c in candidates]
+    if known:
+        return known[0]
+
+    raise ValueError(
+        f"Cannot choose a value column from {candidates}; pass value_columns."
+    )
+
+
+def build_grid_cube(
+    grids: Mapping[LayerKey, pd.DataFrame],
+    value_columns: Optional[Mapping[LayerKey, str]] = None,
+    cell_size: float = GRID_CELL_SIZE_M,
+) -> GridCube:
+    """
+    Align pollutant-year grid tables into one GridCube.
+
+    Grids may differ in extent and missing cells; the cube covers the
+    union of their cells.
+
+    Args:
+        grids: {(pollutant, year): grid DataFrame with X/Y centre columns}.
+        value_columns: Optional {(pollutant, year): value column}. By
+                       default the single numeric column other than
+                       X/Y/GridCode is used.
+        cell_size: Cell edge length in metres.
+
+    Returns:
+        GridCube with layers in the order of grids.
+    """
+    if not grids:
+        raise ValueError("At least one grid is required.")
+
+    layers = list(grids)
+    keys_per_layer = [grid_cell_keys(grids[layer], cell_size) for layer in layers]
+    cell_keys = np.unique(np.concatenate(keys_per_layer))
+
+    values = np.full((len(cell_keys), len(layers)), np.nan)
+    for j, (layer, keys) in enumerate(zip(layers, keys_per_layer)):
+        df = grids[layer]
+        column = (value_columns or {}).get(layer) or _value_column(df)
+        if column not in df.columns:
+            raise ValueError(f"Grid {layer} missing value column: '{column}'")
+
+        values[np.searchsorted(cell_keys, keys), j] = pd.to_numeric(
+            df[column], errors="coerce"
+        ).to_numpy(dtype=float)
+
+    return GridCube(cell_keys=cell_keys, layers=layers, values=values, cell_size=cell_size)
+
+
+def read_grid_cube(
+    sources: Mapping[LayerKey, Any],
+    value_columns: Optional[Mapping[LayerKey, str]] = None,
+    cell_size: float = GRID_CELL_SIZE_M,
+    max_workers: Optional[int] = None,
+) -> GridCube:
+    """
+    Read pollutant-year grid files concurrently and build a GridCube.
+
+    Args:
+        sources: {(pollutant, year): path or file-like (.csv, .gz, .zip)}.
+        value_columns: As in build_grid_cube.
+        cell_size: Cell edge length in metres.
+        max_workers: Thread pool size for reading.
+    """
+    layers = list(sources)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(pool.map(lambda layer: read_table(sources[layer]), layers))
+
+    return build_grid_cube(dict(zip(layers, frames)), value_columns, cell_size)
+
+
+def sample_grid_cube(
+    cube: GridCube,
+    postcodes: Union[pd.DataFrame, LocatedPostcodes],
+    layout: str = "wide",
+    apply_basic_filters: bool = True,
+) -> pd.DataFrame:
+    """
+    Gather every pollutant-year value of a cube at each postcode.
+
+    Postcodes are located once on the global lattice; all layers are then
+    read with a single fancy index into the cube. Points exactly on a
+    cell edge get no value, as with match_postcodes_to_grid.
+
+    Args:
+        cube: GridCube from build_grid_cube.
+        postcodes: ONSPD-style DataFrame (pcd, oseast1m, osnrth1m), or
+                   LocatedPostcodes from locate_postcodes to skip locating.
+        layout: "wide" (one column per layer) or "long" (one row per
+                postcode and layer).
+        apply_basic_filters: If True, apply filter_postcodes_basic first
+                             (DataFrame input only).
+
+    Returns:
+        wide: postcode, easting, northing, <pollutant>_<year>, ...
+        long: postcode, pollutant, year, value
+    """
+    if layout not in SAMPLE_LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}'. Expected one of {SAMPLE_LAYOUTS}.")
+
+    if isinstance(postcodes, LocatedPostcodes):
+        located = postcodes
+    else:
+        located = locate_postcodes(postcodes, cube.cell_size, apply_basic_filters)
+
+    if located.cell_size != cube.cell_size:
+        raise ValueError("Postcodes were located with a different cell size than the cube.")
+
+    x, y, labels = located.easting, located.northing, located.postcodes
+    pos = cube.cell_positions(located.cell_keys)
+    sampled = np.full((len(pos), len(cube.layers)), np.nan)
+    sampled[pos >= 0] = cube.values[pos[pos >= 0]]
+
+    if layout == "wide":
+        result = pd.DataFrame({"postcode": labels, "easting": x, "northing": y})
+        for j, name in enumerate(cube.layer_names):
+            result[name] = sampled[:, j]
+        return result
+
+    n_layers = len(cube.layers)
+    return pd.DataFrame({
+        "postcode": np.repeat(labels, n_layers),
+        "pollutant": np.tile([p for p, _ in cube.layers], len(labels)),
+        "year": np.tile([yr for _, yr in cube.layers], len(labels)),
+        "value": sampled.ravel(),
+    })
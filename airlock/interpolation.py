@@ -0,0 +1,196 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from .lattice import GridLattice, build_lattice, locate_points, lookup_cells
+
+
+INTERPOLATION_METHODS = ("bilinear", "idw")
+
+
+def _gather(
+    lattice: GridLattice,
+    values: np.ndarray,
+    cols: np.ndarray,
+    rows: np.ndarray,
+) -> np.ndarray:
+    """Gather grid values at lattice positions (NaN where no cell)."""
+    idx = lookup_cells(lattice, cols, rows)
+    out = np.full(idx.shape, np.nan)
+    has_cell = idx >= 0
+    out[has_cell] = values[idx[has_cell]]
+    return out
+
+
+def _fractional_positions(
+    lattice: GridLattice,
+    x: np.ndarray,
+    y: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions in cell units relative to the first cell centre."""
+    fx = (np.asarray(x, dtype=float) - lattice.origin_x) / lattice.cell_size - 0.5
+    fy = (np.asarray(y, dtype=float) - lattice.origin_y) / lattice.cell_size - 0.5
+    return fx, fy
+
+
+def interpolate_bilinear(
+    lattice: GridLattice,
+    values: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+) -> np.ndarray:
+    """
+    Bilinear interpolation between the four surrounding cell centres.
+
+    Missing neighbour cells are dropped and the remaining weights are
+    renormalised, so points near holes or the grid edge still get an
+    estimate from whichever neighbours exist.
+
+    Args:
+        lattice: GridLattice of the grid.
+        values: Grid values aligned with the lattice's source rows.
+        x: Point eastings.
+        y: Point northings.
+
+    Returns:
+        Array of interpolated values (NaN where no neighbour has a value).
+    """
+    values = np.asarray(values, dtype=float)
+    fx, fy = _fractional_positions(lattice, x, y)
+
+    with np.errstate(invalid="ignore"):
+        c0 = np.floor(fx)
+        r0 = np.floor(fy)
+    tx = fx - c0
+    ty = fy - r0
+    c0 = np.where(np.isnan(c0), -1, c0).astype(np.int64)
+    r0 = np.where(np.isnan(r0), -1, r0).astype(np.int64)
+
+    weighted = np.zeros(len(fx))
+    weight_sum = np.zeros(len(fx))
+
+    for dc, dr, w in (
+        (0, 0, (1 - tx) * (1 - ty)),
+        (1, 0, tx * (1 - ty)),
+        (0, 1, (1 - tx) * ty),
+        (1, 1, tx * ty),
+    ):
+        v = _gather(lattice, values, c0 + dc, r0 + dr)
+        valid = ~np.isnan(v) & (w > 0)
+        weighted[valid] += w[valid] * v[valid]
+        weight_sum[valid] += w[valid]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(weight_sum > 0, weighted / weight_sum, np.nan)
+
+
+def interpolate_idw(
+    lattice: GridLattice,
+    values: np.ndarray,
+    x: np.ndarray,
+    y: np.ndarray,
+    neighbourhood: int = 1,
+    power: float = 2.0,
+) -> np.ndarray:
+    """
+    Inverse-distance weighting over a square neighbourhood of cell centres.
+
+    The neighbourhood is the containing cell plus `neighbourhood` cells in
+    every direction, i.e. (2k + 1)^2 centres. Work is done one stencil
+    offset at a time, so memory stays linear in the number of points.
+
+    Args:
+        lattice: GridLattice of the grid.
+        values: Grid values aligned with the lattice's source rows.
+        x: Point eastings.
+        y: Point northings.
+        neighbourhood: Stencil radius k in cells.
+        power: Distance exponent.
+
+    Returns:
+        Array of interpolated values (NaN where no neighbour has a value).
+    """
+    if neighbourhood < 0:
+        raise ValueError("neighbourhood must be >= 0.")
+
+    values = np.asarray(values, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    cols, rows = locate_points(lattice, x, y)
+
+    weighted = np.zeros(len(x))
+    weight_sum = np.zeros(len(x))
+
+    # Points that sit exactly on a centre take that centre's value
+    exact = np.full(len(x), np.nan)
+
+    k = int(neighbourhood)
+    for dc in range(-k, k + 1):
+        for dr in range(-k, k + 1):
+            nc = cols + dc
+            nr = rows + dr
+            v = _gather(lattice, values, nc, nr)
+            cx, cy = lattice.centre_coordinates(nc, nr)
+            d = np.hypot(x - cx, y - cy)
+
+            valid = ~np.isnan(v)
+            on_centre = valid & (d == 0)
+            exact[on_centre] = v[on_centre]
+
+            use = valid & (d > 0)
+            w = 1.0 / d[use] ** power
+            weighted[use] += w * v[use]
+            weight_sum[use] += w
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = np.where(weight_sum > 0, weighted / weight_sum, np.nan)
+
+    return np.where(np.isnan(exact), result, exact)
+
+
+def interpolate_at_postcodes(
+    match_df: pd.DataFrame,
+    grid_df: pd.DataFrame,
+    value_column: str,
+    method: str = "bilinear",
+    neighbourhood: int = 1,
+    power: float = 2.0,
+) -> pd.Series:
+    """
+    Estimate a grid value (e.g. NOx) at each postcode location.
+
+    Args:
+        match_df: DataFrame with 'easting' and 'northing' columns
+                  (e.g. the output of match_postcodes_to_grid).
+        grid_df: NOx grid DataFrame with X/Y columns and value_column.
+        value_column: Grid column to interpolate.
+        method: "bilinear" (lattice interpolation) or "idw".
+        neighbourhood: IDW stencil radius in cells.
+        power: IDW distance exponent.
+
+    Returns:
+        Series of interpolated values aligned with match_df's index.
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(
+            f"Unknown interpolation method '{method}'. "
+            f"Expected one of {INTERPOLATION_METHODS}."
+        )
+
+    if value_column not in grid_df.columns:
+        raise ValueError(f"Grid dataset missing value column: '{value_column}'")
+
+    lattice = build_lattice(grid_df)
+    values = pd.to_numeric(grid_df[value_column], errors="coerce").to_numpy(dtype=float)
+    x = match_df["easting"].to_numpy(dtype=float)
+    y = match_df["northing"].to_numpy(dtype=float)
+
+    if method == "bilinear":
+        estimates = interpolate_bilinear(lattice, values, x, y)
+    else:
+        estimates = interpolate_idw(
+            lattice, values, x, y, neighbourhood=neighbourhood, power=power
+        )
+
+    return pd.Series(estimates, index=match_df.index, name=f"{value_column}_{method}")
@@ -0,0 +1,252 @@
+"""
+Regular lattice view of a 1 km grid.
+
+PCM grids are regular: every cell centre lies on a fixed 1 km lattice.
+Mapping cell centres to integer (column, row) positions lets coordinates
+be located with integer arithmetic instead of polygon tests.
+"""
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import GRID_CELL_SIZE_M
+
+
+@dataclass
+class GridLattice:
+    """
+    Integer lattice covering the bounding extent of a grid.
+
+    cell_index[row, col] holds the position of the cell in the source
+    grid table, or -1 where the lattice has no cell (holes, coastline).
+    """
+    origin_x: float  # Easting of the lattice's lower-left corner
+    origin_y: float  # Northing of the lattice's lower-left corner
+    cell_size: float
+    n_cols: int
+    n_rows: int
+    cell_index: np.ndarray
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """(minx, miny, maxx, maxy) of the lattice extent."""
+        return (
+            self.origin_x,
+            self.origin_y,
+            self.origin_x + self.n_cols * self.cell_size,
+            self.origin_y + self.n_rows * self.cell_size,
+        )
+
+    def centre_coordinates(
+        self,
+        cols: np.ndarray,
+        rows: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the (x, y) centre coordinates of lattice positions."""
+        half = self.cell_size / 2
+        x = self.origin_x + cols * self.cell_size + half
+        y = self.origin_y + rows * self.cell_size + half
+        return x, y
+
+
+def build_lattice(
+    df: pd.DataFrame,
+    cell_size: float = GRID_CELL_SIZE_M,
+) -> GridLattice:
+    """
+    Build a GridLattice from a grid DataFrame with X/Y centre columns.
+
+    Args:
+        df: DataFrame with at least columns "X" and "Y" (cell centres, OSGB36).
+        cell_size: Cell edge length in metres.
+
+    Returns:
+        GridLattice whose cell_index refers to positional rows of df.
+    """
+    if "X" not in df.columns or "Y" not in df.columns:
+        raise ValueError("NOx dataset must contain 'X' and 'Y' columns.")
+
+    x = pd.to_numeric(df["X"], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(df["Y"], errors="coerce").to_numpy(dtype=float)
+
+    if len(x) == 0 or np.isnan(x).any() or np.isnan(y).any():
+        raise ValueError("Grid X/Y columns must be non-empty and numeric.")
+
+    half = cell_size / 2
+    origin_x = float(x.min()) - half
+    origin_y = float(y.min()) - half
+
+    col_f = (x - origin_x - half) / cell_size
+    row_f = (y - origin_y - half) / cell_size
+    cols = np.rint(col_f).astype(np.int64)
+    rows = np.rint(row_f).astype(np.int64)
+
+    if (np.abs(col_f - cols) > 1e-6).any() or (np.abs(row_f - rows) > 1e-6).any():
+        raise ValueError(
+            f"Grid cell centres do not lie on a regular {cell_size:g} m lattice."
+        )
+
+    n_cols = int(cols.max()) + 1
+    n_rows = int(rows.max()) + 1
+
+    cell_index = np.full((n_rows, n_cols), -1, dtype=np.int64)
+    cell_index[rows, cols] = np.arange(len(x), dtype=np.int64)
+
+    if (cell_index >= 0).sum() != len(x):
+        raise ValueError("Grid contains duplicate cell centres.")
+
+    return GridLattice(
+        origin_x=origin_x,
+        origin_y=origin_y,
+        cell_size=float(cell_size),
+        n_cols=n_cols,
+        n_rows=n_rows,
+        cell_index=cell_index,
+    )
+
+
+def locate_points(
+    lattice: GridLattice,
+    x: np.ndarray,
+    y: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return the lattice (col, row) containing each point.
+
+    Positions may fall outside the lattice; use lookup_cells to
+    resolve them to grid rows.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    with np.errstate(invalid="ignore"):
+        cols = np.floor((x - lattice.origin_x) / lattice.cell_size)
+        rows = np.floor((y - lattice.origin_y) / lattice.cell_size)
+
+    # NaN coordinates map to an out-of-range position
+    cols = np.where(np.isnan(cols), -1, cols).astype(np.int64)
+    rows = np.where(np.isnan(rows), -1, rows).astype(np.int64)
+    return cols, rows
+
+
+def lookup_cells(
+    lattice: GridLattice,
+    cols: np.ndarray,
+    rows: np.ndarray,
+) -> np.ndarray:
+    """
+    Resolve lattice positions to grid row positions.
+
+    Returns:
+        int64 array of grid row positions, -1 where the position is
+        outside the lattice or has no cell.
+    """
+    cols = np.asarray(cols, dtype=np.int64)
+    rows = np.asarray(rows, dtype=np.int64)
+
+    in_range = (cols >= 0) & (cols < lattice.n_cols) & (rows >= 0) & (rows < lattice.n_rows)
+
+    result = np.full(cols.shape, -1, dtype=np.int64)
+    result[in_range] = lattice.cell_index[rows[in_range], cols[in_range]]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Global cell keys
+# ---------------------------------------------------------------------------
+
+# Cells are numbered on the lattice anchored at the BNG origin (0, 0), so
+# the same square has the same key in every grid. (col, row) pack into
+# one int64; the offset admits negative positions.
+_KEY_OFFSET = 2 ** 23
+_KEY_SPAN = 2 ** 24
+
+# Key for points that fall in no cell (missing coordinates or, with
+# exclude_edges, points exactly on a cell edge)
+INVALID_CELL_KEY = -1
+
+
+def global_cell_keys(
+    x: np.ndarray,
+    y: np.ndarray,
+    cell_size: float = GRID_CELL_SIZE_M,
+    exclude_edges: bool = False,
+) -> np.ndarray:
+    """
+    Global key of the lattice cell containing each point.
+
+    Args:
+        x: Eastings (OSGB36).
+        y: Northings (OSGB36).
+        cell_size: Cell edge length in metres.
+        exclude_edges: If True, points exactly on a cell edge get
+                       INVALID_CELL_KEY, matching the point-in-polygon
+                       "within" test used by match_postcodes_to_grid.
+
+    Returns:
+        int64 array of keys.
+    """
+    fx = np.asarray(x, dtype=float) / cell_size
+    fy = np.asarray(y, dtype=float) / cell_size
+
+    with np.errstate(invalid="ignore"):
+        cols = np.floor(fx)
+        rows = np.floor(fy)
+        invalid = np.isnan(cols) | np.isnan(rows)
+        if exclude_edges:
+            invalid |= (cols == fx) | (rows == fy)
+
+    cols = np.where(invalid, 0, cols).astype(np.int64)
+    rows = np.where(invalid, 0, rows).astype(np.int64)
+
+    keys = (cols + _KEY_OFFSET) * _KEY_SPAN + (rows + _KEY_OFFSET)
+    return np.where(invalid, INVALID_CELL_KEY, keys)
+
+
+def grid_cell_keys(
+    df: pd.DataFrame,
+    cell_size: float = GRID_CELL_SIZE_M,
+) -> np.ndarray:
+    """
+    Global keys of the cells of a grid DataFrame with X/Y centre columns.
+
+    Raises:
+        ValueError if the centres are not cell centres of the lattice
+        anchored at the BNG origin, or if a cell appears twice.
+    """
+    if "X" not in df.columns or "Y" not in df.columns:
+        raise ValueError("NOx dataset must contain 'X' and 'Y' columns.")
+
+    x = pd.to_numeric(df["X"], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(df["Y"], errors="coerce").to_numpy(dtype=float)
+
+    offset_x = x / cell_size - 0.5
+    offset_y = y / cell_size - 0.5
+    if (
+        np.isnan(x).any() or np.isnan(y).any()
+        or (np.abs(offset_x - np.rint(offset_x)) > 1e-6).any()
+        or (np.abs(offset_y - np.rint(offset_y)) > 1e-6).any()
+    ):
+        raise ValueError(
+            f"Grid cell centres are not aligned to the {cell_size:g} m BNG lattice."
+        )
+
+    keys = global_cell_keys(x, y, cell_size)
+    if len(np.unique(keys)) != len(keys):
+        raise ValueError("Grid contains duplicate cell centres.")
+    return keys
+
+
+def cell_key_centres(
+    keys: np.ndarray,
+    cell_size: float = GRID_CELL_SIZE_M,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(x, y) centre coordinates of global cell keys."""
+    keys = np.asarray(keys, dtype=np.int64)
+    cols = keys // _KEY_SPAN - _KEY_OFFSET
+    rows = keys % _KEY_SPAN - _KEY_OFFSET
+    half = cell_size / 2
+    return cols * cell_size + half, rows * cell_size + half
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+from .postcode_keys import (
+    INVALID_POSTCODE_KEY,
+    POSTCODE_COMPACT_PATTERN,
+    compact_lookup_keys,
+    normalise_postcodes,
+)
+
+
+# Link status values reported for each cohort row
+LINK_STATUS_LINKED = "linked"
+LINK_STATUS_MISSING = "missing_postcode"
+LINK_STATUS_INVALID = "invalid_format"
+LINK_STATUS_NOT_FOUND = "not_in_reference"
+
+
+def link_cohort_postcodes(
+    cohort: pd.DataFrame,
+    reference: pd.DataFrame,
+    cohort_postcode_column: str = "postcode",
+    reference_postcode_column: str = "postcode",
+) -> pd.DataFrame:
+    """
+    Link cohort rows to a reference table (match result or concordance)
+    by normalised postcode.
+
+    Both sides are normalised and converted to int64 postcode keys
+    (see postcode_keys), and the join is done on those integers rather
+    than on Python strings. Duplicate
+    reference postcodes keep their first row.
+
+    Args:
+        cohort: Cohort DataFrame with a postcode column.
+        reference: Reference DataFrame, e.g. the output of
+                   match_postcodes_to_grid or an exported concordance.
+        cohort_postcode_column: Postcode column in the cohort.
+        reference_postcode_column: Postcode column in the reference
+                                   (e.g. "postcode", "pcd", "pcd2").
+
+    Returns:
+        Copy of the cohort (same row order and index) with:
+            - postcode_normalised: display-form postcode
+            - link_status: one of "linked", "missing_postcode",
+              "invalid_format", "not_in_reference"
+            - all reference columns except its postcode column
+              (suffixed "_ref" on name clashes)
+    """
+    if cohort_postcode_column not in cohort.columns:
+        raise ValueError(f"Cohort missing postcode column: '{cohort_postcode_column}'")
+    if reference_postcode_column not in reference.columns:
+        raise ValueError(
+            f"Reference missing postcode column: '{reference_postcode_column}'"
+        )
+
+    cohort_compact, cohort_display = normalise_postcodes(cohort[cohort_postcode_column])
+    ref_compact, _ = normalise_postcodes(reference[reference_postcode_column])
+
+    ref = reference.drop(columns=[reference_postcode_column])
+    ref = ref.rename(columns={c: f"{c}_ref" for c in ref.columns if c in cohort.columns})
+    ref["_link_key"] = compact_lookup_keys(ref_compact)
+    ref = ref[ref["_link_key"] != INVALID_POSTCODE_KEY].drop_duplicates(subset=["_link_key"])
+    ref["_in_reference"] = True
+
+    linked = cohort.assign(
+        postcode_normalised=cohort_display,
+        _link_key=compact_lookup_keys(cohort_compact),
+    )
+    index = linked.index
+    linked = linked.merge(ref, on="_link_key", how="left", validate="many_to_one")
+    linked.index = index
+
+    is_missing = cohort_compact.isna().to_numpy()
+    is_valid = (
+        cohort_compact.str.fullmatch(POSTCODE_COMPACT_PATTERN)
+        .fillna(False)
+        .to_numpy(dtype=bool)
+    )
+    in_reference = linked["_in_reference"].fillna(False).to_numpy(dtype=bool)
+
+    linked["link_status"] = np.select(
+        [in_reference, is_missing, ~is_valid],
+        [LINK_STATUS_LINKED, LINK_STATUS_MISSING, LINK_STATUS_INVALID],
+        default=LINK_STATUS_NOT_FOUND,
+    )
+
+    return linked.drop(columns=["_link_key", "_in_reference"])
+
+
+def summarize_linkage(linked: pd.DataFrame) -> dict:
+    """
+    Count cohort rows by link status.
+
+    Returns:
+        {
+            "total_rows": int,
+            "linked": int,
+            "missing_postcode": int,
+            "invalid_format": int,
+            "not_in_reference": int,
+            "link_rate": float (0–1),
+        }
+    """
+    counts = linked["link_status"].value_counts()
+    total = len(linked)
+
+    summary = {"total_rows": int(total)}
+    for status in (
+        LINK_STATUS_LINKED,
+        LINK_STATUS_MISSING,
+        LINK_STATUS_INVALID,
+        LINK_STATUS_NOT_FOUND,
+    ):
+        summary[status] = int(counts.get(status, 0))
+
+    summary["link_rate"] = float(summary[LINK_STATUS_LINKED] / total) if total > 0 else 0.0
+    return summary
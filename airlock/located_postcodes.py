@@ -0,0 +1,171 @@
+"""
+Reusable postcode locations for matching against many grids.
+
+Locating millions of postcodes is the expensive part of a match and does
+not depend on the grid. LocatedPostcodes stores each postcode's global
+cell key once; joining it to any BNG-aligned grid (another year, a
+modelled scenario, a grid with different holes) is then a sorted integer
+lookup over the grid's cells.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import GRID_CELL_SIZE_M
+from .filters import filter_postcodes_basic
+from .grid_builder import grid_ids_from_dataframe
+from .lattice import INVALID_CELL_KEY, global_cell_keys, grid_cell_keys
+from .validation import validate_postcode_columns
+
+
+@dataclass
+class LocatedPostcodes:
+    """
+    Postcodes with their precomputed global cell keys.
+
+    Points exactly on a cell edge carry INVALID_CELL_KEY, so joins give
+    the same result as match_postcodes_to_grid.
+    """
+    postcodes: np.ndarray
+    easting: np.ndarray
+    northing: np.ndarray
+    cell_keys: np.ndarray
+    cell_size: float = GRID_CELL_SIZE_M
+
+    def __len__(self) -> int:
+        return len(self.cell_keys)
+
+    def grid_positions(self, grid_df: pd.DataFrame) -> np.ndarray:
+        """
+        Row position in grid_df of the cell holding each postcode.
+
+        Returns:
+            int64 array aligned with the postcodes, -1 where the grid has
+            no cell.
+        """
+        keys = grid_cell_keys(grid_df, self.cell_size)
+        if len(keys) == 0:
+            return np.full(len(self), -1, dtype=np.int64)
+
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+
+        pos = np.minimum(np.searchsorted(sorted_keys, self.cell_keys), len(keys) - 1)
+        found = (sorted_keys[pos] == self.cell_keys) & (self.cell_keys != INVALID_CELL_KEY)
+        return np.where(found, order[pos], -1)
+
+    def join_grid(
+        self,
+        grid_df: pd.DataFrame,
+        id_column: Optional[str] = "GridCode",
+    ) -> pd.DataFrame:
+        """
+        Match the postcodes to a grid without any geometry work.
+
+        Args:
+            grid_df: NOx grid DataFrame with X/Y centre columns.
+            id_column: Grid identifier column, as in gridcells_from_geodataframe.
+
+        Returns:
+            DataFrame with the columns of match_postcodes_to_grid except
+            geometry: postcode, easting, northing, matched_grid_id.
+        """
+        pos = self.grid_positions(grid_df)
+        grid_ids = grid_ids_from_dataframe(grid_df, id_column)
+
+        matched_ids = np.full(len(self), np.nan, dtype=object)
+        matched_ids[pos >= 0] = grid_ids[pos[pos >= 0]]
+
+        return pd.DataFrame({
+            "postcode": self.postcodes,
+            "easting": self.easting,
+            "northing": self.northing,
+            "matched_grid_id": matched_ids,
+        })
+
+    def join_values(
+        self,
+        grid_df: pd.DataFrame,
+        value_columns: Sequence[str],
+    ) -> pd.DataFrame:
+        """
+        Grid values at each postcode (NaN where the grid has no cell).
+
+        Returns:
+            DataFrame with postcode and one column per value column.
+        """
+        missing = [c for c in value_columns if c not in grid_df.columns]
+        if missing:
+            raise ValueError(f"Grid dataset missing value columns: {missing}")
+
+        pos = self.grid_positions(grid_df)
+        has_cell = pos >= 0
+
+        result = pd.DataFrame({"postcode": self.postcodes})
+        for column in value_columns:
+            values = pd.to_numeric(grid_df[column], errors="coerce").to_numpy(dtype=float)
+            result[column] = np.where(has_cell, values[np.where(has_cell, pos, 0)], np.nan)
+        return result
+
+    def save(self, path: str) -> None:
+        """Store the located postcodes in a compressed .npz file."""
+        np.savez_compressed(
+            path,
+            postcodes=self.postcodes.astype(str),
+            easting=self.easting,
+            northing=self.northing,
+            cell_keys=self.cell_keys,
+            cell_size=np.array(self.cell_size),
+        )
+
+
+def locate_postcodes(
+    postcodes: pd.DataFrame,
+    cell_size: float = GRID_CELL_SIZE_M,
+    apply_basic_filters: bool = True,
+) -> LocatedPostcodes:
+    """
+    Locate an ONSPD-style postcode table on the global cell lattice.
+
+    Args:
+        postcodes: DataFrame with pcd, oseast1m, osnrth1m columns.
+        cell_size: Cell edge length in metres.
+        apply_basic_filters: If True, apply filter_postcodes_basic first.
+
+    Returns:
+        LocatedPostcodes, reusable for any grid with the same cell size.
+    """
+    is_valid, missing = validate_postcode_columns(postcodes.columns)
+    if not is_valid:
+        raise ValueError(f"Postcode dataset missing required columns: {missing}")
+
+    if apply_basic_filters:
+        postcodes = filter_postcodes_basic(postcodes)
+
+    x = pd.to_numeric(postcodes["oseast1m"], errors="coerce").to_numpy(dtype=float)
+    y = pd.to_numeric(postcodes["osnrth1m"], errors="coerce").to_numpy(dtype=float)
+    has_coords = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[has_coords], y[has_coords]
+
+    return LocatedPostcodes(
+        postcodes=postcodes["pcd"].astype(str).to_numpy(dtype=object)[has_coords],
+        easting=x,
+        northing=y,
+        cell_keys=global_cell_keys(x, y, cell_size, exclude_edges=True),
+        cell_size=float(cell_size),
+    )
+
+
+def load_located_postcodes(path: str) -> LocatedPostcodes:
+    """Load LocatedPostcodes written by LocatedPostcodes.save."""
+    with np.load(path) as data:
+        return LocatedPostcodes(
+            postcodes=data["postcodes"].astype(object),
+            easting=data["easting"],
+            northing=data["northing"],
+            cell_keys=data["cell_keys"],
+            cell_size=float(data["cell_size"]),
+        )
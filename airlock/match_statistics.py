@@ -0,0 +1,238 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .postcode_keys import (
+    INVALID_POSTCODE_KEY,
+    area_keys,
+    decode_prefix_keys,
+    district_keys,
+    frame_postcode_keys,
+)
+
+
+# Label used for postcodes whose format cannot be parsed
+INVALID_GROUP_LABEL = "(invalid)"
+
+# Percentiles reported in the pollutant summary
+POLLUTANT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _group_counts(group_keys: np.ndarray, matched: np.ndarray) -> pd.DataFrame:
+    """Total and matched counts per integer group key."""
+    groups, inverse = np.unique(group_keys, return_inverse=True)
+    return pd.DataFrame(
+        {
+            "total": np.bincount(inverse, minlength=len(groups)),
+            "matched": np.bincount(
+                inverse, weights=matched, minlength=len(groups)
+            ).astype(np.int64),
+        },
+        index=groups,
+    )
+
+
+def _add_counts(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    return left.add(right, fill_value=0).astype(np.int64)
+
+
+def _weighted_quantiles(
+    values: np.ndarray,
+    weights: np.ndarray,
+    q: Sequence[float],
+) -> np.ndarray:
+    """Quantiles of values where each value occurs weights times."""
+    order = np.argsort(values)
+    cum = np.cumsum(weights[order])
+    positions = np.asarray(q) / 100 * (cum[-1] - 1)
+    return values[order][np.searchsorted(cum, positions, side="right")]
+
+
+def _describe(values: np.ndarray, weights: np.ndarray) -> dict:
+    """Distribution statistics of (weighted) values, ignoring NaN."""
+    valid = ~np.isnan(values) & (weights > 0)
+    values, weights = values[valid], weights[valid]
+
+    n = int(weights.sum())
+    if n == 0:
+        stats = {"count": 0, "mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan}
+        stats.update({f"p{p}": np.nan for p in POLLUTANT_PERCENTILES})
+        return stats
+
+    mean = float(np.average(values, weights=weights))
+    var = float(np.average((values - mean) ** 2, weights=weights))
+
+    stats = {
+        "count": n,
+        "mean": mean,
+        "std": var ** 0.5,
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+    quantiles = _weighted_quantiles(values, weights, POLLUTANT_PERCENTILES)
+    stats.update({f"p{p}": float(v) for p, v in zip(POLLUTANT_PERCENTILES, quantiles)})
+    return stats
+
+
+@dataclass
+class MatchStatistics:
+    """
+    Mergeable QA statistics for a match result.
+
+    Holds only counters (postcodes per cell, totals and matched counts
+    per postcode area and district), so statistics of streamed chunks
+    can be combined with update()/merge() and the final tables are
+    derived from the counters in tables().
+    """
+    total_postcodes: int = 0
+    matched: int = 0
+    cell_counts: pd.Series = field(default_factory=lambda: pd.Series(dtype=np.int64))
+    area_counts: pd.DataFrame = field(
+        default_factory=lambda: pd.DataFrame({"total": [], "matched": []}, dtype=np.int64)
+    )
+    district_counts: pd.DataFrame = field(
+        default_factory=lambda: pd.DataFrame({"total": [], "matched": []}, dtype=np.int64)
+    )
+
+    def update(self, match_chunk: pd.DataFrame) -> None:
+        """Add one match result chunk (postcode, matched_grid_id columns)."""
+        self.merge(compute_match_statistics(match_chunk))
+
+    def merge(self, other: "MatchStatistics") -> "MatchStatistics":
+        """Merge other's counters into this object (returns self)."""
+        self.total_postcodes += other.total_postcodes
+        self.matched += other.matched
+        self.cell_counts = self.cell_counts.add(
+            other.cell_counts, fill_value=0
+        ).astype(np.int64)
+        self.area_counts = _add_counts(self.area_counts, other.area_counts)
+        self.district_counts = _add_counts(self.district_counts, other.district_counts)
+        return self
+
+    def to_dict(self) -> dict:
+        """Return the basic summary in the format of summarize_matches."""
+        total = self.total_postcodes
+        match_rate = self.matched / total if total > 0 else 0.0
+
+        return {
+            "total_postcodes": int(total),
+            "matched": int(self.matched),
+            "unmatched": int(total - self.matched),
+            "match_rate": float(match_rate),
+        }
+
+    def tables(self, grid_values: Optional[pd.Series] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Build the QA tables.
+
+        Args:
+            grid_values: Optional pollutant value per grid cell, indexed by
+                         the grid IDs used in matched_grid_id (e.g. NOx
+                         keyed by str(GridCode)). Its index is also taken
+                         as the full list of grid cells, so empty cells
+                         can be reported.
+
+        Returns:
+            {
+                "postcodes_per_cell": grid_id, n_postcodes
+                "occupancy_histogram": n_postcodes, n_cells
+                "match_rate_by_area": area, total, matched, match_rate
+                "match_rate_by_district": district, total, matched, match_rate
+                "empty_cells": grid_id (only with grid_values)
+                "pollutant_summary": statistic per postcode and per cell
+                                     (only with grid_values)
+            }
+        """
+        counts = self.cell_counts
+        if grid_values is not None:
+            counts = counts.reindex(
+                counts.index.union(grid_values.index), fill_value=0
+            ).astype(np.int64)
+
+        per_cell = pd.DataFrame({
+            "grid_id": counts.index.to_numpy(),
+            "n_postcodes": counts.to_numpy(),
+        })
+
+        occupancy = np.bincount(per_cell["n_postcodes"].to_numpy(), minlength=1)
+        histogram = pd.DataFrame({
+            "n_postcodes": np.arange(len(occupancy)),
+            "n_cells": occupancy,
+        })
+        histogram = histogram[histogram["n_cells"] > 0].reset_index(drop=True)
+
+        tables = {
+            "postcodes_per_cell": per_cell,
+            "occupancy_histogram": histogram,
+            "match_rate_by_area": _rate_table(self.area_counts, "area"),
+            "match_rate_by_district": _rate_table(self.district_counts, "district"),
+        }
+
+        if grid_values is not None:
+            tables["empty_cells"] = per_cell.loc[per_cell["n_postcodes"] == 0, ["grid_id"]]
+            tables["empty_cells"] = tables["empty_cells"].reset_index(drop=True)
+
+            values = pd.to_numeric(
+                grid_values.reindex(counts.index), errors="coerce"
+            ).to_numpy(dtype=float)
+            weights = counts.to_numpy(dtype=float)
+            in_grid = counts.index.isin(grid_values.index)
+
+            tables["pollutant_summary"] = pd.DataFrame({
+                "per_postcode": _describe(values, weights),
+                "per_cell": _describe(values[in_grid], np.ones(in_grid.sum())),
+            })
+
+        return tables
+
+
+def _rate_table(counts: pd.DataFrame, label: str) -> pd.DataFrame:
+    """Turn integer-keyed group counts into a labelled match-rate table."""
+    keys = counts.index.to_numpy(dtype=np.int64)
+    labels = decode_prefix_keys(keys)
+    labels[keys == INVALID_POSTCODE_KEY] = INVALID_GROUP_LABEL
+
+    table = pd.DataFrame({
+        label: labels,
+        "total": counts["total"].to_numpy(dtype=np.int64),
+        "matched": counts["matched"].to_numpy(dtype=np.int64),
+    })
+    table["match_rate"] = table["matched"] / table["total"].where(table["total"] > 0)
+    return table.sort_values(label, key=lambda s: s.astype(str)).reset_index(drop=True)
+
+
+def compute_match_statistics(match_gdf: pd.DataFrame) -> MatchStatistics:
+    """
+    Compute mergeable QA statistics for a match result in one pass.
+
+    Postcodes are grouped by packed-key arithmetic (area and district
+    are prefixes of the key), and cells by hashed value counts, so no
+    per-row Python work or string groupby is needed.
+
+    Args:
+        match_gdf: Result of match_postcodes_to_grid (or one streamed
+                   chunk), with postcode and matched_grid_id columns.
+
+    Returns:
+        MatchStatistics; call tables() for the QA tables.
+    """
+    grid_ids = match_gdf["matched_grid_id"]
+    matched = grid_ids.notna().to_numpy()
+
+    # Lookup keys equal the packed keys of valid postcodes; area_keys and
+    # district_keys map the negative keys of malformed ones to invalid
+    keys = frame_postcode_keys(match_gdf)
+
+    cell_counts = grid_ids[matched].value_counts(sort=False).astype(np.int64)
+    cell_counts.index.name = None
+    cell_counts.name = None
+
+    return MatchStatistics(
+        total_postcodes=len(match_gdf),
+        matched=int(matched.sum()),
+        cell_counts=cell_counts,
+        area_counts=_group_counts(area_keys(keys), matched),
+        district_counts=_group_counts(district_keys(keys), matched),
+    )
@@ -1,30 +1,241 @@
-from typing import List
+from __future__ import annotations
 
-import geopandas as gpd
+from dataclasses import dataclass
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 import pandas as pd
 
+from .arrow_io import as_dataframe, match_arrays_to_arrow
 from .models import GridCell, PostcodePoint
 from .config import CRS_OSGB36
+from .filters import filter_postcodes_basic
+from .grid_builder import cell_polygons_from_centres, grid_ids_from_dataframe
+from .postcode_keys import INVALID_POSTCODE_KEY, postcode_lookup_keys
+from .spatial_order import spatial_sort_order
+from .spatial_index import build_grid_tree, left_join_pairs, query_points_within
+from .validation import validate_postcode_columns
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import shapely
 
 
 # Number of postcodes processed per spatial join batch
 CHUNK_SIZE = 100_000
 
 
+def _empty_match_gdf() -> gpd.GeoDataFrame:
+    """Empty result with the standard match output columns."""
+    import geopandas as gpd
+
+    return gpd.GeoDataFrame(
+        {
+            "postcode": [],
+            "easting": [],
+            "northing": [],
+            "matched_grid_id": [],
+            "postcode_key": np.array([], dtype=np.int64),
+            "geometry": [],
+        },
+        crs=CRS_OSGB36,
+    )
+
+
+def _postcode_keys(chunk: List[PostcodePoint], postcodes: np.ndarray) -> np.ndarray:
+    """Packed keys of a batch; only points built without one are encoded."""
+    keys = np.array(
+        [INVALID_POSTCODE_KEY if p.postcode_key is None else p.postcode_key for p in chunk],
+        dtype=np.int64,
+    )
+    missing = np.array([p.postcode_key is None for p in chunk], dtype=bool)
+    if missing.any():
+        keys[missing] = postcode_lookup_keys(pd.Series(postcodes[missing]))
+    return keys
+
+
+def _match_chunk_rows(
+    chunk: List[PostcodePoint],
+    tree: shapely.STRtree,
+    grid_ids: np.ndarray,
+) -> Tuple[gpd.GeoDataFrame, np.ndarray]:
+    """
+    Match one batch of postcodes against the grid.
+
+    Uses the geometry-free engine in spatial_index and reproduces the
+    row layout of a left spatial join: one row per (postcode, cell) pair
+    plus one row with a missing grid ID per unmatched postcode.
+
+    Returns:
+        (matched GeoDataFrame, position in chunk of each row's postcode)
+    """
+    import geopandas as gpd
+
+    eastings = np.array([p.easting for p in chunk], dtype=float)
+    northings = np.array([p.northing for p in chunk], dtype=float)
+
+    point_idx, cell_idx = query_points_within(tree, eastings, northings)
+    left, right = left_join_pairs(len(chunk), point_idx, cell_idx)
+
+    matched_ids = np.full(len(left), np.nan, dtype=object)
+    has_cell = right >= 0
+    matched_ids[has_cell] = grid_ids[right[has_cell]]
+
+    postcodes = np.array([p.postcode for p in chunk], dtype=object)
+    geometries = np.array([p.geometry for p in chunk], dtype=object)
+    keys = _postcode_keys(chunk, postcodes)
+
+    result = gpd.GeoDataFrame(
+        {
+            "postcode": postcodes[left],
+            "easting": eastings[left],
+            "northing": northings[left],
+            "matched_grid_id": matched_ids,
+            "postcode_key": keys[left],
+            "geometry": geometries[left],
+        },
+        crs=CRS_OSGB36,
+    )
+    return result, left
+
+
+def _match_chunk(
+    chunk: List[PostcodePoint],
+    tree: shapely.STRtree,
+    grid_ids: np.ndarray,
+) -> gpd.GeoDataFrame:
+    """Match one batch of postcodes against the grid (see _match_chunk_rows)."""
+    return _match_chunk_rows(chunk, tree, grid_ids)[0]
+
+
+def iter_match_batches(
+    batches: Iterable[List[PostcodePoint]],
+    gridcells: List[GridCell],
+) -> Iterator[gpd.GeoDataFrame]:
+    """
+    Match pre-formed batches of postcodes, one result per batch.
+
+    The grid spatial index is built once and shared by all batches, so
+    callers that size their own batches (e.g. under a memory budget)
+    pay the index cost only once.
+
+    Args:
+        batches: Iterable of PostcodePoint lists.
+        gridcells: List of GridCell models.
+
+    Yields:
+        GeoDataFrame per batch, with the same columns as
+        match_postcodes_to_grid.
+    """
+    # Build the grid spatial index once for all chunks
+    tree = build_grid_tree([c.geometry for c in gridcells])
+    grid_ids = np.array([c.id for c in gridcells], dtype=object)
+
+    for batch in batches:
+        if batch:
+            yield _match_chunk(batch, tree, grid_ids)
+
+
+def _batched(
+    postcodes: Iterable[PostcodePoint],
+    chunk_size: int,
+) -> Iterator[List[PostcodePoint]]:
+    """Split an iterable of postcodes into lists of chunk_size."""
+    iterator = iter(postcodes)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def iter_match_chunks(
+    postcodes: Iterable[PostcodePoint],
+    gridcells: List[GridCell],
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[gpd.GeoDataFrame]:
+    """
+    Streaming variant of match_postcodes_to_grid.
+
+    Postcodes are consumed lazily in batches of chunk_size and each
+    matched batch is yielded as soon as it is ready, so only one chunk
+    of results is held in memory at a time. Pair with
+    RunningMatchSummary and a chunked exporter for constant-memory runs.
+
+    Args:
+        postcodes: Any iterable of PostcodePoint models (list or generator).
+        gridcells: List of GridCell models.
+        chunk_size: Number of postcodes per batch.
+
+    Yields:
+        GeoDataFrame per chunk, with the same columns as
+        match_postcodes_to_grid.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+
+    return iter_match_batches(_batched(postcodes, chunk_size), gridcells)
+
+
+def _match_spatially_sorted(
+    postcodes: List[PostcodePoint],
+    gridcells: List[GridCell],
+    curve: str,
+    chunk_size: int,
+) -> pd.DataFrame:
+    """
+    Match postcodes in space-filling-curve order, in chunks of chunk_size.
+
+    Rows are returned in the original postcode order, with the same layout
+    as matching in input order.
+    """
+    eastings = np.array([p.easting for p in postcodes], dtype=float)
+    northings = np.array([p.northing for p in postcodes], dtype=float)
+    order = spatial_sort_order(eastings, northings, curve)
+
+    tree = build_grid_tree([c.geometry for c in gridcells])
+    grid_ids = np.array([c.id for c in gridcells], dtype=object)
+
+    chunk_results = []
+    row_positions = []
+    for start in range(0, len(order), chunk_size):
+        positions = order[start:start + chunk_size]
+        chunk_df, left = _match_chunk_rows(
+            [postcodes[i] for i in positions], tree, grid_ids
+        )
+        chunk_results.append(chunk_df)
+        row_positions.append(positions[left])
+
+    # Restore input order; rows of one postcode keep their relative order
+    restore = np.argsort(np.concatenate(row_positions), kind="stable")
+    return pd.concat(chunk_results, ignore_index=True).iloc[restore].reset_index(drop=True)
+
+
 def match_postcodes_to_grid(
     postcodes: List[PostcodePoint],
     gridcells: List[GridCell],
+    spatial_sort: Optional[str] = None,
 ) -> gpd.GeoDataFrame:
     """
     Match each postcode to the grid cell polygon that contains it.
 
     This implementation is chunked to better handle large postcode datasets.
-    It processes the postcode list in batches of CHUNK_SIZE, performing a
-    spatial join per chunk and concatenating the results.
+    It processes the postcode list in batches of CHUNK_SIZE, querying one
+    shared STRtree of grid polygons per chunk and concatenating the
+    results. Use
+    iter_match_chunks to consume the chunks without concatenating.
+
+    ONSPD files are ordered alphabetically by postcode, so input-order
+    chunks touch cells all over the country. With spatial_sort set, the
+    postcodes are ordered along a space-filling curve before chunking
+    (each chunk then covers a compact region) and the output is put
+    back in input order.
 
     Args:
         postcodes: List of PostcodePoint models.
         gridcells: List of GridCell models.
+        spatial_sort: None (input order), "hilbert" or "morton".
 
     Returns:
         GeoDataFrame with columns:
@@ -32,73 +243,86 @@ def match_postcodes_to_grid(
             - easting
             - northing
             - matched_grid_id
+            - postcode_key (packed int64 key of the postcode, used for
+              sorting, dedup and lookups; dropped on export)
             - geometry (postcode point)
     """
+    import geopandas as gpd
 
     # Edge case: no postcodes
     if not postcodes:
-        return gpd.GeoDataFrame(
-            {
-                "postcode": [],
-                "easting": [],
-                "northing": [],
-                "matched_grid_id": [],
-                "geometry": [],
-            },
-            crs=CRS_OSGB36,
-        )
+        return _empty_match_gdf()
 
-    # Build GeoDataFrame for grid cells once
-    grid_gdf = gpd.GeoDataFrame(
-        {
-            "grid_id": [c.id for c in gridcells],
-            "center_x": [c.center_x for c in gridcells],
-            "center_y": [c.center_y for c in gridcells],
-            "geometry": [c.geometry for c in gridcells],
-        },
-        crs=CRS_OSGB36,
-    )
+    if spatial_sort is not None:
+        result_df = _match_spatially_sorted(postcodes, gridcells, spatial_sort, CHUNK_SIZE)
+    else:
+        chunk_results = list(iter_match_chunks(postcodes, gridcells))
+
+        # Concatenate all chunks into a single GeoDataFrame
+        result_df = pd.concat(chunk_results, ignore_index=True)
 
-    # Trigger spatial index creation once for efficiency
-    _ = grid_gdf.sindex
+    result = gpd.GeoDataFrame(result_df, crs=CRS_OSGB36)
 
-    chunk_results: List[gpd.GeoDataFrame] = []
+    return result
 
-    n = len(postcodes)
-    for start in range(0, n, CHUNK_SIZE):
-        end = min(start + CHUNK_SIZE, n)
-        chunk = postcodes[start:end]
 
-        pc_gdf = gpd.GeoDataFrame(
-            {
-                "postcode": [p.postcode for p in chunk],
-                "easting": [p.easting for p in chunk],
-                "northing": [p.northing for p in chunk],
-                "geometry": [p.geometry for p in chunk],
-            },
-            crs=CRS_OSGB36,
-        )
+def match_postcodes_arrow(
+    postcodes,
+    grid,
+    apply_basic_filters: bool = True,
+    id_column: Optional[str] = "GridCode",
+):
+    """
+    Columnar variant of match_postcodes_to_grid with Arrow in and out.
 
-        joined_chunk = gpd.sjoin(
-            pc_gdf,
-            grid_gdf,
-            how="left",
-            predicate="within",
-        )
+    Works straight from coordinate columns: no PostcodePoint/GridCell
+    models, point geometries or GeoDataFrames are created, and the result
+    is a pyarrow Table that Polars, DuckDB or Parquet writers consume
+    without conversion.
+
+    Args:
+        postcodes: ONSPD-style table (pcd, oseast1m, osnrth1m) as an Arrow
+                   table/record batch or pandas DataFrame.
+        grid: NOx grid table with X/Y columns (Arrow or pandas).
+        apply_basic_filters: If True, apply filter_postcodes_basic first.
+        id_column: Grid identifier column, as in gridcells_from_geodataframe.
+
+    Returns:
+        pyarrow Table with postcode, easting, northing and matched_grid_id
+        (null when unmatched), in the row layout of match_postcodes_to_grid.
+    """
+    postcodes = as_dataframe(postcodes)
+    grid = as_dataframe(grid)
 
-        joined_chunk = joined_chunk.rename(columns={"grid_id": "matched_grid_id"})
+    is_valid, missing = validate_postcode_columns(postcodes.columns)
+    if not is_valid:
+        raise ValueError(f"Postcode dataset missing required columns: {missing}")
+    if "X" not in grid.columns or "Y" not in grid.columns:
+        raise ValueError("NOx dataset must contain 'X' and 'Y' columns.")
 
-        joined_chunk = joined_chunk[
-            ["postcode", "easting", "northing", "matched_grid_id", "geometry"]
-        ]
+    if apply_basic_filters:
+        postcodes = filter_postcodes_basic(postcodes)
 
-        chunk_results.append(joined_chunk)
+    eastings = pd.to_numeric(postcodes["oseast1m"], errors="coerce").to_numpy(dtype=float)
+    northings = pd.to_numeric(postcodes["osnrth1m"], errors="coerce").to_numpy(dtype=float)
+    has_coords = ~(np.isnan(eastings) | np.isnan(northings))
 
-    # Concatenate all chunks into a single GeoDataFrame
-    result_df = pd.concat(chunk_results, ignore_index=True)
-    result = gpd.GeoDataFrame(result_df, crs=CRS_OSGB36)
+    tree = build_grid_tree(cell_polygons_from_centres(grid["X"], grid["Y"]))
+    grid_ids = grid_ids_from_dataframe(grid, id_column)
 
-    return result
+    point_idx, cell_idx = query_points_within(
+        tree, eastings[has_coords], northings[has_coords]
+    )
+    left, right = left_join_pairs(int(has_coords.sum()), point_idx, cell_idx)
+
+    return match_arrays_to_arrow(
+        postcodes["pcd"].astype(str).to_numpy()[has_coords],
+        eastings[has_coords],
+        northings[has_coords],
+        grid_ids,
+        left,
+        right,
+    )
 
 
 def summarize_matches(match_gdf: gpd.GeoDataFrame) -> dict:
@@ -126,3 +350,32 @@ def summarize_matches(match_gdf: gpd.GeoDataFrame) -> dict:
         "unmatched": int(unmatched),
         "match_rate": float(match_rate),
     }
+
+
+@dataclass
+class RunningMatchSummary:
+    """
+    Incrementally updated equivalent of summarize_matches.
+
+    Call update() with each chunk from iter_match_chunks; to_dict()
+    returns the same structure as summarize_matches at any point.
+    """
+    total_postcodes: int = 0
+    matched: int = 0
+
+    def update(self, match_chunk: gpd.GeoDataFrame) -> None:
+        """Add one matched chunk to the running totals."""
+        self.total_postcodes += len(match_chunk)
+        self.matched += int(match_chunk["matched_grid_id"].notna().sum())
+
+    def to_dict(self) -> dict:
+        """Return the summary in the format of summarize_matches."""
+        total = self.total_postcodes
+        match_rate = self.matched / total if total > 0 else 0.0
+
+        return {
+            "total_postcodes": int(total),
+            "matched": int(self.matched),
+            "unmatched": int(total - self.matched),
+            "match_rate": float(match_rate),
+        }
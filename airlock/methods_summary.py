@@ -5,6 +5,26 @@ and describes how postcode-to-grid matching was performed.
 """
 
 from datetime import datetime, UTC
+from typing import Optional
+
+
+def _uncertainty_section(uncertainty: dict) -> str:
+    """Section describing a positional-uncertainty simulation."""
+    model = (
+        f"independent Gaussian errors (SD {uncertainty['error_m']:g} m) in "
+        "easting and northing"
+        if uncertainty["error_model"] == "gaussian"
+        else f"errors uniform within a {uncertainty['error_m']:g} m radius"
+    )
+    return f"""
+8. Positional Uncertainty
+-------------------------
+• Postcode centroids were perturbed with {model} over
+  {uncertainty['n_replicates']} Monte Carlo replicates and reassigned to grid cells.
+• Mean probability of the assigned grid cell: {uncertainty['mean_assigned_probability']:.2%}
+• Postcodes with an assigned-cell probability below {uncertainty['uncertain_threshold']:.0%}:
+  {uncertainty['uncertain_postcodes']} ({uncertainty['uncertain_share']:.2%})
+"""
 
 
 def generate_methods_summary(
@@ -13,6 +33,7 @@ def generate_methods_summary(
     matched_rows: int,
     unmatched_rows: int,
     match_rate: float,
+    uncertainty: Optional[dict] = None,
 ) -> str:
     """
     Create a plain-text methods summary that describes:
@@ -22,6 +43,8 @@ def generate_methods_summary(
     - Grid construction (1km squares from centre points)
     - Point-in-polygon matching process
     - Validation steps
+    - Positional uncertainty, if uncertainty is given
+      (UncertaintyResult.summary())
     """
 
     # Updated to modern timezone-aware UTC timestamp
@@ -63,8 +86,9 @@ Generated: {timestamp}
 • A spatial point-in-polygon join was performed.
   Each postcode point was assigned to the grid cell polygon
   that contained it.
-• GeoPandas spatial index (R-tree) was used to improve
-  performance on large datasets.
+• A Shapely STRtree spatial index (R-tree) over the grid
+  polygons was queried in bulk to improve performance on
+  large datasets.
 
 6. Validation
 -------------
@@ -79,7 +103,7 @@ Total postcode records processed: {postcode_rows}
 Matched postcodes: {matched_rows}
 Unmatched postcodes: {unmatched_rows}
 Match rate: {match_rate:.2%}
-
+{_uncertainty_section(uncertainty) if uncertainty else ""}
 This methods summary was automatically generated by AirLock.
 """
 
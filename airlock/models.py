@@ -1,5 +1,10 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from shapely.geometry import Polygon, Point
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from shapely.geometry import Polygon, Point
 
 
 @dataclass
@@ -17,8 +22,13 @@ class GridCell:
 class PostcodePoint:
     """
     Internal representation of a postcode location.
+
+    postcode_key is the packed int64 lookup key of the postcode (see
+    airlock.postcode_keys), set once by the loader; when None it is
+    encoded at match time.
     """
     postcode: str
     easting: float
     northing: float
     geometry: Point
+    postcode_key: Optional[int] = None
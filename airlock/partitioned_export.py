@@ -0,0 +1,267 @@
+"""
+Hive-partitioned output datasets.
+
+Match results are split by postcode area (``area=SW/``) or by British
+National Grid 100 km tile (``tile=TQ/``) into one file per partition, plus
+a manifest.json with row counts and coordinate bounds. Consumers read only
+the partitions they need; Arrow, DuckDB, Polars and Spark all understand
+the directory layout.
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .arrow_io import as_dataframe, match_result_to_arrow, pa
+from .postcode_keys import area_keys, decode_prefix_keys, encode_postcodes, frame_postcode_keys
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pq = None
+
+
+PARTITION_SCHEMES = ("area", "tile")
+
+PARTITION_FORMATS = ("parquet", "csv")
+
+# Parquet when pyarrow is installed, CSV otherwise
+DEFAULT_PARTITION_FORMAT = "parquet" if pq is not None else "csv"
+
+# Hive's directory value for rows without a partition value
+NULL_PARTITION_VALUE = "__HIVE_DEFAULT_PARTITION__"
+
+MANIFEST_FILE = "manifest.json"
+
+# BNG 100 km squares covered by the lettered grid
+_BNG_MAX_EASTING = 700_000
+_BNG_MAX_NORTHING = 1_300_000
+
+
+def bng_tile_labels(eastings: np.ndarray, northings: np.ndarray) -> np.ndarray:
+    """
+    Two-letter BNG 100 km tile (e.g. "TQ") for each coordinate.
+
+    Coordinates outside the lettered grid (or NaN) give None.
+    """
+    e = np.asarray(eastings, dtype=float)
+    n = np.asarray(northings, dtype=float)
+    inside = (e >= 0) & (e < _BNG_MAX_EASTING) & (n >= 0) & (n < _BNG_MAX_NORTHING)
+
+    e100k = np.where(inside, e // 100_000, 0).astype(np.int64)
+    n100k = np.where(inside, n // 100_000, 0).astype(np.int64)
+
+    # Letter indices on the 5 × 5 lettered grid (A–Z without I)
+    first = (19 - n100k) - (19 - n100k) % 5 + (e100k + 10) // 5
+    second = (19 - n100k) * 5 % 25 + e100k % 5
+    first = first + (first > 7)
+    second = second + (second > 7)
+
+    labels = np.char.add(
+        (first + ord("A")).astype(np.uint32).view("U1"),
+        (second + ord("A")).astype(np.uint32).view("U1"),
+    ).astype(object)
+    labels[~inside] = None
+    return labels
+
+
+def postcode_area_labels(postcodes: pd.Series) -> np.ndarray:
+    """Postcode area (e.g. "SW") for each postcode; None if malformed."""
+    return _area_labels(encode_postcodes(postcodes))
+
+
+def _area_labels(keys: np.ndarray) -> np.ndarray:
+    """Postcode area labels of packed (or lookup) keys."""
+    keys = area_keys(keys)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return decode_prefix_keys(unique_keys)[inverse]
+
+
+def _partition_dir(partition_by: str, value: Optional[str]) -> str:
+    return f"{partition_by}={value if value is not None else NULL_PARTITION_VALUE}"
+
+
+def _bounds(x: np.ndarray, y: np.ndarray) -> Optional[List[float]]:
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.any():
+        return None
+    return [
+        float(x[finite].min()),
+        float(y[finite].min()),
+        float(x[finite].max()),
+        float(y[finite].max()),
+    ]
+
+
+def export_partitioned_dataset(
+    match_df,
+    directory: str,
+    partition_by: str = "area",
+    file_format: str = DEFAULT_PARTITION_FORMAT,
+    max_workers: Optional[int] = None,
+    overwrite: bool = False,
+) -> dict:
+    """
+    Write a match result as a Hive-partitioned directory dataset.
+
+    Layout:
+        directory/
+            manifest.json
+            area=AB/part-0.parquet
+            area=SW/part-0.parquet
+            ...
+
+    Rows keep their order within each partition. Partitions are written
+    concurrently in a thread pool (Parquet encoding and CSV writing
+    release the GIL for most of the work).
+
+    Args:
+        match_df: Result of match_postcodes_to_grid (GeoDataFrame,
+                  DataFrame or Arrow table) with postcode, easting,
+                  northing and matched_grid_id columns.
+        directory: Output directory (created if missing).
+        partition_by: "area" (postcode area) or "tile" (BNG 100 km tile).
+        file_format: "parquet" or "csv".
+        max_workers: Thread pool size (default: CPU count).
+        overwrite: If True, existing partitions and manifest in directory
+                   are replaced; otherwise a non-empty directory is an error.
+
+    Returns:
+        Manifest dict (also written to manifest.json):
+            {
+                "partition_by", "format", "total_rows",
+                "partitions": [
+                    {"value", "path", "rows", "matched",
+                     "bounds": [minx, miny, maxx, maxy]},
+                    ...
+                ],
+            }
+    """
+    if partition_by not in PARTITION_SCHEMES:
+        raise ValueError(
+            f"Unknown partition scheme '{partition_by}'. Expected one of {PARTITION_SCHEMES}."
+        )
+    if file_format not in PARTITION_FORMATS:
+        raise ValueError(
+            f"Unknown file format '{file_format}'. Expected one of {PARTITION_FORMATS}."
+        )
+    if file_format == "parquet" and pq is None:
+        raise ImportError("pyarrow is required for Parquet output. Install it with 'pip install pyarrow'.")
+
+    if os.path.isdir(directory) and os.listdir(directory):
+        if not overwrite:
+            raise ValueError(f"Output directory '{directory}' is not empty.")
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name == MANIFEST_FILE:
+                os.remove(path)
+            elif os.path.isdir(path) and name.startswith(f"{partition_by}="):
+                shutil.rmtree(path)
+    os.makedirs(directory, exist_ok=True)
+
+    df = as_dataframe(match_df)
+    if partition_by == "area":
+        labels = _area_labels(frame_postcode_keys(df))
+    df = df.drop(columns=["geometry", "postcode_key"], errors="ignore")
+
+    x = df["easting"].to_numpy(dtype=float)
+    y = df["northing"].to_numpy(dtype=float)
+    matched = df["matched_grid_id"].notna().to_numpy()
+
+    if partition_by == "tile":
+        labels = bng_tile_labels(x, y)
+
+    # Group row positions by label in one sort, keeping row order
+    codes, values = pd.factorize(pd.Series(labels, dtype=object), use_na_sentinel=True)
+    codes = np.where(codes < 0, len(values), codes)
+    group_values = [str(v) for v in values] + [None]
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(len(group_values) + 1))
+
+    table = match_result_to_arrow(df) if file_format == "parquet" else None
+    extension = "parquet" if file_format == "parquet" else "csv"
+
+    def write_partition(group: int) -> Optional[dict]:
+        rows = order[starts[group]:starts[group + 1]]
+        if len(rows) == 0:
+            return None
+
+        value = group_values[group]
+        rel_path = os.path.join(_partition_dir(partition_by, value), f"part-0.{extension}")
+        path = os.path.join(directory, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if table is not None:
+            pq.write_table(table.take(pa.array(rows)), path)
+        else:
+            df.iloc[rows].to_csv(path, index=False)
+
+        return {
+            "value": value,
+            "path": rel_path.replace(os.sep, "/"),
+            "rows": int(len(rows)),
+            "matched": int(matched[rows].sum()),
+            "bounds": _bounds(x[rows], y[rows]),
+        }
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        entries = [e for e in pool.map(write_partition, range(len(group_values))) if e]
+
+    entries.sort(key=lambda e: (e["value"] is None, e["value"] or ""))
+    manifest = {
+        "partition_by": partition_by,
+        "format": file_format,
+        "total_rows": int(len(df)),
+        "partitions": entries,
+    }
+
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+    return manifest
+
+
+def read_partitioned_dataset(
+    directory: str,
+    values: Optional[Iterable[Optional[str]]] = None,
+) -> pd.DataFrame:
+    """
+    Read a dataset written by export_partitioned_dataset.
+
+    Args:
+        directory: Dataset directory containing manifest.json.
+        values: Partition values to read (e.g. ["SW", "TQ"]); None for all.
+                Use None inside the list for the null partition.
+
+    Returns:
+        DataFrame with the rows of the selected partitions and the
+        partition column (area or tile) added.
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+
+    wanted = None if values is None else set(values)
+    column = manifest["partition_by"]
+
+    frames = []
+    for entry in manifest["partitions"]:
+        if wanted is not None and entry["value"] not in wanted:
+            continue
+        path = os.path.join(directory, entry["path"])
+        if manifest["format"] == "parquet":
+            frame = pd.read_parquet(path)
+        else:
+            frame = pd.read_csv(path, dtype={"postcode": str, "matched_grid_id": str})
+        frame[column] = entry["value"]
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(
+            columns=["postcode", "easting", "northing", "matched_grid_id", column]
+        )
+    return pd.concat(frames, ignore_index=True)
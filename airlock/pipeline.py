@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterator, List
+
+import numpy as np
+import pandas as pd
+
+from .chunking import AdaptiveChunkSizer
+from .exporters import export_chunks_to_csv
+from .matcher import RunningMatchSummary, iter_match_batches
+from .models import GridCell
+from .postcode_keys import PostcodeKeySet, frame_postcode_keys
+from .postcode_loader import load_postcodes_from_dataframe
+from .validation import validate_postcode_columns
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+
+
+def run_memory_budgeted_match(
+    postcode_csv: str,
+    gridcells: List[GridCell],
+    output_csv: str,
+    memory_budget_mb: float,
+    apply_basic_filters: bool = True,
+) -> dict:
+    """
+    Read, match and export an ONSPD CSV within a memory budget.
+
+    The postcode file is read in chunks whose size is chosen by an
+    AdaptiveChunkSizer: the first chunk probes the bytes used per row
+    (raw rows plus match results), and later chunks are sized to fit
+    the budget. Each matched chunk is appended to output_csv straight
+    away, so the match working set does not depend on the file size.
+    With apply_basic_filters, cross-chunk dedup keeps the packed keys of
+    the postcodes seen so far in a PostcodeKeySet, which grows by 8 bytes
+    per distinct postcode (about 21 MB for a national ONSPD).
+
+    Args:
+        postcode_csv: Path to the ONSPD-style postcode CSV.
+        gridcells: List of GridCell models.
+        output_csv: Destination CSV for the match results.
+        memory_budget_mb: RAM limit for one chunk's working set, in MB.
+        apply_basic_filters: If True, apply filter_postcodes_basic per
+                             chunk and drop postcodes seen in earlier chunks.
+
+    Returns:
+        Run metadata:
+            {
+                "summary": summarize_matches-style dict,
+                "rows_written": int,
+                "chunking": {
+                    "memory_budget_bytes": int,
+                    "bytes_per_row": float,
+                    "chunk_sizes": [int, ...],
+                },
+            }
+    """
+    sizer = AdaptiveChunkSizer(memory_budget_bytes=int(memory_budget_mb * 1024 * 1024))
+    running = RunningMatchSummary()
+
+    with pd.read_csv(postcode_csv, iterator=True) as reader:
+        header_checked = False
+        seen = PostcodeKeySet()
+
+        def matched_chunks() -> Iterator[gpd.GeoDataFrame]:
+            nonlocal header_checked
+
+            while True:
+                try:
+                    df = reader.get_chunk(sizer.next_chunk_size())
+                except StopIteration:
+                    # The size recorded for the empty read was never used
+                    sizer.chunk_sizes.pop()
+                    return
+
+                if not header_checked:
+                    is_valid, missing = validate_postcode_columns(df.columns)
+                    if not is_valid:
+                        raise ValueError(
+                            f"Postcode dataset missing required columns: {missing}"
+                        )
+                    header_checked = True
+
+                n_read = len(df)
+                read_bytes = int(df.memory_usage(deep=True).sum())
+
+                # Encoded once per chunk; the loader and filters reuse the column
+                df = df.assign(postcode_key=frame_postcode_keys(df, "pcd"))
+
+                if apply_basic_filters:
+                    # Per-chunk dedup cannot see earlier chunks
+                    df = df[~seen.contains(df["postcode_key"].to_numpy())]
+
+                points = load_postcodes_from_dataframe(
+                    df, apply_basic_filters=apply_basic_filters
+                )
+
+                if apply_basic_filters:
+                    seen.add(np.array([p.postcode_key for p in points], dtype=np.int64))
+
+                match_bytes = 0
+                for match_chunk in iter_match_batches([points], gridcells):
+                    # PostcodePoint models hold the same fields as the
+                    # match rows, so count the result twice
+                    match_bytes += 2 * int(match_chunk.memory_usage(deep=True).sum())
+                    running.update(match_chunk)
+                    yield match_chunk
+
+                # Chunk sizes count rows read, so both parts are divided by
+                # n_read; rows dropped as duplicates add no match bytes
+                sizer.observe(n_read, read_bytes + match_bytes)
+
+        rows_written = export_chunks_to_csv(matched_chunks(), output_csv)
+
+    return {
+        "summary": running.to_dict(),
+        "rows_written": rows_written,
+        "chunking": sizer.to_metadata(),
+    }
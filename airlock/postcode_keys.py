@@ -0,0 +1,417 @@
+"""
+Packed integer encoding of UK postcodes.
+
+A normalised postcode is at most 7 characters from [A-Z0-9]: an outward
+code of 2–4 characters followed by a 3-character inward code. Each
+character (plus a padding symbol) is one base-37 digit, so a postcode
+packs losslessly into an int64 (37^7 < 2^37). Key order equals the
+string order of "OUTWARD INWARD", so sorting keys sorts postcodes.
+
+Raw strings are encoded with codepoint-table lookups on fixed-width
+arrays; the regex normalisation is only used for the rare non-ASCII or
+malformed values. The loader encodes each postcode once and carries the
+key as postcode_key on PostcodePoint and the match result, where dedup,
+sorting and lookups use it.
+"""
+
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .arrow_io import pa
+
+
+# Compact UK postcode: outward code (2–4 chars) + inward code (digit + 2 letters)
+POSTCODE_COMPACT_PATTERN = r"^[A-Z]{1,2}[0-9][A-Z0-9]?[0-9][A-Z]{2}$"
+
+# Key for missing or malformed postcodes
+INVALID_POSTCODE_KEY = -1
+
+_BASE = 37
+_OUTWARD_WIDTH = 4
+_INWARD_WIDTH = 3
+
+# Codepoint -> base-37 digit (0 = padding, 1–10 = 0–9, 11–36 = A–Z)
+_ENCODE_TABLE = np.zeros(128, dtype=np.int64)
+_ENCODE_TABLE[ord("0"):ord("9") + 1] = np.arange(1, 11)
+_ENCODE_TABLE[ord("A"):ord("Z") + 1] = np.arange(11, 37)
+
+# Base-37 digit -> codepoint
+_DECODE_TABLE = np.zeros(_BASE, dtype=np.uint32)
+_DECODE_TABLE[1:11] = np.arange(ord("0"), ord("9") + 1)
+_DECODE_TABLE[11:37] = np.arange(ord("A"), ord("Z") + 1)
+
+# Place values, most significant (first outward character) first
+_POWERS = _BASE ** np.arange(
+    _OUTWARD_WIDTH + _INWARD_WIDTH - 1, -1, -1, dtype=np.int64
+)
+
+# ASCII codepoint of raw input -> base-37 digit; lower case maps like
+# upper case and every other character (spaces, punctuation) to 0,
+# i.e. is dropped as by normalise_postcodes
+_RAW_TABLE = np.zeros(128, dtype=np.int8)
+_RAW_TABLE[ord("0"):ord("9") + 1] = np.arange(1, 11)
+_RAW_TABLE[ord("A"):ord("Z") + 1] = np.arange(11, 37)
+_RAW_TABLE[ord("a"):ord("z") + 1] = np.arange(11, 37)
+
+# Rows per block of the raw encoder (bounds its temporary matrices)
+_RAW_BLOCK_ROWS = 1 << 18
+
+# Longer raw values (in characters or UTF-8 bytes) take the regex path
+_RAW_MAX_WIDTH = 16
+
+
+def normalise_postcodes(postcodes: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Normalise messy postcode strings with vectorized string operations.
+
+    "sw1a1aa", "SW1A  1AA", " sw1a 1aa " and the ONSPD pcd/pcd2/pcd3
+    layouts all normalise to the same compact key ("SW1A1AA") and the
+    same display form ("SW1A 1AA").
+
+    Args:
+        postcodes: Series of raw postcode values (may contain NaN).
+
+    Returns:
+        (compact, display) Series aligned with the input. Missing or
+        empty inputs give <NA> in both; malformed postcodes keep their
+        compact form as display.
+    """
+    compact = (
+        postcodes.astype("string")
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]", "", regex=True)
+    )
+    compact = compact.mask(compact == "")
+
+    # Only well-formed postcodes get a space before the inward code
+    is_valid = compact.str.fullmatch(POSTCODE_COMPACT_PATTERN).fillna(False)
+    display = (compact.str[:-3] + " " + compact.str[-3:]).where(is_valid, compact)
+    return compact, display
+
+
+def _codepoints(values: pd.Series, width: int) -> np.ndarray:
+    """Fixed-width (n, width) codepoint matrix of short ASCII strings."""
+    fixed = values.to_numpy(dtype=f"U{width}")
+    return fixed.view(np.uint32).reshape(len(fixed), width)
+
+
+def _encode_compact(compact: pd.Series) -> np.ndarray:
+    """Packed keys for already-normalised compact postcodes."""
+    is_valid = (
+        compact.str.fullmatch(POSTCODE_COMPACT_PATTERN)
+        .fillna(False)
+        .to_numpy(dtype=bool)
+    )
+
+    keys = np.full(len(compact), INVALID_POSTCODE_KEY, dtype=np.int64)
+    if not is_valid.any():
+        return keys
+
+    valid = compact[is_valid]
+    digits = np.hstack([
+        _ENCODE_TABLE[_codepoints(valid.str[:-3], _OUTWARD_WIDTH)],
+        _ENCODE_TABLE[_codepoints(valid.str[-3:], _INWARD_WIDTH)],
+    ])
+
+    keys[is_valid] = digits @ _POWERS
+    return keys
+
+
+def _encode_raw_block(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Packed keys of an (n, width) matrix of character codes (see _encode_raw)."""
+    n = len(codes)
+    full_width = _OUTWARD_WIDTH + _INWARD_WIDTH
+
+    non_ascii = (codes >= 128).any(axis=1)
+    digits = _RAW_TABLE[np.minimum(codes, 127)]
+    kept = digits > 0
+    position = np.cumsum(kept, axis=1, dtype=np.int16) - 1
+    lengths = position[:, -1] + 1
+
+    # Scatter the kept characters to the left (the compact form); only
+    # the first full_width matter, longer values are malformed anyway
+    take = kept & (position < full_width)
+    compact = np.zeros(n * full_width, dtype=np.int8)
+    row_start = np.arange(n, dtype=np.int64)[:, None] * full_width
+    compact[(row_start + position)[take]] = digits[take]
+    compact = compact.reshape(n, full_width)
+
+    outward_len = np.clip(lengths - _INWARD_WIDTH, 0, _OUTWARD_WIDTH)
+    inward = np.take_along_axis(
+        compact, outward_len[:, None] + np.arange(_INWARD_WIDTH), axis=1
+    )
+
+    def is_letter(d):
+        return d >= 11
+
+    def is_digit(d):
+        return (d >= 1) & (d <= 10)
+
+    # POSTCODE_COMPACT_PATTERN: one or two letters, a digit, an optional
+    # letter or digit, then digit + two letters
+    area_len = 1 + is_letter(compact[:, 1])
+    district_digit = np.take_along_axis(compact, area_len[:, None], axis=1)[:, 0]
+    valid = (
+        ~non_ascii
+        & (lengths >= 5)
+        & (lengths <= full_width)
+        & is_letter(compact[:, 0])
+        & is_digit(district_digit)
+        & (outward_len >= area_len + 1)
+        & (outward_len <= area_len + 2)
+        & is_digit(inward[:, 0])
+        & is_letter(inward[:, 1])
+        & is_letter(inward[:, 2])
+    )
+
+    # Horner evaluation of the base-37 digits (outward code padded to 4)
+    keys = np.zeros(n, dtype=np.int64)
+    for j in range(_OUTWARD_WIDTH):
+        keys = keys * _BASE + np.where(outward_len > j, compact[:, j], 0)
+    for j in range(_INWARD_WIDTH):
+        keys = keys * _BASE + inward[:, j]
+    keys[~valid] = INVALID_POSTCODE_KEY
+    malformed = ~valid & ~non_ascii & (lengths > 0)
+    return keys, non_ascii, malformed
+
+
+def _raw_code_blocks(text: pd.Series) -> Iterator[np.ndarray]:
+    """
+    (rows, width) character-code matrices of string values, zero-padded.
+
+    With pyarrow the UTF-8 bytes are gathered straight from the Arrow
+    buffers (multi-byte characters show up as codes >= 128); otherwise
+    the values go through a fixed-width numpy array. Values longer than
+    _RAW_MAX_WIDTH are marked with a code of 128 so they take the regex
+    path.
+    """
+    if pa is not None:
+        array = pa.array(text, type=pa.large_string())
+        offsets = np.frombuffer(array.buffers()[1], dtype=np.int64)
+        offsets = offsets[array.offset:array.offset + len(array) + 1]
+        data = array.buffers()[2]
+        data = np.frombuffer(data, dtype=np.uint8) if data is not None else np.zeros(1, np.uint8)
+    else:
+        offsets = data = None
+
+    for start in range(0, len(text), _RAW_BLOCK_ROWS):
+        if offsets is None:
+            fixed = text.iloc[start:start + _RAW_BLOCK_ROWS].to_numpy(dtype="U")
+            width = fixed.dtype.itemsize // 4
+            codes = fixed.view(np.uint32).reshape(len(fixed), width)
+            lengths = (codes > 0).sum(axis=1)
+        else:
+            starts = offsets[start:start + _RAW_BLOCK_ROWS + 1]
+            lengths = np.diff(starts)
+            width = int(min(max(lengths.max(), 1), _RAW_MAX_WIDTH))
+            columns = np.arange(width)
+            index = np.minimum(starts[:-1, None] + columns, len(data) - 1)
+            codes = np.where(columns < lengths[:, None], data[index], 0)
+
+        if width > _RAW_MAX_WIDTH or (lengths > _RAW_MAX_WIDTH).any():
+            codes = codes[:, :_RAW_MAX_WIDTH].copy()
+            codes[lengths > _RAW_MAX_WIDTH, 0] = 128
+        yield codes
+
+
+def _encode_raw(postcodes: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Packed keys straight from raw postcode values, without regex passes.
+
+    Returns:
+        (keys, unhandled, malformed): keys as encode_postcodes for plain
+        ASCII values; unhandled marks rows left to the regex path
+        (non-ASCII text, which str.upper can map to letters, and very
+        long values); malformed marks other non-empty values that are
+        not postcodes.
+    """
+    text = postcodes.astype("string").fillna("")
+    parts = [_encode_raw_block(codes) for codes in _raw_code_blocks(text)]
+    if not parts:
+        empty = np.zeros(0, dtype=bool)
+        return np.zeros(0, dtype=np.int64), empty, empty
+    return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+
+def encode_postcodes(postcodes: pd.Series) -> np.ndarray:
+    """
+    Encode postcodes as packed int64 keys.
+
+    Any spacing/case variant of a postcode gets the same key, as if the
+    input were normalised first.
+
+    Args:
+        postcodes: Series of raw postcode values.
+
+    Returns:
+        int64 array of keys; INVALID_POSTCODE_KEY for missing or
+        malformed postcodes.
+    """
+    postcodes = pd.Series(postcodes).reset_index(drop=True)
+    keys, unhandled, _ = _encode_raw(postcodes)
+
+    if unhandled.any():
+        compact, _ = normalise_postcodes(postcodes[unhandled])
+        keys[unhandled] = _encode_compact(compact)
+    return keys
+
+
+def decode_postcodes(keys: np.ndarray) -> np.ndarray:
+    """
+    Decode packed keys back to display-form postcodes ("SW1A 1AA").
+
+    Args:
+        keys: int64 array from encode_postcodes.
+
+    Returns:
+        Object array of postcode strings; None for invalid keys.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    is_valid = keys >= 0
+
+    digits = (keys[is_valid, None] // _POWERS) % _BASE
+    chars = _DECODE_TABLE[digits]
+
+    outward = np.ascontiguousarray(chars[:, :_OUTWARD_WIDTH])
+    inward = np.ascontiguousarray(chars[:, _OUTWARD_WIDTH:])
+    outward = outward.view(f"U{_OUTWARD_WIDTH}").ravel()
+    inward = inward.view(f"U{_INWARD_WIDTH}").ravel()
+
+    result = np.full(len(keys), None, dtype=object)
+    result[is_valid] = np.char.add(np.char.add(outward, " "), inward)
+    return result
+
+
+def compact_lookup_keys(compact: pd.Series) -> np.ndarray:
+    """
+    int64 identity keys for joins, dedup and sorting, from compact
+    postcodes (the first output of normalise_postcodes).
+
+    Well-formed postcodes get their packed key (>= 0). Malformed but
+    non-empty values get a negative hash of their normalised form, so
+    they still compare equal to themselves. Missing values get
+    INVALID_POSTCODE_KEY.
+    """
+    compact = compact.reset_index(drop=True)
+    keys = _encode_compact(compact)
+
+    malformed = (keys == INVALID_POSTCODE_KEY) & compact.notna().to_numpy()
+    if malformed.any():
+        hashed = pd.util.hash_array(compact[malformed].to_numpy(dtype=object))
+        keys[malformed] = -((hashed >> np.uint64(2)).astype(np.int64)) - 2
+
+    return keys
+
+
+def postcode_lookup_keys(postcodes: pd.Series) -> np.ndarray:
+    """
+    int64 identity keys for raw postcode values.
+
+    See compact_lookup_keys for the key layout.
+    """
+    postcodes = pd.Series(postcodes).reset_index(drop=True)
+    keys, unhandled, malformed = _encode_raw(postcodes)
+
+    # Only values that are not plain postcodes go through the regex path
+    redo = unhandled | malformed
+    if redo.any():
+        compact, _ = normalise_postcodes(postcodes[redo])
+        keys[redo] = compact_lookup_keys(compact)
+    return keys
+
+
+def frame_postcode_keys(df: pd.DataFrame, column: str = "postcode") -> np.ndarray:
+    """
+    Lookup keys of a table's postcodes.
+
+    Uses the postcode_key column carried by match results and loaded
+    postcode tables, and only encodes column when it is absent (e.g. a
+    re-read export).
+    """
+    if "postcode_key" in df.columns:
+        return df["postcode_key"].to_numpy(dtype=np.int64)
+    return postcode_lookup_keys(df[column])
+
+
+class PostcodeKeySet:
+    """
+    Growing set of int64 postcode keys at 8 bytes per key.
+
+    Keys are held in sorted runs whose sizes at least double towards the
+    front of the list, as in a log-structured merge tree: adding a batch
+    merges only runs of similar size (O(n log n) work overall) and a
+    membership test is one binary search per run.
+    """
+
+    def __init__(self) -> None:
+        self._runs: List[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(run.nbytes for run in self._runs)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Boolean array: which keys are in the set."""
+        keys = np.asarray(keys, dtype=np.int64)
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self._runs:
+            positions = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found |= run[positions] == keys
+        return found
+
+    def add(self, keys: np.ndarray) -> None:
+        """Add keys (duplicates and already-present keys are ignored)."""
+        run = np.unique(np.asarray(keys, dtype=np.int64))
+        run = run[~self.contains(run)]
+        if len(run) == 0:
+            return
+
+        self._runs.append(run)
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last = self._runs.pop()
+            # Two disjoint sorted runs: the stable sort merges them in O(n)
+            self._runs[-1] = np.sort(np.concatenate([self._runs[-1], last]), kind="stable")
+
+
+def district_keys(keys: np.ndarray) -> np.ndarray:
+    """
+    Keys of the postcode district (outward code, e.g. "SW1A").
+
+    The inward digits are zeroed, so the result decodes to the outward
+    code. Invalid keys stay invalid.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    inward_span = _BASE ** _INWARD_WIDTH
+    return np.where(keys >= 0, keys // inward_span * inward_span, INVALID_POSTCODE_KEY)
+
+
+def area_keys(keys: np.ndarray) -> np.ndarray:
+    """
+    Keys of the postcode area (leading letters, e.g. "SW").
+
+    Everything after the first one or two letters is zeroed, so the
+    result decodes to the area. Invalid keys stay invalid.
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    first_span = _BASE ** (_OUTWARD_WIDTH + _INWARD_WIDTH - 1)
+    second_span = _BASE ** (_OUTWARD_WIDTH + _INWARD_WIDTH - 2)
+
+    first = keys // first_span
+    second = (keys // second_span) % _BASE
+    # Digits 11–36 are letters; a digit in second place ends the area
+    area = first * first_span + np.where(second >= 11, second * second_span, 0)
+    return np.where(keys >= 0, area, INVALID_POSTCODE_KEY)
+
+
+def decode_prefix_keys(keys: np.ndarray) -> np.ndarray:
+    """Decode district/area keys to their labels ("SW1A", "SW")."""
+    decoded = decode_postcodes(keys)
+    return np.array(
+        [d.strip() if d is not None else None for d in decoded],
+        dtype=object,
+    )
@@ -1,9 +1,10 @@
 from typing import List
 
 import pandas as pd
-from shapely.geometry import Point
 
+from .arrow_io import as_dataframe
 from .models import PostcodePoint
+from .postcode_keys import frame_postcode_keys
 from .validation import validate_postcode_columns
 from .filters import filter_postcodes_basic
 
@@ -22,28 +23,38 @@ def load_postcodes_from_dataframe(
 
     Optional:
         - doterm (used by filters)
+        - postcode_key (packed keys; encoded here when absent)
+
+    Each postcode is encoded to its packed key once, here; the key is
+    reused by the filters and carried on PostcodePoint.postcode_key.
 
     Args:
-        df: Raw postcode DataFrame.
+        df: Raw postcode DataFrame (or Arrow table).
         apply_basic_filters: If True, clean the DataFrame (drop missing coords,
                              drop duplicates, keep only active codes).
 
     Returns:
         List[PostcodePoint]
     """
+    from shapely.geometry import Point
+
+    df = as_dataframe(df)
 
     # Validate expected columns
     is_valid, missing = validate_postcode_columns(df.columns)
     if not is_valid:
         raise ValueError(f"Postcode dataset missing required columns: {missing}")
 
+    if "postcode_key" not in df.columns:
+        df = df.assign(postcode_key=frame_postcode_keys(df, "pcd"))
+
     # Apply filters (remove missing coords, duplicates, terminated, etc.)
     if apply_basic_filters:
         df = filter_postcodes_basic(df)
 
     points: List[PostcodePoint] = []
 
-    for _, row in df.iterrows():
+    for (_, row), key in zip(df.iterrows(), df["postcode_key"].to_numpy()):
         postcode = str(row["pcd"])
         e = row["oseast1m"]
         n = row["osnrth1m"]
@@ -60,6 +71,7 @@ def load_postcodes_from_dataframe(
                 easting=float(e),
                 northing=float(n),
                 geometry=geometry,
+                postcode_key=int(key),
             )
         )
 
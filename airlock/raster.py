@@ -0,0 +1,198 @@
+"""
+Raster rendering of grid layers for map display.
+
+Every 1 km cell is one pixel of a dense array laid over the regular
+lattice, so a national layer (~250k cells) is a small image that can be
+cropped, downsampled and colour-mapped with array operations instead of
+drawing polygons or points.
+"""
+
+import warnings
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .lattice import GridLattice, locate_points
+
+
+# Viridis-like colour stops (RGB) used for colour mapping
+COLORMAP_STOPS = np.array([
+    [68, 1, 84],
+    [59, 82, 139],
+    [33, 145, 140],
+    [94, 201, 98],
+    [253, 231, 37],
+], dtype=float)
+
+# Longest side (pixels) of a rendered view
+MAX_VIEW_PIXELS = 800
+
+
+def _colormap_lut(stops: np.ndarray = COLORMAP_STOPS, size: int = 256) -> np.ndarray:
+    """Interpolate colour stops into a (size, 3) uint8 lookup table."""
+    positions = np.linspace(0, 1, len(stops))
+    samples = np.linspace(0, 1, size)
+    lut = np.column_stack([np.interp(samples, positions, stops[:, c]) for c in range(3)])
+    return lut.round().astype(np.uint8)
+
+
+_LUT = _colormap_lut()
+
+
+def rasterise_cell_values(lattice: GridLattice, values: np.ndarray) -> np.ndarray:
+    """
+    Lay per-cell values (aligned with the grid rows) onto the lattice.
+
+    Returns:
+        (n_rows, n_cols) float array, north at the top (row 0), NaN where
+        the lattice has no cell.
+    """
+    values = np.asarray(values, dtype=float)
+    raster = np.full(lattice.cell_index.shape, np.nan)
+    has_cell = lattice.cell_index >= 0
+    raster[has_cell] = values[lattice.cell_index[has_cell]]
+    return np.flipud(raster)
+
+
+def rasterise_points(
+    lattice: GridLattice,
+    x: np.ndarray,
+    y: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Count (or sum weights of) points per lattice pixel.
+
+    Points outside the lattice extent are ignored. Pixels with no points
+    are 0, including pixels without a grid cell.
+
+    Returns:
+        (n_rows, n_cols) float array, north at the top.
+    """
+    cols, rows = locate_points(lattice, x, y)
+    inside = (cols >= 0) & (cols < lattice.n_cols) & (rows >= 0) & (rows < lattice.n_rows)
+
+    flat = rows[inside] * lattice.n_cols + cols[inside]
+    w = None if weights is None else np.asarray(weights, dtype=float)[inside]
+
+    counts = np.bincount(flat, weights=w, minlength=lattice.n_rows * lattice.n_cols)
+    return np.flipud(counts.reshape(lattice.n_rows, lattice.n_cols).astype(float))
+
+
+def rasterise_match_share(
+    lattice: GridLattice,
+    x: np.ndarray,
+    y: np.ndarray,
+    matched: np.ndarray,
+) -> np.ndarray:
+    """
+    Share of postcodes per pixel that matched a grid cell.
+
+    Returns:
+        (n_rows, n_cols) float array in [0, 1], NaN where a pixel has no
+        postcodes.
+    """
+    total = rasterise_points(lattice, x, y)
+    hits = rasterise_points(lattice, x, y, weights=np.asarray(matched, dtype=float))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, hits / total, np.nan)
+
+
+def cell_postcode_counts(
+    grid_ids: Sequence[str],
+    matched_grid_ids: pd.Series,
+) -> np.ndarray:
+    """Number of matched postcodes per grid row (aligned with grid_ids)."""
+    positions = pd.Index(grid_ids).get_indexer(matched_grid_ids.dropna())
+    positions = positions[positions >= 0]
+    return np.bincount(positions, minlength=len(grid_ids)).astype(float)
+
+
+def crop_and_downsample(
+    raster: np.ndarray,
+    lattice: GridLattice,
+    view_bounds: Tuple[float, float, float, float],
+    max_pixels: int = MAX_VIEW_PIXELS,
+    reducer: str = "mean",
+) -> np.ndarray:
+    """
+    Cut a view window out of a full raster and reduce it to screen size.
+
+    The window is aggregated in square blocks of k × k cells, with k the
+    smallest factor that brings the longest side under max_pixels, so a
+    national view and a city view both render at the right resolution.
+
+    Args:
+        raster: Full raster from rasterise_cell_values / rasterise_points.
+        lattice: GridLattice the raster was built on.
+        view_bounds: (minx, miny, maxx, maxy) in OSGB36 metres.
+        max_pixels: Longest side of the output image.
+        reducer: "mean" or "max" (NaN-aware) block aggregation.
+
+    Returns:
+        2D float array (north at the top).
+    """
+    minx, miny, maxx, maxy = view_bounds
+    size = lattice.cell_size
+
+    c0 = int(np.clip(np.floor((minx - lattice.origin_x) / size), 0, lattice.n_cols))
+    c1 = int(np.clip(np.ceil((maxx - lattice.origin_x) / size), 0, lattice.n_cols))
+    r0 = int(np.clip(np.floor((miny - lattice.origin_y) / size), 0, lattice.n_rows))
+    r1 = int(np.clip(np.ceil((maxy - lattice.origin_y) / size), 0, lattice.n_rows))
+
+    # Raster rows are flipped (north at the top)
+    window = raster[lattice.n_rows - r1:lattice.n_rows - r0, c0:c1]
+    if window.size == 0:
+        return window
+
+    k = max(1, int(np.ceil(max(window.shape) / max_pixels)))
+    if k == 1:
+        return window
+
+    h = int(np.ceil(window.shape[0] / k)) * k
+    w = int(np.ceil(window.shape[1] / k)) * k
+    padded = np.full((h, w), np.nan)
+    padded[:window.shape[0], :window.shape[1]] = window
+    blocks = padded.reshape(h // k, k, w // k, k)
+
+    # All-NaN blocks (sea, outside the grid) stay NaN without warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        if reducer == "max":
+            return np.nanmax(blocks, axis=(1, 3))
+        return np.nanmean(blocks, axis=(1, 3))
+
+
+def colourise(
+    raster: np.ndarray,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Map a float raster to an RGBA image with a vectorized lookup table.
+
+    NaN pixels are fully transparent. vmin/vmax default to the 2nd and
+    98th percentiles of the finite values.
+
+    Returns:
+        (h, w, 4) uint8 array.
+    """
+    finite = np.isfinite(raster)
+    rgba = np.zeros(raster.shape + (4,), dtype=np.uint8)
+    if not finite.any():
+        return rgba
+
+    if vmin is None:
+        vmin = float(np.percentile(raster[finite], 2))
+    if vmax is None:
+        vmax = float(np.percentile(raster[finite], 98))
+    span = vmax - vmin if vmax > vmin else 1.0
+
+    scaled = np.clip((raster[finite] - vmin) / span, 0, 1)
+    idx = (scaled * (len(_LUT) - 1)).astype(np.int64)
+
+    rgba[finite, :3] = _LUT[idx]
+    rgba[finite, 3] = 255
+    return rgba
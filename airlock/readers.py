@@ -0,0 +1,157 @@
+import io
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow
+
+    CSV_ENGINE = "pyarrow"
+except ImportError:  # pragma: no cover - depends on environment
+    pyarrow = None
+    CSV_ENGINE = "c"
+
+
+# Folder holding the per-region split files inside ONSPD zips
+ONSPD_SPLIT_DIR = "multi_csv"
+
+# Folder holding the ONSPD data files (Documents/ holds lookup tables)
+ONSPD_DATA_DIR = "Data"
+
+
+def _source_name(source: Any) -> str:
+    """File name of a path or file-like object (e.g. a Streamlit upload)."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    return str(getattr(source, "name", ""))
+
+
+def _read_csv(buffer: Any, usecols: Optional[Sequence[str]], **kwargs) -> pd.DataFrame:
+    """pd.read_csv using the fastest available engine."""
+    return pd.read_csv(
+        buffer,
+        usecols=list(usecols) if usecols is not None else None,
+        engine=CSV_ENGINE,
+        **kwargs,
+    )
+
+
+def select_csv_members(names: Sequence[str]) -> List[str]:
+    """
+    Choose which CSV members of an archive hold the data.
+
+    - Only .csv files are considered (macOS metadata folders are skipped).
+    - If the archive has a Data/ folder (ONSPD layout), only files under it
+      are used, so the lookup tables in Documents/ are ignored.
+    - If per-region splits (multi_csv/) are present alongside a single
+      national file, the splits are used so they can be parsed in parallel.
+    """
+    csvs = [
+        n for n in names
+        if n.lower().endswith(".csv") and not n.startswith("__MACOSX/")
+    ]
+
+    data_csvs = [n for n in csvs if f"{ONSPD_DATA_DIR}/" in n]
+    if data_csvs:
+        csvs = data_csvs
+
+    split_csvs = [n for n in csvs if f"/{ONSPD_SPLIT_DIR}/" in f"/{n}"]
+    if split_csvs:
+        csvs = split_csvs
+
+    return sorted(csvs)
+
+
+def read_zip_members(
+    source: Any,
+    members: Optional[Sequence[str]] = None,
+    usecols: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Read CSV members of a zip archive without extracting to disk.
+
+    Multiple members are parsed concurrently in a thread pool (the
+    pyarrow CSV engine releases the GIL while parsing); each worker opens
+    its own handle on the archive. Results are concatenated in member order.
+
+    Args:
+        source: Path to a .zip file or a file-like object.
+        members: Members to read. If None, chosen by select_csv_members.
+        usecols: Optional subset of columns to parse.
+        max_workers: Thread pool size (default: one per member, capped
+                     by the CPU count).
+
+    Returns:
+        Single DataFrame with the rows of all members.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        def open_archive() -> zipfile.ZipFile:
+            return zipfile.ZipFile(source)
+    else:
+        # Bytes objects are shared, not copied, by each BytesIO view
+        data = source.getvalue() if hasattr(source, "getvalue") else source.read()
+
+        def open_archive() -> zipfile.ZipFile:
+            return zipfile.ZipFile(io.BytesIO(data))
+
+    if members is None:
+        with open_archive() as zf:
+            members = select_csv_members(zf.namelist())
+
+    if not members:
+        raise ValueError("Archive contains no CSV files.")
+
+    def read_member(name: str) -> pd.DataFrame:
+        with open_archive() as zf, zf.open(name) as fh:
+            return _read_csv(fh, usecols)
+
+    if len(members) == 1:
+        return read_member(members[0])
+
+    workers = max_workers or min(len(members), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = list(pool.map(read_member, members))
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_table(
+    source: Any,
+    usecols: Optional[Sequence[str]] = None,
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Read a CSV dataset from a plain, gzip or zip file.
+
+    The format is taken from the file name (.csv, .gz, .zip), so both
+    paths and uploaded file objects work. Archives are decompressed as
+    a stream; nothing is extracted to disk. Plain CSV paths are parsed
+    from a read-only memory map rather than read into a buffer first.
+
+    Args:
+        source: Path or file-like object with a name attribute.
+        usecols: Optional subset of columns to parse.
+        max_workers: Thread pool size for multi-member zip archives.
+
+    Returns:
+        DataFrame with the parsed rows.
+    """
+    name = _source_name(source).lower()
+
+    if name.endswith(".zip"):
+        return read_zip_members(source, usecols=usecols, max_workers=max_workers)
+
+    if name.endswith(".gz"):
+        return _read_csv(source, usecols, compression="gzip")
+
+    if isinstance(source, (str, os.PathLike)):
+        if pyarrow is not None:
+            with pyarrow.memory_map(os.fspath(source)) as mapped:
+                return _read_csv(mapped, usecols)
+        return _read_csv(source, usecols, memory_map=True)
+
+    return _read_csv(source, usecols)
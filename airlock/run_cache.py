@@ -0,0 +1,489 @@
+"""
+Whole-run result cache.
+
+A run is identified by a fingerprint of its inputs (file contents), the
+values in airlock.config, the effective filter_postcodes_basic options,
+the AirLock version and a hash of the package sources. Each result is
+stored as a directory of data files (Parquet tables, or CSV without
+pyarrow, plus JSON and .npy arrays); nothing is unpickled, so a shared
+cache directory cannot be used to run code. The least recently used
+entries are evicted once the directory exceeds its size limit.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Callable, Optional, Tuple
+
+import pandas as pd
+
+from . import __version__, config
+from .cell_index import build_cell_index, load_cell_index
+from .config import CRS_OSGB36
+from .diagnostics import diagnose_unmatched
+from .exporters import prepare_export_table
+from .filters import filter_postcodes_basic
+from .grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
+from .matcher import match_postcodes_to_grid, summarize_matches
+from .methods_summary import generate_methods_summary
+from .postcode_loader import load_postcodes_from_dataframe
+from .readers import read_table
+from .server_files import quick_fingerprint
+from .validation import (
+    validate_nox_columns,
+    validate_nox_coordinates,
+    validate_postcode_columns,
+    validate_postcode_coordinates,
+)
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on environment
+    pq = None
+
+
+# Default cache location (override with the AIRLOCK_CACHE_DIR variable)
+RUN_CACHE_DIR = os.environ.get(
+    "AIRLOCK_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "airlock", "runs"),
+)
+
+# Default size limit of the cache directory
+RUN_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+# Suffix of entries still being written
+_TMP_SUFFIX = ".tmp"
+
+# Files of one cache entry
+_RUN_FILE = "run.json"
+_METHODS_FILE = "methods.txt"
+_EXCEL_FILE = "excel.xlsx"
+_CELL_INDEX_DIR = "cell_index"
+
+# Tables are stored as Parquet when pyarrow is installed, CSV otherwise
+_TABLE_SUFFIX = ".parquet" if pq is not None else ".csv"
+
+# Text columns of the stored tables (read back as strings under CSV)
+_TEXT_COLUMNS = ("postcode", "matched_grid_id", "reason", "nearest_grid_id")
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+def fingerprint_source(source: Any) -> str:
+    """
+    Fingerprint of a file.
+
+    Paths (server-side files) get the cheap quick_fingerprint of size,
+    mtime and sampled blocks; in-memory sources (e.g. a Streamlit
+    upload) get a SHA-256 of their full contents.
+
+    Args:
+        source: Path, bytes, or file-like object.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return quick_fingerprint(os.fspath(source))
+
+    digest = hashlib.sha256()
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif hasattr(source, "getvalue"):
+        digest.update(source.getvalue())
+    else:
+        position = source.tell()
+        for block in iter(lambda: source.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+        source.seek(position)
+
+    return digest.hexdigest()
+
+
+def config_snapshot() -> dict:
+    """The upper-case settings of airlock.config."""
+    return {
+        name: getattr(config, name)
+        for name in sorted(dir(config))
+        if name.isupper()
+    }
+
+
+def effective_filter_options(filter_options: Optional[dict] = None) -> dict:
+    """filter_postcodes_basic keyword defaults updated with filter_options."""
+    params = inspect.signature(filter_postcodes_basic).parameters
+    options = {
+        name: p.default
+        for name, p in params.items()
+        if p.default is not inspect.Parameter.empty
+    }
+
+    unknown = set(filter_options or {}) - set(options)
+    if unknown:
+        raise ValueError(f"Unknown filter options: {sorted(unknown)}")
+
+    options.update(filter_options or {})
+    return options
+
+
+@lru_cache(maxsize=None)
+def package_fingerprint() -> str:
+    """
+    SHA-256 of the airlock package sources.
+
+    Part of every cache key, so results computed by different code are
+    never reused even when __version__ was not bumped.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(package_dir)):
+        if name.endswith(".py"):
+            digest.update(name.encode("utf-8"))
+            with open(os.path.join(package_dir, name), "rb") as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def fingerprint_key(
+    nox_fingerprint: str,
+    postcode_fingerprint: str,
+    filter_options: Optional[dict] = None,
+) -> str:
+    """Cache key of a match run over inputs with the given fingerprints."""
+    payload = {
+        "nox": nox_fingerprint,
+        "postcodes": postcode_fingerprint,
+        "config": config_snapshot(),
+        "filters": effective_filter_options(filter_options),
+        "version": __version__,
+        "code": package_fingerprint(),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def run_cache_key(
+    nox_source: Any,
+    postcode_source: Any,
+    filter_options: Optional[dict] = None,
+) -> str:
+    """Cache key of a match run over the given inputs and options."""
+    return fingerprint_key(
+        fingerprint_source(nox_source),
+        fingerprint_source(postcode_source),
+        filter_options,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Entry files
+# ---------------------------------------------------------------------------
+
+def _json_default(value: Any) -> Any:
+    # numpy scalars and arrays in summaries and coordinate reports
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Not JSON serialisable: {type(value).__name__}")
+
+
+def _write_table(df: pd.DataFrame, path: str) -> None:
+    df = pd.DataFrame(df.drop(columns=["geometry"], errors="ignore"))
+    if pq is not None:
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+def _read_table(path: str) -> pd.DataFrame:
+    if pq is not None:
+        return pd.read_parquet(path)
+    return pd.read_csv(
+        path,
+        dtype={c: str for c in _TEXT_COLUMNS},
+        keep_default_na=False,
+        na_values=[""],
+    )
+
+
+def _methods_text(run: dict) -> str:
+    # Generated once per computed run and stored with it, so a cached
+    # copy keeps the timestamp of the original run
+    summary = run["summary"]
+    return generate_methods_summary(
+        nox_rows=run["grid_cells"],
+        postcode_rows=run["postcode_rows"],
+        matched_rows=summary["matched"],
+        unmatched_rows=summary["unmatched"],
+        match_rate=summary["match_rate"],
+    )
+
+
+def _save_run(run: dict, directory: str) -> None:
+    """Write a match_frames result into an (empty) entry directory."""
+    meta = {
+        name: run[name]
+        for name in ("summary", "grid_cells", "postcode_rows",
+                     "nox_coordinates", "postcode_coordinates")
+    }
+    with open(os.path.join(directory, _RUN_FILE), "w", encoding="utf-8") as fh:
+        json.dump(meta, fh, default=_json_default)
+
+    with open(os.path.join(directory, _METHODS_FILE), "w", encoding="utf-8") as fh:
+        fh.write(run["methods_text"])
+
+    _write_table(run["match"], os.path.join(directory, "match" + _TABLE_SUFFIX))
+    _write_table(run["unmatched"], os.path.join(directory, "unmatched" + _TABLE_SUFFIX))
+
+    if "excel" in run:
+        with open(os.path.join(directory, _EXCEL_FILE), "wb") as fh:
+            fh.write(run["excel"])
+
+    if "cell_index" in run:
+        run["cell_index"].save(os.path.join(directory, _CELL_INDEX_DIR))
+
+
+def _load_run(directory: str) -> dict:
+    """Read an entry written by _save_run back into a match_frames result."""
+    import geopandas as gpd
+
+    with open(os.path.join(directory, _RUN_FILE), encoding="utf-8") as fh:
+        run = json.load(fh)
+
+    match_df = _read_table(os.path.join(directory, "match" + _TABLE_SUFFIX))
+    run["match"] = gpd.GeoDataFrame(
+        match_df,
+        geometry=gpd.points_from_xy(match_df["easting"], match_df["northing"]),
+        crs=CRS_OSGB36,
+    )
+    run["unmatched"] = _read_table(os.path.join(directory, "unmatched" + _TABLE_SUFFIX))
+    with open(os.path.join(directory, _METHODS_FILE), encoding="utf-8") as fh:
+        run["methods_text"] = fh.read()
+
+    excel_path = os.path.join(directory, _EXCEL_FILE)
+    if os.path.isfile(excel_path):
+        with open(excel_path, "rb") as fh:
+            run["excel"] = fh.read()
+
+    index_dir = os.path.join(directory, _CELL_INDEX_DIR)
+    if os.path.isdir(index_dir):
+        # Memory-mapped; see RunCache.evict for removing mapped entries
+        run["cell_index"] = load_cell_index(index_dir)
+
+    return run
+
+
+def _entry_size(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory)
+        for name in names
+    )
+
+
+# ---------------------------------------------------------------------------
+# Cache store
+# ---------------------------------------------------------------------------
+
+class RunCache:
+    """
+    Cache directory of match_frames results with size-limited LRU eviction.
+
+    Each entry is a subdirectory named by its key. Entry access times
+    are tracked through directory modification times, so several
+    processes can share one directory.
+    """
+
+    def __init__(
+        self,
+        directory: str = RUN_CACHE_DIR,
+        max_bytes: int = RUN_CACHE_MAX_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Stored run for key, or None on a miss."""
+        path = self._path(key)
+        if not os.path.isdir(path):
+            return None
+        try:
+            run = _load_run(path)
+        except (OSError, ValueError, KeyError):
+            # Incomplete or unreadable entry: treat as a miss
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+
+        os.utime(path)
+        return run
+
+    def put(self, key: str, run: dict) -> None:
+        """Store run under key, then evict old entries if over the limit."""
+        path = self._path(key)
+        tmp_path = tempfile.mkdtemp(dir=self.directory, suffix=_TMP_SUFFIX)
+        try:
+            _save_run(run, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            # Another process stored the same run first
+            if not os.path.isdir(path):
+                raise
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        self.evict()
+
+    def get_or_compute(self, key: str, compute: Callable[[], dict]) -> Tuple[dict, bool]:
+        """
+        Return (value, hit). On a miss, compute() is called and stored.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        value = compute()
+        self.put(key, value)
+        return value, False
+
+    def entries(self) -> list:
+        """(path, size, mtime) of all entries, least recently used first."""
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if os.path.isdir(path) and not name.endswith(_TMP_SUFFIX):
+                found.append((path, _entry_size(path), os.stat(path).st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def evict(self) -> int:
+        """Remove least recently used entries until under max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+
+        removed = 0
+        # Entries may still be memory-mapped by a returned cell index. On
+        # POSIX, removing them only unlinks the files and the mapping keeps
+        # its pages; where mapped files cannot be deleted (Windows), the
+        # rest of the entry is still removed, so get() sees it as a miss
+        # and a later eviction retries the removal.
+        # The newest entry is kept even if it alone exceeds the limit
+        for path, size, _ in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        for path, _, _ in self.entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+# ---------------------------------------------------------------------------
+# Cached runs
+# ---------------------------------------------------------------------------
+
+def match_frames(
+    nox_df: pd.DataFrame,
+    pc_df: pd.DataFrame,
+    filter_options: Optional[dict] = None,
+    build_excel: bool = True,
+    with_cell_index: bool = True,
+) -> dict:
+    """
+    Run the full matching job on already-loaded tables.
+
+    Returns:
+        {
+            "match": match GeoDataFrame,
+            "summary": summarize_matches dict,
+            "grid_cells": number of grid cells,
+            "postcode_rows": number of postcodes after filtering,
+            "methods_text": methods summary,
+            "nox_coordinates": validate_nox_coordinates report,
+            "postcode_coordinates": validate_postcode_coordinates report,
+            "unmatched": diagnose_unmatched table,
+            "excel": xlsx bytes of prepare_export_table (if build_excel),
+            "cell_index": CellPostcodeIndex (if with_cell_index),
+        }
+    """
+    is_valid, missing = validate_nox_columns(nox_df.columns)
+    if not is_valid:
+        raise ValueError(f"NOx dataset missing required columns: {missing}")
+    is_valid, missing = validate_postcode_columns(pc_df.columns)
+    if not is_valid:
+        raise ValueError(f"Postcode dataset missing required columns: {missing}")
+
+    grid_cells = gridcells_from_geodataframe(build_grid_geodataframe(nox_df))
+
+    cleaned = filter_postcodes_basic(pc_df, **(filter_options or {}))
+    postcodes = load_postcodes_from_dataframe(cleaned, apply_basic_filters=False)
+
+    match_gdf = match_postcodes_to_grid(postcodes, grid_cells)
+    summary = summarize_matches(match_gdf)
+
+    result = {
+        "match": match_gdf,
+        "summary": summary,
+        "grid_cells": len(grid_cells),
+        "postcode_rows": len(postcodes),
+        "nox_coordinates": validate_nox_coordinates(nox_df),
+        "postcode_coordinates": validate_postcode_coordinates(pc_df),
+        "unmatched": diagnose_unmatched(pc_df, match_gdf, nox_df),
+    }
+    result["methods_text"] = _methods_text(result)
+
+    if build_excel:
+        buffer = BytesIO()
+        prepare_export_table(match_gdf).to_excel(buffer, index=False, engine="openpyxl")
+        result["excel"] = buffer.getvalue()
+
+    if with_cell_index:
+        result["cell_index"] = build_cell_index(match_gdf, [c.id for c in grid_cells])
+
+    return result
+
+
+def cached_match_run(
+    nox_source: Any,
+    postcode_source: Any,
+    cache: Optional[RunCache] = None,
+    filter_options: Optional[dict] = None,
+) -> Tuple[dict, bool]:
+    """
+    Match two input files, reusing a stored result for identical runs.
+
+    On a cache hit nothing is parsed or matched; the stored methods text
+    is returned unchanged, with the timestamp of the original run.
+
+    Args:
+        nox_source: NOx grid file (path or file-like; .csv, .gz, .zip).
+        postcode_source: ONSPD file (path or file-like).
+        cache: RunCache to use (default: RunCache() in RUN_CACHE_DIR).
+        filter_options: Keyword overrides for filter_postcodes_basic.
+
+    Returns:
+        (match_frames result dict, cache_hit)
+    """
+    cache = cache or RunCache()
+    key = run_cache_key(nox_source, postcode_source, filter_options)
+
+    return cache.get_or_compute(
+        key,
+        lambda: match_frames(
+            read_table(nox_source), read_table(postcode_source), filter_options
+        ),
+    )
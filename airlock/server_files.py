@@ -0,0 +1,119 @@
+"""
+Server-side data files.
+
+Large national files (ONSPD is over 1 GB) need not travel through the
+browser: the app and CLI can read files already on the server, by
+absolute path or relative to a data directory, with read_table (plain
+CSVs through a memory map, archives as a stream). Files are identified
+by a cheap fingerprint (size, modification time and a few sampled
+blocks) instead of hashing every byte.
+"""
+
+import hashlib
+import mmap
+import os
+from typing import List
+
+
+# Directory searched for relative file names (override with AIRLOCK_DATA_DIR)
+DATA_DIR = os.environ.get("AIRLOCK_DATA_DIR", "data")
+
+# File types read_table understands
+DATA_FILE_SUFFIXES = (".csv", ".gz", ".zip")
+
+# Number and size of blocks hashed by quick_fingerprint
+FINGERPRINT_SAMPLES = 16
+FINGERPRINT_SAMPLE_BYTES = 64 * 1024
+
+
+def list_data_files(directory: str = DATA_DIR) -> List[str]:
+    """Data files under directory (recursively), relative and sorted."""
+    if not os.path.isdir(directory):
+        return []
+
+    found = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.lower().endswith(DATA_FILE_SUFFIXES):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(found)
+
+
+def _is_within(path: str, directory: str) -> bool:
+    path = os.path.realpath(path)
+    directory = os.path.realpath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+
+def resolve_data_path(
+    path: str,
+    directory: str = DATA_DIR,
+    within_directory: bool = False,
+) -> str:
+    """
+    Absolute path of a server data file.
+
+    Relative paths are looked up in directory first, then in the working
+    directory.
+
+    Args:
+        path: Absolute path, or path relative to directory.
+        directory: Data directory.
+        within_directory: If True (paths typed into the web app), only
+            files inside directory are accepted; "..", absolute paths
+            and symlinks may not leave it.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        ValueError: If the file type is not supported, or the file is
+            outside directory when within_directory is set.
+    """
+    if within_directory:
+        candidate = os.path.join(directory, path)
+        if not _is_within(candidate, directory):
+            raise ValueError(f"Path is outside the data directory: '{path}'")
+        candidates = [candidate]
+    else:
+        path = os.path.expanduser(path)
+        candidates = [path] if os.path.isabs(path) else [os.path.join(directory, path), path]
+
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            if not candidate.lower().endswith(DATA_FILE_SUFFIXES):
+                raise ValueError(
+                    f"Unsupported file type: '{path}'. Expected {DATA_FILE_SUFFIXES}."
+                )
+            return os.path.abspath(candidate)
+
+    raise FileNotFoundError(f"Data file not found: '{path}'")
+
+
+def quick_fingerprint(
+    path: str,
+    samples: int = FINGERPRINT_SAMPLES,
+    sample_bytes: int = FINGERPRINT_SAMPLE_BYTES,
+) -> str:
+    """
+    Cheap fingerprint of a file: size, mtime and evenly spaced blocks.
+
+    Reads at most samples × sample_bytes bytes, so a national ONSPD file
+    is fingerprinted in milliseconds. An in-place edit that keeps the
+    size, restores the mtime and misses every sampled block would go
+    unnoticed; use a full content hash where that matters.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode("ascii"))
+
+    if stat.st_size == 0:
+        return digest.hexdigest()
+
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if stat.st_size <= samples * sample_bytes:
+            digest.update(mm)
+        else:
+            last = stat.st_size - sample_bytes
+            for i in range(samples):
+                start = last * i // max(samples - 1, 1)
+                digest.update(mm[start:start + sample_bytes])
+
+    return digest.hexdigest()
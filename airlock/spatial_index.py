@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import shapely
+    from shapely.geometry.base import BaseGeometry
+
+
+def build_grid_tree(geometries: Sequence[BaseGeometry]) -> shapely.STRtree:
+    """
+    Build a shapely STRtree over grid cell polygons.
+
+    The tree is built once and reused for every postcode batch.
+
+    Args:
+        geometries: Grid cell polygons, in grid order.
+
+    Returns:
+        shapely.STRtree whose tree indices are positions in geometries.
+    """
+    import shapely
+
+    return shapely.STRtree(np.asarray(geometries, dtype=object))
+
+
+def query_points_within(
+    tree: shapely.STRtree,
+    eastings: np.ndarray,
+    northings: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the grid cells containing each point with one bulk STRtree query.
+
+    Points are created straight from the coordinate arrays; no
+    GeoDataFrames are built. Semantics match gpd.sjoin(predicate="within"):
+    points on a cell boundary are not within that cell, and a point inside
+    overlapping cells yields one pair per cell.
+
+    Args:
+        tree: STRtree from build_grid_tree.
+        eastings: Point eastings (OSGB36).
+        northings: Point northings (OSGB36).
+
+    Returns:
+        (point_index, cell_index) integer arrays of matching pairs,
+        ordered by point index.
+    """
+    import shapely
+
+    points = shapely.points(
+        np.asarray(eastings, dtype=float),
+        np.asarray(northings, dtype=float),
+    )
+    point_idx, cell_idx = tree.query(points, predicate="within")
+
+    order = np.argsort(point_idx, kind="stable")
+    return point_idx[order], cell_idx[order]
+
+
+def left_join_pairs(
+    n_points: int,
+    point_idx: np.ndarray,
+    cell_idx: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Expand matching pairs to the row layout of a left spatial join.
+
+    Every (point, cell) pair becomes one row and every point without a
+    cell gets one row with cell index -1. Rows are ordered by point.
+
+    Returns:
+        (point_index, cell_index) arrays, one entry per output row.
+    """
+    unmatched = np.ones(n_points, dtype=bool)
+    unmatched[point_idx] = False
+    unmatched_idx = np.flatnonzero(unmatched)
+
+    left = np.concatenate([point_idx, unmatched_idx])
+    right = np.concatenate([cell_idx, np.full(len(unmatched_idx), -1)])
+    order = np.argsort(left, kind="stable")
+    return left[order], right[order]
+
+
+def query_nearest_cells(
+    tree: shapely.STRtree,
+    eastings: np.ndarray,
+    northings: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the nearest grid cell to each point with one bulk STRtree query.
+
+    Distances are measured to the cell polygon (0 for points inside or on
+    a cell). When several cells are equally near, the first in grid order
+    is returned.
+
+    Returns:
+        (cell_index, distance) arrays aligned with the points; -1 and NaN
+        for points with missing coordinates.
+    """
+    import shapely
+
+    points = shapely.points(
+        np.asarray(eastings, dtype=float),
+        np.asarray(northings, dtype=float),
+    )
+    cell_idx = np.full(len(points), -1, dtype=np.int64)
+    distance = np.full(len(points), np.nan)
+
+    valid = ~shapely.is_missing(points) & ~shapely.is_empty(points)
+    if valid.any() and len(tree.geometries):
+        (point_idx, nearest), dist = tree.query_nearest(
+            points[valid], all_matches=False, return_distance=True
+        )
+        positions = np.flatnonzero(valid)[point_idx]
+        cell_idx[positions] = nearest
+        distance[positions] = dist
+
+    return cell_idx, distance
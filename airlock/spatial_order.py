@@ -0,0 +1,127 @@
+"""
+Space-filling-curve ordering of point coordinates.
+
+Sorting postcodes by a Morton (Z-order) or Hilbert key groups nearby
+points together, so each matching chunk only touches a compact region
+of the grid instead of cells spread across the whole country.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+# Curves accepted by spatial_sort_order
+SPACE_FILLING_CURVES = ("hilbert", "morton")
+
+# Bits per axis used to quantise coordinates (65,536 steps over the
+# extent of the points, i.e. ~10 m resolution across Great Britain)
+CURVE_ORDER = 16
+
+
+def _quantise(
+    x: np.ndarray,
+    y: np.ndarray,
+    order: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scale coordinates to integers in [0, 2**order) over their joint extent.
+
+    Returns:
+        (ix, iy, valid) where valid marks points with finite coordinates.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.isfinite(x) & np.isfinite(y)
+
+    ix = np.zeros(len(x), dtype=np.uint64)
+    iy = np.zeros(len(y), dtype=np.uint64)
+    if not valid.any():
+        return ix, iy, valid
+
+    top = 2 ** order - 1
+    for values, out in ((x, ix), (y, iy)):
+        lo, hi = values[valid].min(), values[valid].max()
+        span = hi - lo if hi > lo else 1.0
+        out[valid] = np.round((values[valid] - lo) / span * top).astype(np.uint64)
+
+    return ix, iy, valid
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the lower 32 bits of v."""
+    v = v & np.uint64(0x00000000FFFFFFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x0000FFFF0000FFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x3333333333333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x5555555555555555)
+    return v
+
+
+def morton_keys(x, y, order: int = CURVE_ORDER) -> np.ndarray:
+    """
+    Z-order (Morton) key of each point.
+
+    Points with missing coordinates get the largest possible key so they
+    sort last.
+    """
+    ix, iy, valid = _quantise(x, y, order)
+    keys = _spread_bits(ix) | (_spread_bits(iy) << np.uint64(1))
+    keys[~valid] = np.iinfo(np.uint64).max
+    return keys
+
+
+def hilbert_keys(x, y, order: int = CURVE_ORDER) -> np.ndarray:
+    """
+    Hilbert curve key of each point.
+
+    Unlike Morton order, consecutive Hilbert keys are always adjacent
+    cells, so chunks cut from the sorted order are more compact. Points
+    with missing coordinates get the largest possible key.
+    """
+    ix, iy, valid = _quantise(x, y, order)
+    n = np.uint64(2 ** order)
+    keys = np.zeros(len(ix), dtype=np.uint64)
+
+    s = np.uint64(2 ** (order - 1))
+    while s > 0:
+        rx = (ix & s) > 0
+        ry = (iy & s) > 0
+        keys += s * s * ((np.uint64(3) * rx.astype(np.uint64)) ^ ry.astype(np.uint64))
+
+        # Rotate the quadrant so the sub-curve has the standard orientation
+        flip = ~ry & rx
+        ix = np.where(flip, n - np.uint64(1) - ix, ix)
+        iy = np.where(flip, n - np.uint64(1) - iy, iy)
+        ix, iy = np.where(~ry, iy, ix), np.where(~ry, ix, iy)
+
+        s >>= np.uint64(1)
+
+    keys[~valid] = np.iinfo(np.uint64).max
+    return keys
+
+
+def spatial_sort_order(x, y, curve: str = "hilbert") -> np.ndarray:
+    """
+    Permutation that sorts points along a space-filling curve.
+
+    Args:
+        x: Eastings.
+        y: Northings.
+        curve: "hilbert" or "morton".
+
+    Returns:
+        Integer index array; x[order], y[order] are spatially sorted. The
+        sort is stable, so points sharing a key keep their input order.
+    """
+    if curve == "hilbert":
+        keys = hilbert_keys(x, y)
+    elif curve == "morton":
+        keys = morton_keys(x, y)
+    else:
+        raise ValueError(
+            f"Unknown curve '{curve}'. Expected one of {SPACE_FILLING_CURVES}."
+        )
+
+    return np.argsort(keys, kind="stable")
@@ -0,0 +1,310 @@
+"""
+Monte Carlo positional uncertainty of grid assignment.
+
+ONSPD postcode coordinates are centroids of limited accuracy, so a
+postcode near a cell edge may belong to the neighbouring cell. This
+module jitters coordinates with an error model over many replicates and
+reassigns cells with lattice arithmetic (no spatial join): the share of
+replicates in each cell estimates the probability of the assigned cell,
+the alternative cells and the resulting exposure variance.
+
+Only postcodes within reach of a cell edge can change cell, so only
+those are simulated, in replicate batches of bounded size; thousands of
+replicates over a national postcode set run on one machine.
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import GRID_CELL_SIZE_M, NOX_OPTIONAL_COLUMNS
+from .grid_builder import grid_ids_from_dataframe
+from .lattice import INVALID_CELL_KEY, global_cell_keys, grid_cell_keys
+from .located_postcodes import LocatedPostcodes, locate_postcodes
+
+
+# "gaussian": independent normal errors in easting and northing with
+# standard deviation error_m; "disc": uniform within a circle of radius
+# error_m
+ERROR_MODELS = ("gaussian", "disc")
+
+# Default positional error of ONSPD centroids in metres
+DEFAULT_POSITION_ERROR_M = 50.0
+
+DEFAULT_REPLICATES = 1000
+
+# Gaussian jitters are treated as bounded at this many standard
+# deviations when choosing which postcodes can change cell
+GAUSSIAN_REACH_SD = 5.0
+
+# Jittered coordinates held in memory per replicate batch
+MAX_BATCH_ELEMENTS = 8_000_000
+
+# Postcodes whose assigned cell has a lower probability count as uncertain
+UNCERTAIN_THRESHOLD = 0.95
+
+
+@dataclass
+class UncertaintyResult:
+    """
+    Outcome of simulate_assignment_uncertainty.
+
+    postcodes has one row per postcode: postcode, easting, northing,
+    assigned_grid_id, assigned_probability, candidate_cells,
+    no_cell_probability, exposure_mean, exposure_variance.
+    alternatives has one row per postcode and alternative cell:
+    postcode, grid_id, probability.
+    """
+    postcodes: pd.DataFrame
+    alternatives: pd.DataFrame
+    n_replicates: int
+    error_model: str
+    error_m: float
+
+    def summary(self) -> dict:
+        """Headline figures, as used by generate_methods_summary."""
+        prob = self.postcodes["assigned_probability"].dropna()
+        uncertain = int((prob < UNCERTAIN_THRESHOLD).sum())
+        return {
+            "n_replicates": self.n_replicates,
+            "error_model": self.error_model,
+            "error_m": self.error_m,
+            "postcodes": int(len(prob)),
+            "mean_assigned_probability": float(prob.mean()) if len(prob) else float("nan"),
+            "uncertain_threshold": UNCERTAIN_THRESHOLD,
+            "uncertain_postcodes": uncertain,
+            "uncertain_share": uncertain / len(prob) if len(prob) else 0.0,
+        }
+
+
+def _jitter(
+    rng: np.random.Generator,
+    shape: tuple,
+    error_m: float,
+    error_model: str,
+) -> tuple:
+    """(dx, dy) position errors in metres."""
+    if error_model == "gaussian":
+        dx = rng.standard_normal(shape, dtype=np.float32) * error_m
+        dy = rng.standard_normal(shape, dtype=np.float32) * error_m
+        return dx, dy
+
+    radius = error_m * np.sqrt(rng.random(shape, dtype=np.float32))
+    angle = rng.random(shape, dtype=np.float32) * np.float32(2 * np.pi)
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+def _grid_positions(grid_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Row position in the grid of each global key, -1 if absent."""
+    if len(grid_keys) == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+
+    order = np.argsort(grid_keys)
+    sorted_keys = grid_keys[order]
+    pos = np.minimum(np.searchsorted(sorted_keys, keys), len(grid_keys) - 1)
+    found = (sorted_keys[pos] == keys) & (keys != INVALID_CELL_KEY)
+    return np.where(found, order[pos], -1)
+
+
+def _simulate_offsets(
+    x: np.ndarray,
+    y: np.ndarray,
+    cell_size: float,
+    radius: int,
+    error_m: float,
+    error_model: str,
+    n_replicates: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Replicate counts of each cell offset around each point's own cell.
+
+    Returns:
+        (n_points, (2 * radius + 1) ** 2) int64 counts; column
+        (drow + radius) * width + (dcol + radius) counts replicates that
+        fell dcol columns and drow rows away.
+    """
+    width = 2 * radius + 1
+    n = len(x)
+
+    # Work in cell units relative to each point's own cell, in float32:
+    # the offset is floor(position within cell + jitter / cell_size)
+    scale = np.float32(1 / cell_size)
+    frac_x = (x / cell_size - np.floor(x / cell_size)).astype(np.float32)[:, None]
+    frac_y = (y / cell_size - np.floor(y / cell_size)).astype(np.float32)[:, None]
+    point_offsets = (np.arange(n, dtype=np.int64) * width * width + radius * width + radius)[:, None]
+
+    counts = np.zeros(n * width * width, dtype=np.int64)
+    batch = max(1, MAX_BATCH_ELEMENTS // max(n, 1))
+
+    for start in range(0, n_replicates, batch):
+        dx, dy = _jitter(rng, (n, min(batch, n_replicates - start)), error_m, error_model)
+
+        dcol = np.floor(frac_x + dx * scale)
+        drow = np.floor(frac_y + dy * scale)
+        np.clip(dcol, -radius, radius, out=dcol)
+        np.clip(drow, -radius, radius, out=drow)
+
+        local = (drow * width + dcol).astype(np.int64)
+        counts += np.bincount((point_offsets + local).ravel(), minlength=len(counts))
+
+    return counts.reshape(n, width * width)
+
+
+def simulate_assignment_uncertainty(
+    postcodes: Union[pd.DataFrame, LocatedPostcodes],
+    grid_df: pd.DataFrame,
+    value_column: Optional[str] = None,
+    error_m: float = DEFAULT_POSITION_ERROR_M,
+    error_model: str = "gaussian",
+    n_replicates: int = DEFAULT_REPLICATES,
+    seed: Optional[int] = None,
+    id_column: Optional[str] = "GridCode",
+    apply_basic_filters: bool = True,
+) -> UncertaintyResult:
+    """
+    Estimate how robust each postcode's grid assignment is to position error.
+
+    Args:
+        postcodes: ONSPD-style DataFrame or LocatedPostcodes.
+        grid_df: NOx grid DataFrame with X/Y centre columns.
+        value_column: Pollutant column for exposure statistics (default:
+                      the first of NOX_OPTIONAL_COLUMNS present).
+        error_m: Positional error scale in metres (see ERROR_MODELS).
+        error_model: "gaussian" or "disc".
+        n_replicates: Number of Monte Carlo replicates.
+        seed: Random seed for reproducible results.
+        id_column: Grid identifier column, as in gridcells_from_geodataframe.
+        apply_basic_filters: If True, apply filter_postcodes_basic first
+                             (DataFrame input only).
+
+    Returns:
+        UncertaintyResult. assigned_probability is the share of replicates
+        falling in the cell the postcode is matched to (NaN if unmatched);
+        exposure_mean/variance are taken over replicates landing in grid
+        cells with a value, and no_cell_probability is the share landing
+        outside the grid.
+    """
+    if error_model not in ERROR_MODELS:
+        raise ValueError(f"Unknown error model '{error_model}'. Expected one of {ERROR_MODELS}.")
+    if error_m <= 0:
+        raise ValueError("error_m must be positive.")
+    if n_replicates < 1:
+        raise ValueError("n_replicates must be at least 1.")
+
+    if isinstance(postcodes, LocatedPostcodes):
+        located = postcodes
+    else:
+        located = locate_postcodes(postcodes, GRID_CELL_SIZE_M, apply_basic_filters)
+
+    if value_column is None:
+        value_column = next((c for c in NOX_OPTIONAL_COLUMNS if c in grid_df.columns), None)
+    elif value_column not in grid_df.columns:
+        raise ValueError(f"NOx dataset missing value column: '{value_column}'")
+
+    cell_size = located.cell_size
+    x = np.asarray(located.easting, dtype=float)
+    y = np.asarray(located.northing, dtype=float)
+    n = len(located)
+
+    grid_keys = grid_cell_keys(grid_df, cell_size)
+    grid_ids = grid_ids_from_dataframe(grid_df, id_column)
+    values = (
+        pd.to_numeric(grid_df[value_column], errors="coerce").to_numpy(dtype=float)
+        if value_column is not None else np.full(len(grid_df), np.nan)
+    )
+
+    reach = error_m * GAUSSIAN_REACH_SD if error_model == "gaussian" else error_m
+    radius = int(np.ceil(reach / cell_size))
+    width = 2 * radius + 1
+    centre = radius * width + radius
+
+    # Points farther than reach from every edge of their cell never move
+    valid = np.isfinite(x) & np.isfinite(y)
+    with np.errstate(invalid="ignore"):
+        fx, fy = x / cell_size, y / cell_size
+        edge_distance = cell_size * np.minimum.reduce([
+            fx - np.floor(fx), np.floor(fx) + 1 - fx,
+            fy - np.floor(fy), np.floor(fy) + 1 - fy,
+        ])
+    moving = np.flatnonzero(valid & (edge_distance <= reach))
+
+    counts = _simulate_offsets(
+        x[moving], y[moving], cell_size, radius, error_m, error_model,
+        n_replicates, np.random.default_rng(seed),
+    )
+    probs = counts / n_replicates
+
+    # Grid row of every cell in each moving point's window
+    dcol = np.tile(np.arange(-radius, radius + 1), width)
+    drow = np.repeat(np.arange(-radius, radius + 1), width)
+    window_x = (np.floor(fx[moving])[:, None] + dcol + 0.5) * cell_size
+    window_y = (np.floor(fy[moving])[:, None] + drow + 0.5) * cell_size
+    window_pos = _grid_positions(
+        grid_keys, global_cell_keys(window_x.ravel(), window_y.ravel(), cell_size)
+    ).reshape(probs.shape)
+
+    window_values = np.where(window_pos >= 0, values[window_pos], np.nan)
+    has_value = ~np.isnan(window_values)
+    covered = np.where(has_value, probs, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(has_value, probs * window_values, 0.0).sum(axis=1) / covered
+        second = np.where(has_value, probs * window_values ** 2, 0.0).sum(axis=1) / covered
+    in_grid = probs > 0
+
+    # Stationary points keep their own cell in every replicate
+    own_pos = _grid_positions(grid_keys, global_cell_keys(x, y, cell_size))
+    own_value = np.where(own_pos >= 0, values[own_pos], np.nan)
+
+    exposure_mean = own_value.copy()
+    exposure_variance = np.where(np.isnan(own_value), np.nan, 0.0)
+    no_cell = np.where(valid, (own_pos < 0).astype(float), np.nan)
+    candidate_cells = (own_pos >= 0).astype(np.int64)
+    centre_prob = np.where(valid, 1.0, np.nan)
+
+    exposure_mean[moving] = mean
+    exposure_variance[moving] = np.maximum(second - mean ** 2, 0.0)
+    no_cell[moving] = np.where(window_pos < 0, probs, 0.0).sum(axis=1)
+    candidate_cells[moving] = (in_grid & (window_pos >= 0)).sum(axis=1)
+    centre_prob[moving] = probs[:, centre]
+
+    # Assignment follows match_postcodes_to_grid (edge points unmatched)
+    assigned_pos = _grid_positions(grid_keys, np.asarray(located.cell_keys))
+    assigned_ids = np.full(n, np.nan, dtype=object)
+    assigned_ids[assigned_pos >= 0] = grid_ids[assigned_pos[assigned_pos >= 0]]
+
+    labels = np.asarray(located.postcodes)
+    per_postcode = pd.DataFrame({
+        "postcode": labels,
+        "easting": x,
+        "northing": y,
+        "assigned_grid_id": assigned_ids,
+        "assigned_probability": np.where(assigned_pos >= 0, centre_prob, np.nan),
+        "candidate_cells": candidate_cells,
+        "no_cell_probability": no_cell,
+        "exposure_mean": exposure_mean,
+        "exposure_variance": exposure_variance,
+    })
+
+    # Alternatives: every other grid cell reached by some replicate
+    alt = in_grid & (window_pos >= 0)
+    alt[np.isin(moving, np.flatnonzero(assigned_pos >= 0)), centre] = False
+    rows, cols = np.nonzero(alt)
+    alternatives = pd.DataFrame({
+        "postcode": labels[moving[rows]],
+        "grid_id": grid_ids[window_pos[rows, cols]],
+        "probability": probs[rows, cols],
+    })
+    alternatives = alternatives.iloc[
+        np.lexsort((-alternatives["probability"].to_numpy(), moving[rows]))
+    ].reset_index(drop=True)
+
+    return UncertaintyResult(
+        postcodes=per_postcode,
+        alternatives=alternatives,
+        n_replicates=n_replicates,
+        error_model=error_model,
+        error_m=float(error_m),
+    )
@@ -1,7 +1,8 @@
 import os
 import sys
+import tempfile
 from io import BytesIO
-from typing import Any
+from typing import Any, BinaryIO, Optional
 
 # Ensure project root is on sys.path so "import airlock.XXX" works
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
@@ -11,17 +12,39 @@ if PROJECT_ROOT not in sys.path:
 import streamlit as st
 import pandas as pd
 
-from airlock.grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
-from airlock.postcode_loader import load_postcodes_from_dataframe
-from airlock.matcher import match_postcodes_to_grid, summarize_matches
-from airlock.exporters import prepare_export_table
+from airlock.bundle_export import BUNDLE_FORMATS, DEFAULT_BUNDLE_FORMATS, export_bundle
+from airlock.grid_builder import grid_ids_from_dataframe
+from airlock.config import NOX_OPTIONAL_COLUMNS
+from airlock.diagnostics import UNMATCHED_REASONS, summarize_unmatched_reasons
+from airlock.lattice import build_lattice
+from airlock.match_statistics import compute_match_statistics
+from airlock.raster import (
+    MAX_VIEW_PIXELS,
+    cell_postcode_counts,
+    colourise,
+    crop_and_downsample,
+    rasterise_cell_values,
+    rasterise_match_share,
+)
+from airlock.readers import read_table
+from airlock.run_cache import (
+    RunCache,
+    fingerprint_key,
+    fingerprint_source,
+    match_frames,
+)
+from airlock.server_files import (
+    DATA_DIR,
+    list_data_files,
+    quick_fingerprint,
+    resolve_data_path,
+)
 from airlock.validation import (
     validate_nox_columns,
     validate_postcode_columns,
     validate_nox_coordinates,
     validate_postcode_coordinates,
 )
-from airlock.methods_summary import generate_methods_summary
 
 # -------------------------------------------------------------------
 # Page config
@@ -38,13 +61,55 @@ st.sidebar.title("AirLock")
 st.sidebar.markdown(
     "Air-quality Integrated Raster–Location Concordance\n\n"
     "1. Upload NOx grid (DEFRA PCM)\n"
-    "2. Upload ONSPD postcode CSV\n"
+    "2. Upload ONSPD postcode CSV (or the ONSPD .zip)\n"
     "3. Run matching and download outputs."
 )
 
-st.sidebar.header("Upload data")
-nox_file = st.sidebar.file_uploader("NOx grid dataset (CSV)", type=["csv"])
-pc_file = st.sidebar.file_uploader("ONSPD postcode dataset (CSV)", type=["csv"])
+st.sidebar.header("Input data")
+source_mode = st.sidebar.radio(
+    "Data source",
+    ["Upload files", "Server files"],
+    help=(
+        f"Server files are read in place from the data directory ({DATA_DIR}), "
+        "without passing through the browser."
+    ),
+)
+
+
+def server_file_input(label: str) -> Optional[str]:
+    """
+    Pick a file from DATA_DIR or type a path; returns an absolute path.
+
+    Typed paths are confined to DATA_DIR, so browser users cannot read
+    arbitrary files on the server (the CLI accepts any path).
+    """
+    choice = st.sidebar.selectbox(
+        label, ["(enter a path)"] + list_data_files(DATA_DIR), key=label
+    )
+    path = (
+        st.sidebar.text_input(f"{label} – path in {DATA_DIR}", key=f"{label}_path").strip()
+        if choice == "(enter a path)"
+        else choice
+    )
+    if not path:
+        return None
+    try:
+        return resolve_data_path(path, DATA_DIR, within_directory=True)
+    except (FileNotFoundError, ValueError) as e:
+        st.sidebar.error(str(e))
+        return None
+
+
+if source_mode == "Upload files":
+    nox_source: Any = st.sidebar.file_uploader(
+        "NOx grid dataset (CSV, .gz or .zip)", type=["csv", "gz", "zip"]
+    )
+    pc_source: Any = st.sidebar.file_uploader(
+        "ONSPD postcode dataset (CSV, .gz or .zip)", type=["csv", "gz", "zip"]
+    )
+else:
+    nox_source = server_file_input("NOx grid dataset")
+    pc_source = server_file_input("ONSPD postcode dataset")
 
 st.sidebar.markdown("---")
 st.sidebar.caption("All processing happens locally on this machine.")
@@ -60,40 +125,98 @@ st.write(
 )
 
 
+@st.cache_resource
+def get_run_cache() -> RunCache:
+    """Run cache shared by all sessions of this server."""
+    return RunCache()
+
+
 @st.cache_data(show_spinner=False)
 def cached_read_csv(uploaded_file):
-    """Cached CSV reader to speed up re-runs."""
-    return pd.read_csv(uploaded_file)
+    """
+    Cached reader to speed up re-runs.
+
+    Accepts plain CSV, gzip and zip uploads; multi-file zips (e.g. ONSPD
+    per-region splits) are parsed in parallel.
+    """
+    return read_table(uploaded_file)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def cached_read_server_file(path: str, fingerprint: str):
+    """
+    Cached reader for server-side files.
+
+    Keyed by path and quick_fingerprint, so a changed file is re-read;
+    the DataFrame is shared rather than hashed and pickled as with
+    st.cache_data.
+    """
+    return read_table(path)
+
+
+def source_fingerprint(source: Any) -> str:
+    """
+    Run-cache fingerprint of an upload or a server-side path.
+
+    Uploads are hashed once per upload (by Streamlit file_id) rather
+    than on every rerun of the script.
+    """
+    if isinstance(source, str):
+        return fingerprint_source(source)
+    fingerprints = st.session_state.setdefault("upload_fingerprints", {})
+    if source.file_id not in fingerprints:
+        fingerprints[source.file_id] = fingerprint_source(source)
+    return fingerprints[source.file_id]
+
+
+def read_source(source: Any):
+    """Read an upload or a server-side path."""
+    if isinstance(source, str):
+        return cached_read_server_file(source, quick_fingerprint(source))
+    return cached_read_csv(source)
 
 
 # -------------------------------------------------------------------
 # Data Loading and Processing
 # -------------------------------------------------------------------
-if nox_file and pc_file:
+if nox_source and pc_source:
     st.header("Step 1 – Load and Validate Datasets")
 
+    # Identical inputs and options reuse the stored run (match result,
+    # summary, diagnostics and Excel export). The cache is checked before
+    # parsing, so on a hit the postcode file is never read; the NOx grid
+    # is still needed for the QA and map views.
+    run_key = fingerprint_key(source_fingerprint(nox_source), source_fingerprint(pc_source))
+    run = get_run_cache().get(run_key)
+    cache_hit = run is not None
+
     with st.spinner("Reading CSV files..."):
         try:
-            nox_df = cached_read_csv(nox_file)
-            pc_df = cached_read_csv(pc_file)
+            nox_df = read_source(nox_source)
+            pc_df = None if cache_hit else read_source(pc_source)
         except Exception as e:
-            st.error(f"Failed to read uploaded files: {e}")
+            st.error(f"Failed to read input files: {e}")
             st.stop()
 
-    # Column validation
-    is_valid_nox, missing_nox = validate_nox_columns(nox_df.columns)
-    if not is_valid_nox:
-        st.error(f"NOx dataset is missing required columns: {missing_nox}")
-        st.stop()
+    if cache_hit:
+        # Validated when the run was stored
+        nox_coord_report = run["nox_coordinates"]
+        pc_coord_report = run["postcode_coordinates"]
+    else:
+        # Column validation
+        is_valid_nox, missing_nox = validate_nox_columns(nox_df.columns)
+        if not is_valid_nox:
+            st.error(f"NOx dataset is missing required columns: {missing_nox}")
+            st.stop()
 
-    is_valid_pc, missing_pc = validate_postcode_columns(pc_df.columns)
-    if not is_valid_pc:
-        st.error(f"Postcode dataset is missing required columns: {missing_pc}")
-        st.stop()
+        is_valid_pc, missing_pc = validate_postcode_columns(pc_df.columns)
+        if not is_valid_pc:
+            st.error(f"Postcode dataset is missing required columns: {missing_pc}")
+            st.stop()
 
-    # Coordinate sanity checks (non-fatal warnings)
-    nox_coord_report = validate_nox_coordinates(nox_df)
-    pc_coord_report = validate_postcode_coordinates(pc_df)
+        # Coordinate sanity checks (non-fatal warnings)
+        nox_coord_report = validate_nox_coordinates(nox_df)
+        pc_coord_report = validate_postcode_coordinates(pc_df)
 
     cols_val = st.columns(2)
     with cols_val[0]:
@@ -129,43 +252,35 @@ if nox_file and pc_file:
     # -------------------------------------------------------------------
     st.header("Step 2 – Build 1 km Grid Polygons")
 
-    try:
-        with st.spinner("Generating 1 km grid polygons from NOx centres..."):
-            grid_gdf = build_grid_geodataframe(nox_df)
-            grid_cells = gridcells_from_geodataframe(grid_gdf)
-    except Exception as e:
-        st.error(f"Error while building grid polygons: {e}")
-        st.stop()
+    if not cache_hit:
+        try:
+            with st.spinner("Building grid polygons, loading postcodes and matching..."):
+                run = match_frames(nox_df, pc_df)
+                get_run_cache().put(run_key, run)
+        except Exception as e:
+            st.error(f"Error while building the grid or matching postcodes: {e}")
+            st.stop()
+    else:
+        st.info("Identical run found in the cache; stored results reused.")
 
-    st.write(f"Loaded **{len(grid_cells)}** grid cells.")
+    st.write(f"Loaded **{run['grid_cells']}** grid cells.")
 
     # -------------------------------------------------------------------
     # Postcode points
     # -------------------------------------------------------------------
     st.header("Step 3 – Process Postcodes")
 
-    try:
-        with st.spinner("Converting postcode coordinates to points..."):
-            postcodes = load_postcodes_from_dataframe(pc_df)
-    except Exception as e:
-        st.error(f"Postcode loading failed: {e}")
-        st.stop()
-
-    st.write(f"Loaded **{len(postcodes)}** cleaned postcode points.")
+    st.write(f"Loaded **{run['postcode_rows']}** cleaned postcode points.")
 
     # -------------------------------------------------------------------
     # Matching
     # -------------------------------------------------------------------
     st.header("Step 4 – Match Postcodes to Grid Cells")
 
-    try:
-        with st.spinner("Spatial matching in progress..."):
-            match_gdf = match_postcodes_to_grid(postcodes, grid_cells)
-    except Exception as e:
-        st.error(f"Error during spatial matching: {e}")
-        st.stop()
+    match_gdf = run["match"]
+    grid_ids = grid_ids_from_dataframe(nox_df)
 
-    summary = summarize_matches(match_gdf)
+    summary = run["summary"]
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -182,34 +297,61 @@ if nox_file and pc_file:
     # -------------------------------------------------------------------
     st.header("Step 5 – Inspect Results")
 
-    tab1, tab2, tab3 = st.tabs(
-        ["Preview (first 20 rows)", "Full matched table", "Unmatched postcodes"]
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        [
+            "Preview (first 20 rows)",
+            "Full matched table",
+            "Unmatched postcodes",
+            "QA statistics",
+            "Map",
+        ]
     )
 
     with tab1:
         st.subheader("Preview – first 20 rows")
-        st.dataframe(match_gdf.head(20))
+        # postcode_key is an internal packed key, not for display
+        shown_matches = match_gdf.drop(columns=["postcode_key"], errors="ignore")
+        st.dataframe(shown_matches.head(20))
 
     with tab2:
         st.subheader("Full matched table")
-        st.dataframe(match_gdf)
+        st.dataframe(shown_matches)
+
+        # Cell lookups read one slice of the CSR index instead of
+        # scanning the whole match table
+        cell_query = st.text_input("Postcodes in grid cell (grid ID)").strip()
+        if cell_query:
+            try:
+                st.write(list(run["cell_index"].postcodes_in_cell(cell_query)))
+            except ValueError:
+                st.warning(f"No grid cell with ID '{cell_query}'.")
 
     with tab3:
         st.subheader("Unmatched postcodes")
-        unmatched = match_gdf[match_gdf["matched_grid_id"].isna()].copy()
+        diagnostics = run["unmatched"]
 
-        if unmatched.empty:
+        if diagnostics.empty:
             st.success("All postcodes were successfully matched to grid cells.")
         else:
             st.warning(
-                f"{len(unmatched)} postcodes could not be matched to any grid cell."
+                f"{len(diagnostics)} postcodes could not be matched to any grid cell "
+                "(including rows removed by the basic filters)."
             )
-            st.dataframe(unmatched.head(50))
 
-            # Allow download of unmatched-only list
-            unmatched_export = unmatched[["postcode", "easting", "northing"]].copy()
+            st.markdown("**Reasons**")
+            st.dataframe(summarize_unmatched_reasons(diagnostics))
+
+            reason_filter = st.multiselect(
+                "Show reasons",
+                options=list(UNMATCHED_REASONS),
+                default=list(UNMATCHED_REASONS),
+            )
+            shown = diagnostics[diagnostics["reason"].isin(reason_filter)]
+            st.dataframe(shown.head(50))
+
+            # Allow download of unmatched-only list with diagnostics
             b_unmatched: Any = BytesIO()
-            unmatched_export.to_excel(b_unmatched, index=False, engine="openpyxl")
+            diagnostics.to_excel(b_unmatched, index=False, engine="openpyxl")
             b_unmatched.seek(0)
 
             st.download_button(
@@ -222,16 +364,100 @@ if nox_file and pc_file:
                 ),
             )
 
+    with tab4:
+        st.subheader("QA statistics")
+
+        # Pollutant values keyed by the same IDs as matched_grid_id
+        value_column = next(
+            (c for c in NOX_OPTIONAL_COLUMNS if c in nox_df.columns), None
+        )
+        grid_values = None
+        if value_column is not None:
+            grid_values = pd.Series(
+                pd.to_numeric(nox_df[value_column], errors="coerce").to_numpy(),
+                index=grid_ids,
+            )
+
+        qa_tables = compute_match_statistics(match_gdf).tables(grid_values)
+
+        qa_cols = st.columns(2)
+        with qa_cols[0]:
+            st.markdown("**Cell occupancy (postcodes per cell)**")
+            st.dataframe(qa_tables["occupancy_histogram"])
+            st.markdown("**Match rate by postcode area**")
+            st.dataframe(qa_tables["match_rate_by_area"])
+        with qa_cols[1]:
+            if grid_values is not None:
+                st.markdown(f"**{value_column} distribution**")
+                st.dataframe(qa_tables["pollutant_summary"])
+                st.markdown(
+                    f"**Empty grid cells:** {len(qa_tables['empty_cells'])}"
+                )
+            st.markdown("**Match rate by postcode district**")
+            st.dataframe(qa_tables["match_rate_by_district"])
+
+    with tab5:
+        st.subheader("Map")
+
+        try:
+            lattice = build_lattice(nox_df)
+        except ValueError as e:
+            st.warning(f"Map view needs a regular 1 km grid: {e}")
+        else:
+            eastings = match_gdf["easting"].to_numpy(dtype=float)
+            northings = match_gdf["northing"].to_numpy(dtype=float)
+
+            # Layers are built lazily: only the selected one is rasterised
+            layers = {
+                "Postcodes per cell": lambda: rasterise_cell_values(
+                    lattice, cell_postcode_counts(grid_ids, match_gdf["matched_grid_id"])
+                ),
+                "Matched share of postcodes": lambda: rasterise_match_share(
+                    lattice, eastings, northings, match_gdf["matched_grid_id"].notna()
+                ),
+            }
+            if grid_values is not None:
+                layers[value_column] = lambda: rasterise_cell_values(
+                    lattice, grid_values.to_numpy()
+                )
+
+            map_cols = st.columns([1, 3])
+            with map_cols[0]:
+                layer_name = st.selectbox("Layer", list(layers))
+                zoom = st.select_slider("Zoom", options=[1, 2, 4, 8, 16, 32, 64], value=1)
+
+                minx, miny, maxx, maxy = lattice.bounds
+                centre_x = st.slider(
+                    "Centre easting", int(minx), int(maxx), int((minx + maxx) / 2), step=1000
+                )
+                centre_y = st.slider(
+                    "Centre northing", int(miny), int(maxy), int((miny + maxy) / 2), step=1000
+                )
+
+            half_w = (maxx - minx) / zoom / 2
+            half_h = (maxy - miny) / zoom / 2
+            view = crop_and_downsample(
+                layers[layer_name](),
+                lattice,
+                (centre_x - half_w, centre_y - half_h, centre_x + half_w, centre_y + half_h),
+            )
+
+            with map_cols[1]:
+                if view.size == 0:
+                    st.info("No grid cells in this view.")
+                else:
+                    # Nearest-neighbour upscaling so small windows stay visible
+                    scale = max(1, MAX_VIEW_PIXELS // max(view.shape))
+                    image = colourise(view)
+                    image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+                    st.image(image, caption=f"{layer_name} (zoom ×{zoom})")
+
     # -------------------------------------------------------------------
     # Export matched results
     # -------------------------------------------------------------------
     st.header("Step 6 – Export Matched Results")
 
-    export_df = prepare_export_table(match_gdf)
-
-    buffer: Any = BytesIO()
-    export_df.to_excel(buffer, index=False, engine="openpyxl")
-    buffer.seek(0)
+    buffer: Any = BytesIO(run["excel"])
 
     st.download_button(
         label="Download matched grid–postcode table (Excel)",
@@ -245,19 +471,53 @@ if nox_file and pc_file:
 
     st.caption("Exported table lists each postcode and its associated grid cell.")
 
+    bundle_formats = st.multiselect(
+        "Formats for the combined download",
+        options=list(BUNDLE_FORMATS),
+        default=list(DEFAULT_BUNDLE_FORMATS),
+    )
+
+    def build_bundle() -> BinaryIO:
+        # Artefacts are generated concurrently, only when the download is
+        # requested, into an anonymous temporary file that disappears when
+        # closed. Streamlit still reads the whole zip into memory to serve
+        # it; use the CLI for bundles too large for that.
+        fh = tempfile.TemporaryFile()
+        try:
+            export_bundle(
+                match_gdf,
+                fh,
+                formats=bundle_formats,
+                unmatched_df=None if diagnostics.empty else diagnostics,
+                methods_text=run["methods_text"],
+            )
+        except BaseException:
+            fh.close()
+            raise
+        fh.seek(0)
+        return fh
+
+    st.download_button(
+        label="Download all outputs (.zip)",
+        data=build_bundle,
+        file_name="airlock_outputs.zip",
+        mime="application/zip",
+        disabled=not bundle_formats,
+        on_click="ignore",
+    )
+
     # -------------------------------------------------------------------
     # Methods Summary download
     # -------------------------------------------------------------------
     st.header("Step 7 – Export Methods Summary")
 
-    methods_text = generate_methods_summary(
-        nox_rows=len(grid_cells),
-        postcode_rows=len(postcodes),
-        matched_rows=summary["matched"],
-        unmatched_rows=summary["unmatched"],
-        match_rate=summary["match_rate"],
-    )
-    methods_bytes = methods_text.encode("utf-8")
+    if cache_hit:
+        st.caption(
+            "Served from the cache: the summary is that of the original run, "
+            "including its Generated timestamp."
+        )
+
+    methods_bytes = run["methods_text"].encode("utf-8")
 
     st.download_button(
         label="Download Methods Summary (.txt)",
@@ -0,0 +1,80 @@
+import pandas as pd
+import pyarrow as pa
+
+from airlock.arrow_io import as_dataframe, match_result_to_arrow
+from airlock.grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
+from airlock.matcher import match_postcodes_arrow, match_postcodes_to_grid
+from airlock.postcode_loader import load_postcodes_from_dataframe
+
+
+def _inputs():
+    postcodes = pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB", "AB1 1AB", "ZZ9 9ZZ", "AB1 1AD"],
+        "oseast1m": [100.0, 1500.0, 1500.0, 9000.0, None],
+        "osnrth1m": [100.0, 200.0, 200.0, 9000.0, 100.0],
+        "doterm": [None] * 5,
+    })
+    grid = pd.DataFrame({
+        "X": [500.0, 1500.0],
+        "Y": [500.0, 500.0],
+        "GridCode": [1, 2],
+        "NOx": [10.0, 20.0],
+    })
+    return postcodes, grid
+
+
+def test_as_dataframe_accepts_arrow_and_passes_pandas_through():
+    postcodes, _ = _inputs()
+
+    assert as_dataframe(postcodes) is postcodes
+
+    table = pa.Table.from_pandas(postcodes, preserve_index=False)
+    for data in (table, table.to_batches()[0], pa.RecordBatchReader.from_batches(
+        table.schema, table.to_batches()
+    )):
+        df = as_dataframe(data)
+        assert list(df.columns) == list(postcodes.columns)
+        assert df["oseast1m"].iloc[1] == 1500.0
+
+
+def test_match_postcodes_arrow_matches_model_path():
+    postcodes, grid = _inputs()
+
+    result = match_postcodes_arrow(
+        pa.Table.from_pandas(postcodes, preserve_index=False),
+        pa.Table.from_pandas(grid, preserve_index=False),
+    )
+
+    expected = match_postcodes_to_grid(
+        load_postcodes_from_dataframe(postcodes),
+        gridcells_from_geodataframe(build_grid_geodataframe(grid)),
+    )
+
+    assert isinstance(result, pa.Table)
+    assert result.column_names == ["postcode", "easting", "northing", "matched_grid_id"]
+    assert result.column("postcode").to_pylist() == expected["postcode"].tolist()
+    assert result.column("matched_grid_id").to_pylist() == ["1", "2", None]
+
+
+def test_match_result_to_arrow_uses_nulls_and_drops_geometry():
+    postcodes, grid = _inputs()
+    match_gdf = match_postcodes_to_grid(
+        load_postcodes_from_dataframe(postcodes),
+        gridcells_from_geodataframe(build_grid_geodataframe(grid)),
+    )
+
+    table = match_result_to_arrow(match_gdf)
+
+    assert "geometry" not in table.column_names
+    assert table.column("matched_grid_id").null_count == 1
+    assert table.column("easting").type == pa.float64()
+
+
+def test_builders_do_not_modify_inputs():
+    postcodes, grid = _inputs()
+
+    build_grid_geodataframe(grid)
+    load_postcodes_from_dataframe(postcodes)
+
+    assert "geometry" not in grid.columns
+    assert len(postcodes) == 5
@@ -0,0 +1,69 @@
+import pytest
+
+from airlock.benchmarks import (
+    append_history,
+    compare_runs,
+    find_run,
+    load_history,
+    main,
+    run_benchmarks,
+)
+
+
+def _record(run_id, times, label=None, commit=None):
+    return {
+        "run_id": run_id,
+        "label": label,
+        "environment": {"git_commit": commit},
+        "results": {"match_postcodes_to_grid": times},
+    }
+
+
+def test_run_benchmarks_records_all_cases():
+    record = run_benchmarks(n_postcodes=500, grid_side=5, repeats=2, label="smoke")
+
+    assert set(record["results"]) == {
+        "build_grid_geodataframe",
+        "load_postcodes_from_dataframe",
+        "match_postcodes_to_grid",
+        "match_postcodes_to_grid_hilbert",
+        "match_postcodes_to_grid_clustered",
+        "match_postcodes_to_grid_clustered_hilbert",
+        "prepare_export_table",
+        "export_chunks_to_csv",
+    }
+    assert all(len(t) == 2 and min(t) > 0 for t in record["results"].values())
+    assert record["environment"]["packages"]["pandas"]
+    assert record["params"]["n_postcodes"] == 500
+
+
+def test_history_round_trip_and_selection(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    append_history(_record("aaa111", [1.0], label="before", commit="c0ffee"), path)
+    append_history(_record("bbb222", [1.0], label="after", commit="deadbeef"), path)
+
+    history = load_history(path)
+
+    assert [r["run_id"] for r in history] == ["aaa111", "bbb222"]
+    assert find_run(history, "bbb")["label"] == "after"
+    assert find_run(history, "c0f")["run_id"] == "aaa111"
+    with pytest.raises(ValueError):
+        find_run(history, "zzz")
+
+
+def test_compare_flags_only_significant_slowdowns():
+    base = _record("a", [1.00, 1.01, 0.99, 1.02, 0.98])
+    slower = _record("b", [1.50, 1.52, 1.49, 1.51, 1.48])
+    noisy = _record("c", [0.90, 1.10, 1.00, 1.05, 0.95])
+
+    assert compare_runs(base, slower)["slowdown"].all()
+    assert not compare_runs(base, noisy)["slowdown"].any()
+
+
+def test_compare_command_exit_status(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    append_history(_record("base", [1.00, 1.01, 0.99, 1.02, 0.98]), path)
+    append_history(_record("slow", [1.50, 1.52, 1.49, 1.51, 1.48]), path)
+
+    assert main(["--history", path, "compare", "base", "slow"]) == 1
+    assert main(["--history", path, "compare", "slow", "base"]) == 0
@@ -0,0 +1,56 @@
+import math
+
+import pandas as pd
+
+from airlock.buffer_matching import match_postcodes_within_radius, weighted_buffer_means
+
+
+def _grid():
+    # 3 × 1 strip of cells; the middle cell has no value
+    return pd.DataFrame({
+        "X": [500, 1500, 2500],
+        "Y": [500, 500, 500],
+        "GridCode": [1, 2, 3],
+        "NOx": [10.0, None, 30.0],
+    })
+
+
+def test_buffer_candidates_and_weights():
+    postcodes = pd.DataFrame({
+        "postcode": ["P1", "P2"],
+        "easting": [900.0, 500.0],
+        "northing": [500.0, 500.0],
+    })
+
+    pairs = match_postcodes_within_radius(postcodes, _grid(), radius_m=200, weighting="uniform")
+
+    # P1 is 100 m from cell 2; P2 is 500 m from any other cell
+    p1 = pairs[pairs["postcode"] == "P1"]
+    assert sorted(p1["grid_id"]) == ["1", "2"]
+    assert p1["weight"].tolist() == [0.5, 0.5]
+    assert pairs[pairs["postcode"] == "P2"]["grid_id"].tolist() == ["1"]
+
+    wide = match_postcodes_within_radius(postcodes, _grid(), radius_m=2000)
+    p1 = wide[wide["postcode"] == "P1"].set_index("grid_id")
+    assert sorted(p1.index) == ["1", "2", "3"]
+    assert math.isclose(p1["weight"].sum(), 1.0)
+    # Inverse distance: nearest centre gets the largest weight
+    assert p1["weight"].idxmax() == "1"
+
+
+def test_weighted_buffer_means():
+    postcodes = pd.DataFrame({
+        "postcode": ["P1", "P2"],
+        "easting": [900.0, 9_000.0],
+        "northing": [500.0, 500.0],
+    })
+    pairs = match_postcodes_within_radius(postcodes, _grid(), radius_m=200, weighting="uniform")
+
+    grid_values = pd.Series({"1": 10.0, "2": None, "3": 30.0})
+    means = weighted_buffer_means(pairs, grid_values, n_points=len(postcodes))
+
+    # Cell 2 has no value, so P1 takes cell 1's value only
+    assert means.loc[0, "weighted_mean"] == 10.0
+    assert means.loc[0, "n_cells"] == 2
+    assert math.isnan(means.loc[1, "weighted_mean"])
+    assert means.loc[1, "n_cells"] == 0
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from airlock.bundle_export import METHODS_FILE, export_bundle
+
+
+def _match_df():
+    return pd.DataFrame({
+        "postcode": ["AB1 1AB", "AB1 1AA", "AB1 1AC"],
+        "easting": [1600.0, 100.0, 9000.0],
+        "northing": [200.0, 100.0, 9000.0],
+        "matched_grid_id": ["G2", "G1", np.nan],
+        "geometry": [None, None, None],
+    })
+
+
+def test_bundle_contains_every_requested_artefact(tmp_path):
+    unmatched = pd.DataFrame({"postcode": ["AB1 1AC"], "reason": ["outside_extent"]})
+
+    path = export_bundle(
+        _match_df(),
+        str(tmp_path / "outputs"),
+        formats=("xlsx", "parquet", "csv", "methods"),
+        unmatched_df=unmatched,
+        methods_text="Methods",
+    )
+
+    assert path.endswith("outputs.zip")
+    with zipfile.ZipFile(path) as zf:
+        assert sorted(zf.namelist()) == sorted([
+            "airlock_matched_grid_postcodes.xlsx",
+            "airlock_matched_grid_postcodes.parquet",
+            "airlock_matched_grid_postcodes.csv",
+            "airlock_unmatched_postcodes.xlsx",
+            "airlock_unmatched_postcodes.parquet",
+            "airlock_unmatched_postcodes.csv",
+            METHODS_FILE,
+        ])
+        assert zf.read(METHODS_FILE) == b"Methods"
+
+        with zf.open("airlock_matched_grid_postcodes.csv") as fh:
+            csv = pd.read_csv(fh)
+        with zf.open("airlock_matched_grid_postcodes.parquet") as fh:
+            parquet = pd.read_parquet(fh)
+
+    assert csv["postcode"].tolist() == ["AB1 1AA", "AB1 1AB", "AB1 1AC"]
+    assert parquet["matched_grid_id"].tolist()[:2] == ["G1", "G2"]
+    assert parquet["matched_grid_id"].isna().iloc[2]
+
+
+def test_bundle_writes_to_file_object():
+    with tempfile.TemporaryFile() as fh:
+        assert export_bundle(_match_df(), fh, formats=("csv",)) is fh
+        fh.seek(0)
+        with zipfile.ZipFile(fh) as zf:
+            assert zf.namelist() == ["airlock_matched_grid_postcodes.csv"]
+
+
+def test_failed_bundle_removes_its_temporary_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("airlock.bundle_export._write_table", fail)
+    with pytest.raises(OSError):
+        export_bundle(_match_df(), formats=("csv",))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_bundle_removes_partial_archive_at_given_path(tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("airlock.bundle_export._write_table", fail)
+    with pytest.raises(OSError):
+        export_bundle(_match_df(), str(tmp_path / "outputs.zip"), formats=("csv",))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_bundle_rejects_bad_formats():
+    with pytest.raises(ValueError):
+        export_bundle(_match_df(), formats=("pdf",))
+    with pytest.raises(ValueError):
+        export_bundle(_match_df(), formats=("methods",))
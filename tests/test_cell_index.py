@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from airlock.cell_index import build_cell_index, load_cell_index
+
+
+def _match_df():
+    return pd.DataFrame({
+        "postcode": ["AB1 1AA", "AB1 1AB", "AB1 1AC", "AB1 1AD", "AB1 1AE"],
+        "matched_grid_id": ["C2", "C1", np.nan, "C2", "C4"],
+    })
+
+
+def test_cell_queries_match_mask_scans():
+    match_df = _match_df()
+    index = build_cell_index(match_df, ["C1", "C2", "C3", "C4"])
+
+    assert index.counts().tolist() == [1, 2, 0, 1]
+    for cell in ["C1", "C2", "C3", "C4"]:
+        expected = match_df.loc[match_df["matched_grid_id"] == cell, "postcode"]
+        assert list(index.postcodes_in_cell(cell)) == expected.tolist()
+
+    many = index.postcodes_in_cells(["C4", "C2"])
+    assert many["grid_id"].tolist() == ["C4", "C2", "C2"]
+    assert many["postcode"].tolist() == ["AB1 1AE", "AB1 1AA", "AB1 1AD"]
+    assert many["row"].tolist() == [4, 0, 3]
+
+    block = index.postcodes_in_cell_range(1, 3)
+    assert block["postcode"].tolist() == ["AB1 1AA", "AB1 1AD"]
+
+    with pytest.raises(ValueError):
+        index.postcodes_in_cell("C9")
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    index = build_cell_index(_match_df(), ["C1", "C2", "C3", "C4"])
+    index.save(str(tmp_path / "index"))
+
+    loaded = load_cell_index(str(tmp_path / "index"))
+
+    assert isinstance(loaded.postcodes, np.memmap)
+    assert list(loaded.postcodes_in_cell("C2")) == ["AB1 1AA", "AB1 1AD"]
+    assert loaded.rows_in_cell("C4").tolist() == [4]
+    assert loaded.postcodes_in_cells(["C1"])["grid_id"].tolist() == ["C1"]
@@ -0,0 +1,46 @@
+import pandas as pd
+from shapely.geometry import Point, Polygon
+
+from airlock.delta import rematch_incremental
+from airlock.matcher import match_postcodes_to_grid
+from airlock.models import GridCell, PostcodePoint
+
+
+def _cells():
+    return [
+        GridCell(id="A", center_x=500, center_y=500,
+                 geometry=Polygon([(0, 0), (1000, 0), (1000, 1000), (0, 1000)])),
+        GridCell(id="B", center_x=1500, center_y=500,
+                 geometry=Polygon([(1000, 0), (2000, 0), (2000, 1000), (1000, 1000)])),
+    ]
+
+
+def test_rematch_incremental():
+    previous = match_postcodes_to_grid(
+        [
+            PostcodePoint("AB1 0AA", 100, 100, Point(100, 100)),
+            PostcodePoint("AB1 0AB", 200, 200, Point(200, 200)),
+            PostcodePoint("AB1 0AD", 300, 300, Point(300, 300)),
+        ],
+        _cells(),
+    )
+
+    new_release = pd.DataFrame({
+        "pcd": ["AB1 0AA", "AB10AB", "AB1 0AZ"],   # 0AB reformatted, 0AD removed
+        "oseast1m": [100, 1200, 1700],             # 0AB moved to cell B
+        "osnrth1m": [100, 200, 500],
+    })
+
+    result, report = rematch_incremental(previous, new_release, _cells())
+
+    assert list(result["postcode"]) == ["AB1 0AA", "AB10AB", "AB1 0AZ"]
+    assert list(result["matched_grid_id"]) == ["A", "B", "B"]
+    assert result.geometry.iloc[1].x == 1200
+
+    report = report.set_index("change")
+    assert report.loc["moved", "postcode"] == "AB10AB"
+    assert report.loc["moved", "old_grid_id"] == "A"
+    assert report.loc["moved", "new_grid_id"] == "B"
+    assert bool(report.loc["moved", "cell_changed"])
+    assert report.loc["added", "postcode"] == "AB1 0AZ"
+    assert report.loc["removed", "postcode"] == "AB1 0AD"
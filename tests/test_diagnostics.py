@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from airlock.diagnostics import (
+    UNMATCHED_REASONS,
+    diagnose_unmatched,
+    summarize_unmatched_reasons,
+)
+from airlock.grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
+from airlock.matcher import match_postcodes_to_grid
+from airlock.postcode_loader import load_postcodes_from_dataframe
+
+
+def _grid():
+    # 3 x 3 grid of 1 km cells over (0..3000, 0..3000) with the centre cell missing
+    centres = [(x, y) for x in (500, 1500, 2500) for y in (500, 1500, 2500)]
+    centres.remove((1500, 1500))
+    return pd.DataFrame({
+        "X": [float(x) for x, _ in centres],
+        "Y": [float(y) for _, y in centres],
+        "GridCode": range(len(centres)),
+    })
+
+
+def test_diagnose_unmatched_classifies_each_reason():
+    pc_df = pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB", "AB1 1AC", "AB1 1AD", "AB1 1AE", "AB1 1AF", "AB1 1AG"],
+        "oseast1m": [200.0, None, 99999.0, 900.0, 5000.0, 1000.0, 1600.0],
+        "osnrth1m": [200.0, 100.0, 99999.0, 900.0, 500.0, 600.0, 1400.0],
+        "doterm": [None, None, None, "202001", None, None, None],
+    })
+    grid = _grid()
+    match_gdf = match_postcodes_to_grid(
+        load_postcodes_from_dataframe(pc_df),
+        gridcells_from_geodataframe(build_grid_geodataframe(grid)),
+    )
+
+    diag = diagnose_unmatched(pc_df, match_gdf, grid).set_index("postcode")
+
+    assert "AB1 1AA" not in diag.index  # matched
+    assert diag.loc["AB1 1AB", "reason"] == "invalid_coordinates"
+    assert diag.loc["AB1 1AC", "reason"] == "invalid_coordinates"
+    assert diag.loc["AB1 1AD", "reason"] == "terminated"
+    assert diag.loc["AB1 1AE", "reason"] == "outside_extent"
+    assert diag.loc["AB1 1AF", "reason"] == "on_cell_boundary"
+    assert diag.loc["AB1 1AG", "reason"] == "missing_cell"
+
+    assert diag.loc["AB1 1AE", "nearest_cell_distance_m"] == 2000.0
+    assert diag.loc["AB1 1AF", "nearest_cell_distance_m"] == 0.0
+    assert diag.loc["AB1 1AG", "nearest_cell_distance_m"] == 400.0
+    assert pd.isna(diag.loc["AB1 1AB", "nearest_grid_id"])
+    assert np.isnan(diag.loc["AB1 1AB", "nearest_cell_distance_m"])
+
+
+def test_summarize_unmatched_reasons_includes_zero_counts():
+    diag = pd.DataFrame({
+        "reason": ["outside_extent", "outside_extent", "missing_cell"],
+        "nearest_cell_distance_m": [100.0, 300.0, 0.0],
+    })
+
+    summary = summarize_unmatched_reasons(diag).set_index("reason")
+
+    assert list(summary.index) == list(UNMATCHED_REASONS)
+    assert summary.loc["outside_extent", "count"] == 2
+    assert summary.loc["terminated", "count"] == 0
+    assert summary.loc["outside_extent", "median_distance_m"] == 200.0
+    assert summary["share"].sum() == 1.0
@@ -23,3 +23,22 @@ def test_prepare_export_table():
     # Check ordering (G1 first, then G2; postcodes sorted inside each)
     assert list(out["matched_grid_id"]) == ["G1", "G1", "G2"]
     assert list(out["postcode"]) == ["A", "B", "C"]
+
+
+def test_prepare_export_table_sorts_on_carried_keys():
+    gdf = gpd.GeoDataFrame(
+        {
+            "postcode": ["N1 9ZZ", "N10 1AA", "N1 1AA"],
+            "easting": [1, 2, 3],
+            "northing": [1, 2, 3],
+            "matched_grid_id": ["G1", "G1", "G1"],
+            # Carried keys are used as given, not re-encoded
+            "postcode_key": [2, 3, 1],
+            "geometry": [Point(1, 1), Point(2, 2), Point(3, 3)],
+        }
+    )
+
+    out = prepare_export_table(gdf)
+
+    assert list(out.columns) == ["postcode", "easting", "northing", "matched_grid_id"]
+    assert list(out["postcode"]) == ["N1 1AA", "N1 9ZZ", "N10 1AA"]
@@ -21,3 +21,29 @@ def test_filter_postcodes_basic():
     assert list(cleaned["pcd"]) == ["PC1", "PC3"]
     assert cleaned["oseast1m"].tolist() == [100, 300]
     assert cleaned["osnrth1m"].tolist() == [100, 350]
+
+
+def test_filter_duplicates_by_normalised_postcode():
+    df = pd.DataFrame({
+        "pcd": ["SW1A1AA", "SW1A 1AA", "sw1a 1aa", "N1  1AA"],
+        "oseast1m": [1, 2, 3, 4],
+        "osnrth1m": [1, 2, 3, 4],
+    })
+
+    cleaned = filter_postcodes_basic(df)
+
+    assert list(cleaned["pcd"]) == ["SW1A1AA", "N1  1AA"]
+    # Keys are kept for later steps and reused when present
+    assert (cleaned["postcode_key"] >= 0).all()
+    keyed = df.assign(postcode_key=[7, 8, 9, 7])
+    assert list(filter_postcodes_basic(keyed)["pcd"]) == ["SW1A1AA", "SW1A 1AA", "sw1a 1aa"]
+
+
+def test_filter_without_steps_returns_new_frame():
+    df = pd.DataFrame({"pcd": ["PC1", "PC2"], "oseast1m": [1, 2], "osnrth1m": [3, 4]})
+
+    cleaned = filter_postcodes_basic(df, drop_duplicates=False)
+    cleaned["extra"] = 1
+
+    assert cleaned is not df
+    assert "extra" not in df.columns
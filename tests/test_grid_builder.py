@@ -4,6 +4,7 @@ from shapely.geometry import Polygon
 from airlock.grid_builder import (
     cell_polygon_from_center,
     build_grid_geodataframe,
+    grid_ids_from_dataframe,
     gridcells_from_geodataframe,
 )
 from airlock.models import GridCell
@@ -70,3 +71,17 @@ def test_gridcells_from_geodataframe():
     assert cell.center_x == 500000
     assert cell.center_y == 200000
     assert cell.geometry.bounds == (499500, 199500, 500500, 200500)
+
+
+def test_grid_ids_from_dataframe_matches_gridcells():
+    df = pd.DataFrame({
+        "X": [500000, 501000],
+        "Y": [200000, 200000],
+        "GridCode": [12345, 12346],
+    })
+    gdf = build_grid_geodataframe(df)
+
+    for id_column in ("GridCode", None):
+        ids = grid_ids_from_dataframe(df, id_column=id_column)
+        cells = gridcells_from_geodataframe(gdf, id_column=id_column)
+        assert list(ids) == [c.id for c in cells]
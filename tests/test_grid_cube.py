@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from airlock.grid_cube import build_grid_cube, read_grid_cube, sample_grid_cube
+from airlock.located_postcodes import locate_postcodes
+from airlock.lattice import INVALID_CELL_KEY, cell_key_centres, global_cell_keys, grid_cell_keys
+
+
+def _grids():
+    no2_2019 = pd.DataFrame({"X": [500, 1500], "Y": [500, 500], "no22019": [10.0, 20.0]})
+    no2_2020 = pd.DataFrame({"X": [500, 1500], "Y": [500, 500], "no22020": [9.0, 19.0]})
+    # PM2.5 grid covers a different extent
+    pm25_2019 = pd.DataFrame({
+        "X": [1500, 2500], "Y": [500, 500], "GridCode": [7, 8], "pm252019": [5.0, 6.0],
+    })
+    return {("NO2", 2019): no2_2019, ("NO2", 2020): no2_2020, ("PM25", 2019): pm25_2019}
+
+
+def _postcodes():
+    return pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB", "AB1 1AC", "AB1 1AD"],
+        "oseast1m": [100.0, 1600.0, 2900.0, 1000.0],  # last is on a cell edge
+        "osnrth1m": [100.0, 900.0, 100.0, 400.0],
+    })
+
+
+def test_global_cell_keys_are_shared_across_grids():
+    keys = global_cell_keys(np.array([100.0, 1999.0, np.nan, 1000.0]), np.array([0.5, 0.5, 1, 5]))
+
+    assert keys[0] != keys[1]
+    assert keys[2] == INVALID_CELL_KEY
+    assert global_cell_keys([1000.0], [5.0], exclude_edges=True)[0] == INVALID_CELL_KEY
+
+    grid_keys = grid_cell_keys(pd.DataFrame({"X": [500, 1500], "Y": [500, 500]}))
+    assert list(grid_keys) == list(global_cell_keys(np.array([100, 1600]), np.array([100, 100])))
+    assert cell_key_centres(grid_keys)[0].tolist() == [500, 1500]
+
+    with pytest.raises(ValueError):
+        grid_cell_keys(pd.DataFrame({"X": [510], "Y": [500]}))
+
+
+def test_cube_wide_and_long_samples():
+    cube = build_grid_cube(_grids())
+
+    assert cube.values.shape == (3, 3)
+    assert cube.layer_names == ["NO2_2019", "NO2_2020", "PM25_2019"]
+
+    wide = sample_grid_cube(cube, _postcodes()).set_index("postcode")
+    assert wide.loc["AB1 1AA", "NO2_2019"] == 10.0
+    assert np.isnan(wide.loc["AB1 1AA", "PM25_2019"])
+    assert wide.loc["AB1 1AB", "PM25_2019"] == 5.0
+    assert wide.loc["AB1 1AC", "PM25_2019"] == 6.0
+    assert wide.loc["AB1 1AD"].iloc[2:].isna().all()
+
+    long = sample_grid_cube(cube, _postcodes(), layout="long")
+    assert len(long) == 4 * 3
+    row = long[(long["postcode"] == "AB1 1AB") & (long["pollutant"] == "NO2") & (long["year"] == 2020)]
+    assert row["value"].tolist() == [19.0]
+
+    reused = sample_grid_cube(cube, locate_postcodes(_postcodes())).set_index("postcode")
+    pd.testing.assert_frame_equal(reused, wide)
+
+
+def test_read_grid_cube_from_files(tmp_path):
+    sources = {}
+    for (pollutant, year), df in _grids().items():
+        path = tmp_path / f"{pollutant}_{year}.csv"
+        df.to_csv(path, index=False)
+        sources[(pollutant, year)] = str(path)
+
+    cube = read_grid_cube(sources)
+
+    frame = cube.to_frame()
+    assert frame["X"].tolist() == [500, 1500, 2500]
+    assert frame["NO2_2020"].tolist()[:2] == [9.0, 19.0]
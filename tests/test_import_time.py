@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+# Cold-start budget for importing every airlock module on top of
+# numpy/pandas (seconds). Measured at well under 0.1 s; the margin
+# absorbs slow CI machines.
+IMPORT_BUDGET_S = 0.5
+
+# Dependencies that must only be loaded on first use
+LAZY_DEPENDENCIES = ("geopandas", "shapely", "pyproj")
+
+_PROBE = """
+import importlib, json, pkgutil, sys, time
+import numpy, pandas
+import airlock
+
+start = time.perf_counter()
+for module in pkgutil.iter_modules(airlock.__path__):
+    importlib.import_module(f"airlock.{module.name}")
+elapsed = time.perf_counter() - start
+
+print(json.dumps({
+    "elapsed": elapsed,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_DEPENDENCIES,)
+
+
+def test_import_airlock_is_fast_and_lazy():
+    """Importing airlock.* in a fresh interpreter stays within budget."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    result = json.loads(out.stdout)
+
+    assert result["loaded"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_S
@@ -0,0 +1,60 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from airlock.interpolation import interpolate_at_postcodes
+from airlock.lattice import build_lattice, locate_points, lookup_cells
+
+
+def _grid():
+    # 2 × 2 block of 1 km cells; the top-right cell is missing
+    return pd.DataFrame({
+        "X": [500, 1500, 500],
+        "Y": [500, 500, 1500],
+        "NOx": [10.0, 20.0, 30.0],
+    })
+
+
+def test_lattice_lookup():
+    lattice = build_lattice(_grid())
+
+    assert (lattice.n_cols, lattice.n_rows) == (2, 2)
+    assert lattice.bounds == (0, 0, 2000, 2000)
+
+    cols, rows = locate_points(
+        lattice,
+        np.array([100, 1900, 1900, -5]),
+        np.array([100, 100, 1900, 0]),
+    )
+    assert list(lookup_cells(lattice, cols, rows)) == [0, 1, -1, -1]
+
+
+def test_bilinear_interpolation():
+    points = pd.DataFrame({
+        "easting": [500, 1000, 1000],
+        "northing": [500, 500, 1000],
+    })
+
+    out = interpolate_at_postcodes(points, _grid(), "NOx", method="bilinear")
+
+    assert out.iloc[0] == 10.0
+    assert out.iloc[1] == 15.0
+    # Centre of the 2 × 2 block: missing cell dropped, weights renormalised
+    assert math.isclose(out.iloc[2], 20.0)
+
+
+def test_idw_interpolation():
+    points = pd.DataFrame({
+        "easting": [500, 1000, 50_000],
+        "northing": [500, 500, 50_000],
+    })
+
+    out = interpolate_at_postcodes(points, _grid(), "NOx", method="idw", neighbourhood=1)
+
+    # On a cell centre: exact value
+    assert out.iloc[0] == 10.0
+    # Half-way between 10 and 20 with 30 further away
+    assert 10.0 < out.iloc[1] < 20.0
+    # No cells within the neighbourhood
+    assert math.isnan(out.iloc[2])
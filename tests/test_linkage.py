@@ -0,0 +1,45 @@
+import pandas as pd
+
+from airlock.linkage import link_cohort_postcodes, summarize_linkage
+from airlock.postcode_keys import normalise_postcodes
+
+
+def test_normalise_postcodes():
+    compact, display = normalise_postcodes(
+        pd.Series(["sw1a1aa", "SW1A  1AA", " n1 1aa", None, "bad"])
+    )
+
+    assert compact.tolist()[:3] == ["SW1A1AA", "SW1A1AA", "N11AA"]
+    assert display.tolist()[:3] == ["SW1A 1AA", "SW1A 1AA", "N1 1AA"]
+    assert pd.isna(compact.iloc[3])
+    assert display.iloc[4] == "BAD"
+
+
+def test_link_cohort_postcodes():
+    cohort = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5],
+            "postcode": ["sw1a1aa", "N1  1AA", None, "NOT A PC", "E1 6AN"],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+    reference = pd.DataFrame({
+        "pcd": ["SW1A1AA", "N1  1AA", "N1  1AA"],
+        "matched_grid_id": ["G1", "G2", "G9"],
+    })
+
+    linked = link_cohort_postcodes(cohort, reference, reference_postcode_column="pcd")
+
+    assert linked.index.tolist() == [10, 11, 12, 13, 14]
+    assert linked["link_status"].tolist() == [
+        "linked",
+        "linked",
+        "missing_postcode",
+        "invalid_format",
+        "not_in_reference",
+    ]
+    assert linked["matched_grid_id"].tolist()[:2] == ["G1", "G2"]
+
+    summary = summarize_linkage(linked)
+    assert summary["linked"] == 2
+    assert summary["link_rate"] == 0.4
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from airlock.grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
+from airlock.located_postcodes import load_located_postcodes, locate_postcodes
+from airlock.matcher import match_postcodes_to_grid
+from airlock.postcode_loader import load_postcodes_from_dataframe
+
+
+def _postcodes(n=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "pcd": [f"AB{i // 100} {i % 10}A{chr(65 + i % 26)}" for i in range(n)],
+        # Whole-metre coordinates, so some fall exactly on cell edges
+        "oseast1m": rng.integers(-500, 4500, n).astype(float),
+        "osnrth1m": rng.integers(-500, 3500, n).astype(float),
+    })
+
+
+def _grid(skip=()):
+    centres = [(x, y) for x in range(500, 4000, 1000) for y in range(500, 3000, 1000)]
+    centres = [c for c in centres if c not in skip]
+    return pd.DataFrame({
+        "X": [float(x) for x, _ in centres],
+        "Y": [float(y) for _, y in centres],
+        "GridCode": [f"{x}-{y}" for x, y in centres],
+        "NOx": np.arange(len(centres), dtype=float),
+    })
+
+
+def test_join_grid_matches_polygon_matcher_for_several_grids():
+    pc_df = _postcodes()
+    located = locate_postcodes(pc_df)
+    points = load_postcodes_from_dataframe(pc_df)
+
+    for grid in (_grid(), _grid(skip={(1500, 1500), (3500, 500)})):
+        expected = match_postcodes_to_grid(
+            points, gridcells_from_geodataframe(build_grid_geodataframe(grid))
+        )
+        joined = located.join_grid(grid)
+
+        assert joined["postcode"].tolist() == expected["postcode"].tolist()
+        pd.testing.assert_series_equal(
+            joined["matched_grid_id"], expected["matched_grid_id"], check_dtype=False
+        )
+
+
+def test_join_values_and_save_round_trip(tmp_path):
+    located = locate_postcodes(pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB"],
+        "oseast1m": [600.0, 9000.0],
+        "osnrth1m": [600.0, 9000.0],
+    }))
+    grid = _grid()
+
+    values = located.join_values(grid, ["NOx"])
+    assert values["NOx"].iloc[0] == 0.0
+    assert np.isnan(values["NOx"].iloc[1])
+
+    path = str(tmp_path / "located.npz")
+    located.save(path)
+    loaded = load_located_postcodes(path)
+
+    assert list(loaded.postcodes) == ["AB1 1AA", "AB1 1AB"]
+    np.testing.assert_array_equal(loaded.cell_keys, located.cell_keys)
+    assert loaded.join_grid(grid)["matched_grid_id"].tolist()[0] == "500-500"
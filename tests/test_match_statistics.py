@@ -0,0 +1,56 @@
+import pandas as pd
+
+from airlock.match_statistics import compute_match_statistics
+from airlock.matcher import summarize_matches
+
+
+def _match_result():
+    return pd.DataFrame({
+        "postcode": ["SW1A 1AA", "SW1A 2AA", "SW2 1AA", "N1 1AA", "N1 9ZZ", "bad"],
+        "easting": [1, 2, 3, 4, 5, 6],
+        "northing": [1, 2, 3, 4, 5, 6],
+        "matched_grid_id": ["G1", "G1", "G2", "G2", None, "G1"],
+    })
+
+
+def test_match_statistics_tables():
+    result = _match_result()
+    stats = compute_match_statistics(result)
+
+    assert stats.to_dict() == summarize_matches(result)
+
+    grid_values = pd.Series({"G1": 10.0, "G2": 20.0, "G3": 30.0})
+    tables = stats.tables(grid_values)
+
+    per_cell = tables["postcodes_per_cell"].set_index("grid_id")["n_postcodes"]
+    assert per_cell.to_dict() == {"G1": 3, "G2": 2, "G3": 0}
+    assert tables["empty_cells"]["grid_id"].tolist() == ["G3"]
+    assert tables["occupancy_histogram"].values.tolist() == [[0, 1], [2, 1], [3, 1]]
+
+    by_area = tables["match_rate_by_area"].set_index("area")
+    assert by_area.loc["SW", "total"] == 3
+    assert by_area.loc["N", "match_rate"] == 0.5
+    assert by_area.loc["(invalid)", "total"] == 1
+
+    by_district = tables["match_rate_by_district"].set_index("district")
+    assert by_district["total"].to_dict() == {"(invalid)": 1, "N1": 2, "SW1A": 2, "SW2": 1}
+
+    pollutant = tables["pollutant_summary"]
+    assert pollutant.loc["count", "per_postcode"] == 5
+    assert pollutant.loc["mean", "per_postcode"] == (3 * 10 + 2 * 20) / 5
+    assert pollutant.loc["p50", "per_postcode"] == 10.0
+    assert pollutant.loc["mean", "per_cell"] == 20.0
+
+
+def test_match_statistics_merge_matches_single_pass():
+    result = _match_result()
+
+    streamed = compute_match_statistics(result.iloc[:2])
+    streamed.update(result.iloc[2:4])
+    streamed.update(result.iloc[4:])
+
+    full = compute_match_statistics(result)
+    assert streamed.to_dict() == full.to_dict()
+
+    for name in ("postcodes_per_cell", "match_rate_by_area", "match_rate_by_district"):
+        pd.testing.assert_frame_equal(streamed.tables()[name], full.tables()[name])
@@ -0,0 +1,61 @@
+import pandas as pd
+from shapely.geometry import Point, Polygon
+
+from airlock.exporters import export_chunks_to_csv
+from airlock.matcher import (
+    RunningMatchSummary,
+    iter_match_chunks,
+    match_postcodes_to_grid,
+    summarize_matches,
+)
+from airlock.models import GridCell, PostcodePoint
+
+
+def _inputs():
+    cell_poly = Polygon([(-500, -500), (500, -500), (500, 500), (-500, 500)])
+    gridcells = [GridCell(id="A1", center_x=0, center_y=0, geometry=cell_poly)]
+
+    # Every third postcode lies outside the cell
+    postcodes = [
+        PostcodePoint(
+            postcode=f"PC{i}",
+            easting=float(i if i % 3 else 5000 + i),
+            northing=0.0,
+            geometry=Point(float(i if i % 3 else 5000 + i), 0.0),
+        )
+        for i in range(25)
+    ]
+    return postcodes, gridcells
+
+
+def test_iter_match_chunks_matches_full_result():
+    postcodes, gridcells = _inputs()
+
+    chunks = list(iter_match_chunks(iter(postcodes), gridcells, chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+
+    streamed = pd.concat(chunks, ignore_index=True)
+    full = match_postcodes_to_grid(postcodes, gridcells)
+
+    assert list(streamed["postcode"]) == list(full["postcode"])
+    assert list(streamed["matched_grid_id"].fillna("")) == list(full["matched_grid_id"].fillna(""))
+
+
+def test_running_summary_and_chunked_export(tmp_path):
+    postcodes, gridcells = _inputs()
+    running = RunningMatchSummary()
+
+    def tracked_chunks():
+        for chunk in iter_match_chunks(postcodes, gridcells, chunk_size=7):
+            running.update(chunk)
+            yield chunk
+
+    out_path = str(tmp_path / "matches.csv")
+    rows = export_chunks_to_csv(tracked_chunks(), out_path)
+
+    assert rows == 25
+    assert running.to_dict() == summarize_matches(match_postcodes_to_grid(postcodes, gridcells))
+
+    written = pd.read_csv(out_path)
+    assert len(written) == 25
+    assert "geometry" not in written.columns
@@ -0,0 +1,75 @@
+import math
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.geometry import Polygon, box
+
+from airlock.config import CRS_OSGB36
+from airlock.grid_builder import build_grid_geodataframe
+from airlock.overlay import overlay_boundaries_on_grid
+
+
+def test_overlay_area_weighted_means():
+    # 2 × 1 strip of 1 km cells centred at (500, 500) and (1500, 500)
+    grid_gdf = build_grid_geodataframe(pd.DataFrame({
+        "X": [500, 1500],
+        "Y": [500, 500],
+        "NOx": [10.0, 20.0],
+    }))
+
+    boundaries = gpd.GeoDataFrame(
+        {
+            "code": ["INSIDE", "SPLIT", "OUTSIDE"],
+            "geometry": [
+                box(0, 0, 1000, 1000),      # exactly the first cell
+                box(500, 0, 2000, 1000),    # 1/3 first cell, 2/3 second cell
+                box(5000, 5000, 6000, 6000),
+            ],
+        },
+        crs=CRS_OSGB36,
+    )
+
+    out = overlay_boundaries_on_grid(
+        boundaries, grid_gdf, value_columns=["NOx"], boundary_id_column="code"
+    ).set_index("boundary_id")
+
+    assert out.loc["INSIDE", "n_cells"] == 1
+    assert out.loc["INSIDE", "NOx_mean"] == 10.0
+    assert out.loc["INSIDE", "overlap_area_m2"] == 1_000_000
+
+    assert out.loc["SPLIT", "n_cells"] == 2
+    assert math.isclose(out.loc["SPLIT", "NOx_mean"], (10 * 0.5 + 20 * 1.0) / 1.5)
+
+    assert out.loc["OUTSIDE", "n_cells"] == 0
+    assert math.isnan(out.loc["OUTSIDE", "NOx_mean"])
+
+
+def test_overlay_matches_exact_intersection_areas():
+    xs, ys = np.meshgrid(np.arange(20) * 1000 + 500, np.arange(15) * 1000 + 500)
+    grid_gdf = build_grid_geodataframe(pd.DataFrame({
+        "X": xs.ravel(),
+        "Y": ys.ravel(),
+        "NOx": np.arange(xs.size, dtype=float),
+    }))
+
+    # A long diagonal edge with no vertices in most cells it crosses, a
+    # hole, and a boundary partly outside the grid
+    triangle = Polygon([(100, 100), (19_900, 300), (200, 14_800)])
+    holed = box(2_000, 2_000, 12_000, 9_000).difference(box(5_300, 4_300, 8_700, 6_100))
+    overhang = box(15_500, 10_500, 25_000, 25_000)
+    boundaries = gpd.GeoDataFrame(
+        {"geometry": [triangle, holed, overhang]}, crs=CRS_OSGB36
+    )
+
+    out = overlay_boundaries_on_grid(boundaries, grid_gdf, value_columns=["NOx"])
+
+    cells = grid_gdf.geometry.to_numpy()
+    for i, boundary in enumerate(boundaries.geometry):
+        areas = shapely.area(shapely.intersection(boundary, cells))
+        assert out.loc[i, "n_cells"] == (areas > 0).sum()
+        assert math.isclose(out.loc[i, "overlap_area_m2"], areas.sum())
+        assert math.isclose(
+            out.loc[i, "NOx_mean"], (areas * grid_gdf["NOx"]).sum() / areas.sum()
+        )
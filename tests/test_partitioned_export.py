@@ -0,0 +1,63 @@
+import json
+
+import pandas as pd
+import pytest
+
+from airlock.partitioned_export import (
+    NULL_PARTITION_VALUE,
+    bng_tile_labels,
+    export_partitioned_dataset,
+    read_partitioned_dataset,
+)
+
+
+def _match_df():
+    return pd.DataFrame({
+        "postcode": ["SW1A 1AA", "AB10 1XG", "SW1A 2AA", "???", "AB11 5QN"],
+        "easting": [529090.0, 393780.0, 530047.0, 1.0, 394500.0],
+        "northing": [179645.0, 806270.0, 179951.0, 1.0, 805000.0],
+        "matched_grid_id": ["g1", "g2", None, None, "g2"],
+    })
+
+
+def test_bng_tile_labels():
+    labels = bng_tile_labels([529090, 393780, 210000, -5, 100], [179645, 806270, 774000, 0, 1_400_000])
+
+    assert list(labels) == ["TQ", "NJ", "NN", None, None]
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "csv"])
+def test_export_by_area_writes_partitions_and_manifest(tmp_path, file_format):
+    out = tmp_path / "dataset"
+
+    manifest = export_partitioned_dataset(_match_df(), str(out), file_format=file_format)
+
+    by_value = {p["value"]: p for p in manifest["partitions"]}
+    assert set(by_value) == {"AB", "SW", None}
+    assert by_value["SW"]["rows"] == 2
+    assert by_value["SW"]["matched"] == 1
+    assert by_value["AB"]["bounds"] == [393780.0, 805000.0, 394500.0, 806270.0]
+    assert by_value[None]["path"].startswith(f"area={NULL_PARTITION_VALUE}/")
+
+    assert json.loads((out / "manifest.json").read_text()) == manifest
+    assert (out / f"area=SW/part-0.{file_format}").exists()
+
+    sw = read_partitioned_dataset(str(out), values=["SW"])
+    assert sw["postcode"].tolist() == ["SW1A 1AA", "SW1A 2AA"]
+    assert (sw["area"] == "SW").all()
+    assert len(read_partitioned_dataset(str(out))) == 5
+
+
+def test_export_by_tile_and_overwrite(tmp_path):
+    out = tmp_path / "dataset"
+    export_partitioned_dataset(_match_df(), str(out), partition_by="tile")
+
+    with pytest.raises(ValueError):
+        export_partitioned_dataset(_match_df(), str(out), partition_by="tile")
+
+    manifest = export_partitioned_dataset(
+        _match_df().iloc[:2], str(out), partition_by="tile", overwrite=True
+    )
+
+    assert [p["value"] for p in manifest["partitions"]] == ["NJ", "TQ"]
+    assert sorted(p.name for p in out.iterdir()) == ["manifest.json", "tile=NJ", "tile=TQ"]
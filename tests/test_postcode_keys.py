@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from airlock.postcode_keys import (
+    INVALID_POSTCODE_KEY,
+    PostcodeKeySet,
+    compact_lookup_keys,
+    decode_postcodes,
+    encode_postcodes,
+    normalise_postcodes,
+    postcode_lookup_keys,
+)
+
+
+def test_encode_decode_roundtrip():
+    postcodes = pd.Series(["SW1A 1AA", "n1 1aa", "N1  1AA", "E1W1AB", "ZZ99 9ZZ"])
+
+    keys = encode_postcodes(postcodes)
+
+    assert keys.dtype == np.int64
+    assert keys[1] == keys[2]
+    assert list(decode_postcodes(keys)) == [
+        "SW1A 1AA",
+        "N1 1AA",
+        "N1 1AA",
+        "E1W 1AB",
+        "ZZ99 9ZZ",
+    ]
+
+
+def test_key_order_matches_postcode_order():
+    postcodes = ["SW1A 1AA", "SW1 1AA", "N10 1AA", "N1 9ZZ", "A9 9AA", "E1W 1AB"]
+
+    keys = encode_postcodes(pd.Series(postcodes))
+
+    assert list(decode_postcodes(np.sort(keys))) == sorted(postcodes)
+
+
+def test_invalid_postcodes():
+    keys = encode_postcodes(pd.Series([None, "", "PC1", "NOT A POSTCODE"]))
+    assert (keys == INVALID_POSTCODE_KEY).all()
+    assert list(decode_postcodes(keys)) == [None] * 4
+
+    # Lookup keys still distinguish malformed values from each other
+    lookup = postcode_lookup_keys(pd.Series([None, "PC1", "pc1", "PC2"]))
+    assert lookup[0] == INVALID_POSTCODE_KEY
+    assert lookup[1] == lookup[2]
+    assert lookup[1] != lookup[3]
+    assert (lookup[1:] < INVALID_POSTCODE_KEY).all()
+
+
+def test_raw_encoder_agrees_with_regex_normalisation():
+    rng = np.random.default_rng(0)
+    alphabet = list("ABSWaz0189 -.\té")
+    values = ["".join(rng.choice(alphabet, rng.integers(0, 20))) for _ in range(5000)]
+    values += ["SW1A 1AA", "sw1a1aa", " N1  1AA ", "E1W 1AB", "A9A 9AA", "ß1 1AA", None, 12345]
+    postcodes = pd.Series(values, dtype=object)
+
+    compact, _ = normalise_postcodes(postcodes)
+
+    assert (postcode_lookup_keys(postcodes) == compact_lookup_keys(compact)).all()
+    assert (encode_postcodes(postcodes)[-8:-3] >= 0).all()
+
+
+def test_postcode_key_set():
+    keys = PostcodeKeySet()
+    expected = set()
+    rng = np.random.default_rng(0)
+
+    for _ in range(20):
+        batch = rng.integers(-5, 2000, 300)
+        assert keys.contains(batch).tolist() == [k in expected for k in batch.tolist()]
+        keys.add(batch)
+        expected.update(batch.tolist())
+
+    assert len(keys) == len(expected)
+    assert keys.nbytes == 8 * len(expected)
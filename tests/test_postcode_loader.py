@@ -42,3 +42,22 @@ def test_loader_with_filters():
     assert p.postcode == "PC1"
     assert p.easting == 100
     assert p.northing == 100
+
+
+def test_loader_carries_postcode_keys_into_matches():
+    from airlock.matcher import match_postcodes_to_grid
+    from airlock.models import GridCell
+    from airlock.postcode_keys import decode_postcodes
+    from shapely.geometry import box
+
+    df = pd.DataFrame({
+        "pcd": ["ab1 0aa", "AB1 0AB"],
+        "oseast1m": [100, 200],
+        "osnrth1m": [100, 200],
+    })
+
+    points = load_postcodes_from_dataframe(df)
+    result = match_postcodes_to_grid(points, [GridCell("G", 500, 500, box(0, 0, 1000, 1000))])
+
+    assert result["postcode_key"].dtype == "int64"
+    assert list(decode_postcodes(result["postcode_key"].to_numpy())) == ["AB1 0AA", "AB1 0AB"]
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from airlock.lattice import build_lattice
+from airlock.raster import (
+    cell_postcode_counts,
+    colourise,
+    crop_and_downsample,
+    rasterise_cell_values,
+    rasterise_match_share,
+    rasterise_points,
+)
+
+
+def _grid():
+    # 3 × 2 lattice with the top-right cell missing
+    return pd.DataFrame({
+        "X": [500, 1500, 2500, 500, 1500],
+        "Y": [500, 500, 500, 1500, 1500],
+        "NOx": [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+
+def test_rasterise_and_downsample():
+    lattice = build_lattice(_grid())
+    raster = rasterise_cell_values(lattice, _grid()["NOx"].to_numpy())
+
+    # North at the top
+    assert np.isnan(raster[0, 2])
+    assert raster[0, :2].tolist() == [4.0, 5.0]
+    assert raster[1].tolist() == [1.0, 2.0, 3.0]
+
+    view = crop_and_downsample(raster, lattice, lattice.bounds, max_pixels=2)
+    assert view.shape == (1, 2)
+    assert view[0, 0] == 3.0          # mean of 4, 5, 1, 2
+    assert view[0, 1] == 3.0          # missing cell ignored
+
+    zoomed = crop_and_downsample(raster, lattice, (1000, 0, 2000, 1000))
+    assert zoomed.tolist() == [[2.0]]
+
+
+def test_point_counts_and_colours():
+    lattice = build_lattice(_grid())
+
+    points = rasterise_points(
+        lattice,
+        np.array([100, 200, 2900, 9999]),
+        np.array([100, 100, 1900, 0]),
+    )
+    assert points[1, 0] == 2
+    assert points[0, 2] == 1
+    assert points.sum() == 3
+
+    share = rasterise_match_share(
+        lattice, np.array([100, 200]), np.array([100, 100]), np.array([True, False])
+    )
+    assert share[1, 0] == 0.5
+    assert np.isnan(share[1, 1])
+
+    counts = cell_postcode_counts(["G1", "G2"], pd.Series(["G2", "G2", None, "G9"]))
+    assert counts.tolist() == [0.0, 2.0]
+
+    rgba = colourise(np.array([[0.0, np.nan], [1.0, 0.5]]), vmin=0, vmax=1)
+    assert rgba.shape == (2, 2, 4)
+    assert rgba[0, 1, 3] == 0
+    assert rgba[0, 0, 3] == 255
+    assert rgba[1, 0].tolist() == [253, 231, 37, 255]
@@ -0,0 +1,51 @@
+import gzip
+import io
+import zipfile
+
+import pandas as pd
+
+from airlock.readers import read_table, select_csv_members
+
+
+def _csv_bytes(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def test_select_csv_members_prefers_onspd_splits():
+    names = [
+        "Documents/LA_UA names and codes.csv",
+        "Data/ONSPD_UK.csv",
+        "Data/multi_csv/ONSPD_UK_AB.csv",
+        "Data/multi_csv/ONSPD_UK_AL.csv",
+        "User Guide.pdf",
+    ]
+
+    assert select_csv_members(names) == [
+        "Data/multi_csv/ONSPD_UK_AB.csv",
+        "Data/multi_csv/ONSPD_UK_AL.csv",
+    ]
+
+
+def test_read_table_zip_and_gzip(tmp_path):
+    part_a = pd.DataFrame({"pcd": ["AB1 0AA"], "oseast1m": [1], "osnrth1m": [2]})
+    part_b = pd.DataFrame({"pcd": ["AL1 1AA"], "oseast1m": [3], "osnrth1m": [4]})
+
+    zip_path = tmp_path / "onspd.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr("Data/multi_csv/ONSPD_AB.csv", _csv_bytes(part_a))
+        zf.writestr("Data/multi_csv/ONSPD_AL.csv", _csv_bytes(part_b))
+        zf.writestr("Documents/lookup.csv", b"code,name\n1,x\n")
+
+    from_path = read_table(str(zip_path))
+    assert list(from_path["pcd"]) == ["AB1 0AA", "AL1 1AA"]
+
+    # Uploaded file objects are detected by name
+    upload = io.BytesIO(zip_path.read_bytes())
+    upload.name = "onspd.zip"
+    from_upload = read_table(upload, usecols=["pcd", "oseast1m"])
+    assert list(from_upload.columns) == ["pcd", "oseast1m"]
+    assert len(from_upload) == 2
+
+    gz_path = tmp_path / "nox.csv.gz"
+    gz_path.write_bytes(gzip.compress(_csv_bytes(pd.DataFrame({"X": [500], "Y": [500]}))))
+    assert read_table(str(gz_path))["X"].tolist() == [500]
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import airlock.run_cache as run_cache
+from airlock.run_cache import (
+    RunCache,
+    cached_match_run,
+    effective_filter_options,
+    package_fingerprint,
+    run_cache_key,
+)
+
+
+def _write_inputs(tmp_path):
+    nox = tmp_path / "nox.csv"
+    pcs = tmp_path / "onspd.csv"
+    pd.DataFrame({"X": [500.0, 1500.0], "Y": [500.0, 500.0], "NOx": [10.0, 20.0]}).to_csv(nox, index=False)
+    pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB", "AB1 1AB"],
+        "oseast1m": [100.0, 1600.0, 1600.0],
+        "osnrth1m": [100.0, 200.0, 200.0],
+        "doterm": [None, None, None],
+    }).to_csv(pcs, index=False)
+    return str(nox), str(pcs)
+
+
+def test_cache_key_depends_on_content_and_options(tmp_path):
+    nox, pcs = _write_inputs(tmp_path)
+    key = run_cache_key(nox, pcs)
+
+    assert run_cache_key(nox, pcs) == key
+    assert run_cache_key(nox, pcs, {"drop_duplicates": False}) != key
+
+    with open(pcs, "a") as fh:
+        fh.write("AB1 1AC,900,900,\n")
+    assert run_cache_key(nox, pcs) != key
+
+    with pytest.raises(ValueError):
+        effective_filter_options({"not_an_option": True})
+
+
+def test_cache_key_depends_on_package_sources(tmp_path, monkeypatch):
+    nox, pcs = _write_inputs(tmp_path)
+    key = run_cache_key(nox, pcs)
+
+    monkeypatch.setattr(run_cache, "package_fingerprint", lambda: "other code")
+    assert run_cache_key(nox, pcs) != key
+    assert len(package_fingerprint()) == 64
+
+
+def test_cached_match_run_hits_on_repeat(tmp_path, monkeypatch):
+    nox, pcs = _write_inputs(tmp_path)
+    cache = RunCache(str(tmp_path / "cache"))
+
+    first, hit = cached_match_run(nox, pcs, cache)
+    assert not hit
+    assert first["summary"]["total_postcodes"] == 2
+    assert first["excel"][:2] == b"PK"
+
+    # Entries hold data files only, never pickles
+    (entry,) = os.listdir(tmp_path / "cache")
+    assert "run.json" in os.listdir(tmp_path / "cache" / entry)
+    assert not any(name.endswith(".pkl") for name in os.listdir(tmp_path / "cache" / entry))
+
+    # The methods text is stored, not regenerated, so its timestamp is
+    # that of the original run
+    monkeypatch.setattr(run_cache, "generate_methods_summary", lambda **counts: str(counts))
+
+    second, hit = cached_match_run(nox, pcs, cache)
+    assert hit
+    assert second["match"].drop(columns="geometry").equals(first["match"].drop(columns="geometry"))
+    assert second["match"].geometry.equals(first["match"].geometry)
+    assert second["unmatched"]["postcode"].tolist() == first["unmatched"]["postcode"].tolist()
+    assert second["excel"] == first["excel"]
+    assert list(second["cell_index"].postcodes_in_cell("1500_500")) == ["AB1 1AB"]
+    # Cached indexes are memory-mapped rather than read into memory
+    assert isinstance(second["cell_index"].offsets, np.memmap)
+    assert second["methods_text"] == first["methods_text"]
+    assert "Generated:" in second["methods_text"]
+
+    _, hit = cached_match_run(nox, pcs, cache, filter_options={"drop_duplicates": False})
+    assert not hit
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    nox, pcs = _write_inputs(tmp_path)
+    run, _ = cached_match_run(nox, pcs, RunCache(str(tmp_path / "build")))
+
+    cache = RunCache(str(tmp_path / "cache"))
+    cache.put("a", run)
+    (_, entry_size, _), = cache.entries()
+    cache.max_bytes = int(entry_size * 2.5)
+
+    cache.put("b", run)
+    # Make "a" the most recently used entry
+    os.utime(cache._path("b"), (0, 0))
+    assert cache.get("a") is not None
+
+    cache.put("c", run)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_evicting_a_mapped_entry_keeps_the_loaded_index(tmp_path):
+    nox, pcs = _write_inputs(tmp_path)
+    cache = RunCache(str(tmp_path / "cache"))
+    cached_match_run(nox, pcs, cache)
+    run, hit = cached_match_run(nox, pcs, cache)
+    assert hit
+
+    cache.clear()
+
+    assert cache.entries() == []
+    assert list(run["cell_index"].postcodes_in_cell("1500_500")) == ["AB1 1AB"]
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = RunCache(str(tmp_path / "cache"))
+    os.makedirs(cache._path("broken"))
+    with open(os.path.join(cache._path("broken"), "run.json"), "w") as fh:
+        fh.write("{not json")
+
+    assert cache.get("broken") is None
+    assert not os.path.exists(cache._path("broken"))
@@ -0,0 +1,90 @@
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+from airlock.cli import main
+from airlock.readers import read_table
+from airlock.server_files import list_data_files, quick_fingerprint, resolve_data_path
+
+
+def _write_inputs(directory):
+    os.makedirs(directory / "onspd")
+    pd.DataFrame({"X": [500.0, 1500.0], "Y": [500.0, 500.0], "NOx": [10.0, 20.0]}).to_csv(
+        directory / "nox.csv", index=False
+    )
+    pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB", "AB1 1AC"],
+        "oseast1m": [100.0, 1600.0, 9000.0],
+        "osnrth1m": [100.0, 200.0, 9000.0],
+    }).to_csv(directory / "onspd" / "onspd.csv", index=False)
+    (directory / "notes.md").write_text("not data")
+
+
+def test_list_resolve_and_read(tmp_path):
+    _write_inputs(tmp_path)
+
+    assert list_data_files(str(tmp_path)) == ["nox.csv", os.path.join("onspd", "onspd.csv")]
+    assert list_data_files(str(tmp_path / "missing")) == []
+
+    path = resolve_data_path("onspd/onspd.csv", str(tmp_path))
+    assert os.path.isabs(path)
+    assert read_table(path, usecols=["pcd"])["pcd"].tolist() == ["AB1 1AA", "AB1 1AB", "AB1 1AC"]
+
+    with pytest.raises(FileNotFoundError):
+        resolve_data_path("other.csv", str(tmp_path))
+    with pytest.raises(ValueError):
+        resolve_data_path("notes.md", str(tmp_path))
+
+
+def test_resolve_within_directory_rejects_outside_paths(tmp_path):
+    _write_inputs(tmp_path)
+    outside = tmp_path.parent / f"{tmp_path.name}_outside.csv"
+    outside.write_text("pcd\n")
+
+    assert resolve_data_path("onspd/onspd.csv", str(tmp_path), within_directory=True).endswith("onspd.csv")
+    for path in (str(outside), f"../{outside.name}", "onspd/../../" + outside.name):
+        # The CLI accepts any path; the app confines typed paths to the directory
+        assert resolve_data_path(path, str(tmp_path)) == str(outside)
+        with pytest.raises(ValueError):
+            resolve_data_path(path, str(tmp_path), within_directory=True)
+
+
+def test_quick_fingerprint_samples_large_files(tmp_path):
+    path = tmp_path / "big.csv"
+    path.write_bytes(b"a" * 1_000_000)
+    stat = os.stat(path)
+    first = quick_fingerprint(str(path), samples=4, sample_bytes=1000)
+
+    assert quick_fingerprint(str(path), samples=4, sample_bytes=1000) == first
+
+    # Same size and mtime: only a change inside a sampled block is seen
+    with open(path, "r+b") as fh:
+        fh.seek(999_999)
+        fh.write(b"b")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    changed = quick_fingerprint(str(path), samples=4, sample_bytes=1000)
+    assert changed != first
+
+    # Same content, new mtime
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert quick_fingerprint(str(path), samples=4, sample_bytes=1000) != changed
+
+
+def test_cli_match_writes_bundle_and_reuses_cache(tmp_path, capsys):
+    _write_inputs(tmp_path)
+    args = [
+        "--data-dir", str(tmp_path), "--cache-dir", str(tmp_path / "cache"),
+        "match", "nox.csv", "onspd/onspd.csv",
+        "--output", str(tmp_path / "out.zip"), "--formats", "csv", "methods",
+    ]
+
+    assert main(args) == 0
+    assert main(args) == 0
+
+    output = capsys.readouterr().out
+    assert "2 of 3 postcodes matched" in output
+    assert output.count("[cached]") == 1
+    with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+        assert "airlock_matched_grid_postcodes.csv" in zf.namelist()
@@ -0,0 +1,18 @@
+import numpy as np
+from shapely.geometry import box
+
+from airlock.spatial_index import build_grid_tree, query_points_within
+
+
+def test_query_points_within():
+    tree = build_grid_tree([box(0, 0, 1000, 1000), box(1000, 0, 2000, 1000)])
+
+    point_idx, cell_idx = query_points_within(
+        tree,
+        np.array([1500.0, 250.0, 1000.0, 5000.0]),
+        np.array([500.0, 250.0, 500.0, 5000.0]),
+    )
+
+    # Point 2 lies on the shared edge and point 3 outside: no pairs
+    assert point_idx.tolist() == [0, 1]
+    assert cell_idx.tolist() == [1, 0]
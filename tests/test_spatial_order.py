@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from airlock import matcher
+from airlock.grid_builder import build_grid_geodataframe, gridcells_from_geodataframe
+from airlock.postcode_loader import load_postcodes_from_dataframe
+from airlock.spatial_order import hilbert_keys, morton_keys, spatial_sort_order
+
+
+def test_curve_keys_visit_neighbouring_cells():
+    cols, rows = np.meshgrid(np.arange(8), np.arange(8))
+    x, y = cols.ravel().astype(float), rows.ravel().astype(float)
+
+    order = np.argsort(hilbert_keys(x, y, order=3))
+    steps = np.abs(np.diff(x[order])) + np.abs(np.diff(y[order]))
+    assert (steps == 1).all()
+
+    assert len(np.unique(morton_keys(x, y, order=3))) == 64
+    assert morton_keys([0.0, np.nan], [0.0, 1.0])[1] == np.iinfo(np.uint64).max
+
+    with pytest.raises(ValueError):
+        spatial_sort_order(x, y, curve="peano")
+
+
+def test_spatially_sorted_matching_keeps_input_order(monkeypatch):
+    rng = np.random.default_rng(1)
+    n = 400
+    pc_df = pd.DataFrame({
+        "pcd": [f"AB{i % 10} {i % 7}AA" for i in range(n)],
+        "oseast1m": rng.integers(-500, 4500, n).astype(float),
+        "osnrth1m": rng.integers(-500, 4500, n).astype(float),
+    })
+    cols, rows = np.meshgrid(np.arange(4), np.arange(4))
+    grid = pd.DataFrame({"X": cols.ravel() * 1000 + 500.0, "Y": rows.ravel() * 1000 + 500.0})
+
+    points = load_postcodes_from_dataframe(pc_df)
+    cells = gridcells_from_geodataframe(build_grid_geodataframe(grid))
+    monkeypatch.setattr(matcher, "CHUNK_SIZE", 37)
+
+    expected = matcher.match_postcodes_to_grid(points, cells)
+    for curve in ("hilbert", "morton"):
+        result = matcher.match_postcodes_to_grid(points, cells, spatial_sort=curve)
+        pd.testing.assert_frame_equal(
+            result.drop(columns="geometry"), expected.drop(columns="geometry")
+        )
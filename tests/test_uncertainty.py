@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from airlock.methods_summary import generate_methods_summary
+from airlock.uncertainty import simulate_assignment_uncertainty
+
+
+def _grid():
+    return pd.DataFrame({
+        "X": [500.0, 1500.0],
+        "Y": [500.0, 500.0],
+        "GridCode": ["A", "B"],
+        "NOx": [10.0, 30.0],
+    })
+
+
+def _postcodes():
+    return pd.DataFrame({
+        "pcd": ["AB1 1AA", "AB1 1AB", "AB1 1AC", "AB1 1AD"],
+        # centre of A, 10 m from the A|B edge, on the edge, outside the grid
+        "oseast1m": [500.0, 990.0, 1000.0, 5000.0],
+        "osnrth1m": [500.0, 500.0, 500.0, 500.0],
+    })
+
+
+def test_probabilities_follow_distance_to_edge():
+    result = simulate_assignment_uncertainty(
+        _postcodes(), _grid(), error_m=20.0, n_replicates=4000, seed=0
+    )
+    df = result.postcodes.set_index("postcode")
+
+    # Far from any edge: never moves
+    assert df.loc["AB1 1AA", "assigned_probability"] == 1.0
+    assert df.loc["AB1 1AA", "exposure_variance"] == 0.0
+
+    # 10 m from the edge with SD 20 m: P(stay) = Phi(0.5) ~ 0.69
+    near = df.loc["AB1 1AB"]
+    assert near["assigned_grid_id"] == "A"
+    assert near["assigned_probability"] == pytest.approx(0.69, abs=0.03)
+    p_b = 1 - near["assigned_probability"]
+    assert near["exposure_mean"] == pytest.approx(10 + 20 * p_b)
+    assert near["exposure_variance"] == pytest.approx(400 * p_b * (1 - p_b))
+
+    # Edge points are unmatched but split between both cells
+    edge = df.loc["AB1 1AC"]
+    assert pd.isna(edge["assigned_grid_id"]) and np.isnan(edge["assigned_probability"])
+    assert edge["candidate_cells"] == 2
+
+    assert df.loc["AB1 1AD", "no_cell_probability"] == 1.0
+    assert np.isnan(df.loc["AB1 1AD", "exposure_mean"])
+
+    alternatives = result.alternatives
+    assert alternatives[alternatives["postcode"] == "AB1 1AB"]["grid_id"].tolist() == ["B"]
+    assert sorted(alternatives[alternatives["postcode"] == "AB1 1AC"]["grid_id"]) == ["A", "B"]
+
+
+def test_disc_model_is_bounded_and_summarised():
+    result = simulate_assignment_uncertainty(
+        _postcodes(), _grid(), error_m=5.0, error_model="disc", n_replicates=200, seed=1
+    )
+    df = result.postcodes.set_index("postcode")
+    assert df.loc["AB1 1AB", "assigned_probability"] == 1.0
+
+    summary = result.summary()
+    assert summary["postcodes"] == 2
+    assert summary["uncertain_postcodes"] == 0
+
+    text = generate_methods_summary(10, 4, 2, 2, 0.5, uncertainty=summary)
+    assert "8. Positional Uncertainty" in text
+    assert "200 Monte Carlo replicates" in text
+
+    with pytest.raises(ValueError):
+        simulate_assignment_uncertainty(_postcodes(), _grid(), error_model="square")